@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Память и время аналитики хранилища.
+
+Для N синтетических записей (имя, каталог, размер, mtime) сравниваются
+однопроходный StorageAnalytics (кучи и массивы корзин) и наивный отчет:
+список всех FileEntry, сортировки для топов и словари по ходу. tracemalloc
+показывает пик памяти (в отдельном прогоне); у однопроходного он не
+должен расти с N.
+С --real замеряется get_storage_analytics по директории с файлами
+(рядом - get_storage_summary, тоже один проход без аналитики).
+
+Запуск: python -m benchmarks.bench_analytics [--files N ...] [--top N] [--real N]
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from src.utils.storage_analytics import StorageAnalytics, _extension
+from src.utils.storage_manager import FileEntry, StorageManager
+
+PARENT = os.path.join("storage", "processed")
+EXTENSIONS = (".txt", ".log", ".dat", ".csv", ".tmp", ".zip", "")
+
+
+def records(files: int, now: float, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(files):
+        yield (f"file_{i:07d}{rng.choice(EXTENSIONS)}", PARENT,
+               int(rng.lognormvariate(9, 2.5)), now - rng.expovariate(1 / (30 * 86400)))
+
+
+def single_pass(files: int, top: int, now: float):
+    analytics = StorageAnalytics(top, now=now)
+    analytics.scan("processed", records(files, now))
+    return analytics.largest, analytics.oldest
+
+
+def naive(files: int, top: int, now: float):
+    entries = [FileEntry(name, parent, size, mtime, "processed")
+               for name, parent, size, mtime in records(files, now)]
+    extensions = {}
+    sizes = {}
+    for entry in entries:
+        item = extensions.setdefault(_extension(entry.name), [0, 0])
+        item[0] += 1
+        item[1] += entry.size
+        bucket = entry.size.bit_length()
+        sizes[bucket] = sizes.get(bucket, 0) + 1
+    largest = sorted(entries, key=lambda entry: entry.size, reverse=True)[:top]
+    oldest = sorted(entries, key=lambda entry: entry.mtime)[:top]
+    return largest, oldest
+
+
+def measure(func, *args):
+    # tracemalloc замедляет мелкие выделения памяти в разы: время
+    # берется из отдельного прогона без него
+    gc.collect()
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--real", type=int, default=0, help="Число файлов для замера по диску")
+    args = parser.parse_args()
+
+    now = time.time()
+    print(f"{'файлов':>10} {'способ':<12} {'пик памяти':>12} {'время, с':>10}")
+    for files in args.files:
+        results = {}
+        for label, func in (("один проход", single_pass), ("наивный", naive)):
+            (largest, oldest), peak, elapsed = measure(func, files, args.top, now)
+            # У равных по размеру файлов порядок в топе может различаться
+            results[label] = ([entry.size for entry in largest], [entry.name for entry in oldest])
+            print(f"{files:>10,} {label:<12} {peak / 1024:>9.0f} KB {elapsed:>10.2f}")
+        assert results["один проход"] == results["наивный"], "топы различаются"
+
+    if args.real:
+        root = tempfile.mkdtemp(prefix="bench_analytics_")
+        try:
+            manager = StorageManager(root)
+            processed = manager.directories["processed"]
+            rng = random.Random(1)
+            for i in range(args.real):
+                with open(os.path.join(processed, f"file_{i:07d}{rng.choice(EXTENSIONS)}"), "wb") as f:
+                    f.write(b"x" * int(rng.lognormvariate(5, 2)))
+            for label, func in (("get_storage_summary", manager.get_storage_summary),
+                                ("get_storage_analytics", manager.get_storage_analytics)):
+                _, peak, elapsed = measure(func)
+                print(f"\n{label}: {args.real:,} файлов за {elapsed:.2f} с, пик {peak / 1024:.0f} KB",
+                      end="")
+            print()
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
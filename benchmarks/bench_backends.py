@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Бэкенды хранилища: одинаковое поведение и скорость передачи.
+
+1. Один и тот же сценарий StorageManager (листинг, поиск, копирование,
+   перемещение, пакет с ошибкой, архив, сводка, удаление) выполняется
+   на локальной ФС, в памяти и в S3 через локальный сервер-заглушку;
+   результаты сверяются.
+2. Загрузка и скачивание большого файла через S3Backend: последовательно
+   (один поток) и параллельно (multipart upload и диапазоны). У
+   заглушки задана задержка ответа и скорость одного соединения, как у
+   удаленного хранилища.
+
+Запуск: python -m benchmarks.bench_backends [--size-mb N] [--workers W]
+                                            [--latency S] [--bandwidth-mb B]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+
+from src.utils.s3_backend import S3Backend
+from src.utils.s3_server import S3StandIn
+from src.utils.storage_backends import LocalBackend, MemoryBackend
+from src.utils.storage_manager import StorageManager
+
+MB = 1024 * 1024
+
+
+def check(condition: bool, message: str):
+    if not condition:
+        raise AssertionError(message)
+
+
+def workflow(manager: StorageManager) -> dict:
+    """Сценарий консоли хранилища; возвращает наблюдаемые результаты."""
+    backend = manager.backend
+    temp = manager.directories["temp"]
+    for i in range(20):
+        backend.write(backend.join(temp, f"file_{i:02d}.txt"), f"content {i}\n".encode() * (i + 1))
+
+    info = manager.get_directory_info("temp")
+    check(info["count"] == 20, f"листинг: {info['count']} файлов вместо 20")
+    found = manager.search_files("FILE_1")
+    check(len(found) == 10 and all(entry.directory == "temp" for entry in found),
+          f"поиск: {len(found)} файлов вместо 10")
+
+    first = backend.join(temp, "file_00.txt")
+    check(manager.copy_file(first, "processed")[0], "копирование")
+    check(manager.copy_file(first, "processed")[0], "копирование с совпадением имени")
+    check(manager.move_file(backend.join(temp, "file_01.txt"), "processed")[0], "перемещение")
+    check(not manager.move_file(backend.join(temp, "nope.txt"), "processed")[0],
+          "перемещение отсутствующего файла")
+
+    report = manager.copy_files([backend.join(temp, "file_02.txt"), backend.join(temp, "nope.txt")],
+                                "quarantine")
+    check(not report.succeeded and manager.get_directory_info("quarantine")["count"] == 0,
+          "атомарный пакет с ошибкой")
+    report = manager.move_files([backend.join(temp, f"file_{i:02d}.txt") for i in range(2, 6)],
+                                "downloads")
+    check(len(report.succeeded) == 4, "пакетное перемещение")
+    check(backend.read(report.results[0].target) == b"content 2\n" * 3, "содержимое после перемещения")
+
+    check(manager.delete_file(backend.join(temp, "file_06.txt"))[0], "удаление")
+    success, message = manager.create_archive("temp", "temp.zip")
+    check(success, f"архив: {message}")
+    with tempfile.TemporaryDirectory() as tmp:
+        local = os.path.join(tmp, "temp.zip")
+        backend.download(backend.join(manager.directories["archive"], "temp.zip"), local)
+        with zipfile.ZipFile(local) as archive:
+            names = sorted(archive.namelist())
+            check(archive.read("file_19.txt") == b"content 19\n" * 20, "содержимое архива")
+
+    summary = manager.get_storage_summary()
+    count, message = manager.delete_all_in_directory("temp")
+    return {
+        "archive": names,
+        "processed": sorted(entry.name[:11] for entry in manager.get_directory_info("processed")["files"]),
+        "downloads": manager.get_directory_info("downloads")["count"],
+        "summary": {key: data["count"] for key, data in summary.items()},
+        "deleted": count,
+        "temp_after": manager.get_directory_info("temp")["count"],
+    }
+
+
+def timed_transfer(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка ответа заглушки, с")
+    parser.add_argument("--bandwidth-mb", type=float, default=40.0,
+                        help="Скорость одного соединения заглушки, MB/s")
+    args = parser.parse_args()
+
+    print("Сценарий хранилища на разных бэкендах:")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, S3StandIn() as server:
+        s3 = S3Backend(server.endpoint, "bench", server.access_key, server.secret_key)
+        backends = {
+            "local": (LocalBackend(), os.path.join(tmp, "storage")),
+            "memory": (MemoryBackend(), "storage"),
+            "s3": (s3, "storage"),
+        }
+        for label, (backend, base_dir) in backends.items():
+            started = time.perf_counter()
+            results[label] = workflow(StorageManager(base_dir, backend=backend))
+            print(f"  {label:<8} ✅ {time.perf_counter() - started:.3f} с")
+        check(results["local"] == results["memory"] == results["s3"],
+              f"результаты бэкендов различаются: {results}")
+        print(f"  Результаты совпадают, запросов к S3: {s3.requests}")
+        s3.close()
+
+    print(f"\nПередача {args.size_mb} MB через S3 (задержка {args.latency * 1000:.0f} мс, "
+          f"{args.bandwidth_mb:.0f} MB/s на соединение):")
+    with tempfile.TemporaryDirectory() as tmp, \
+            S3StandIn(latency=args.latency, bandwidth=args.bandwidth_mb * MB) as server:
+        source = os.path.join(tmp, "source.bin")
+        with open(source, "wb") as f:
+            f.write(os.urandom(args.size_mb * MB))
+        print(f"  {'режим':<16} {'загрузка, MB/s':>15} {'скачивание, MB/s':>17} {'макс. запросов':>15}")
+        for workers in (1, args.workers):
+            backend = S3Backend(server.endpoint, "bench", server.access_key, server.secret_key,
+                                max_workers=workers)
+            server.max_active = 0
+            upload = timed_transfer(lambda: backend.upload(source, f"big/{workers}.bin"))
+            target = os.path.join(tmp, f"copy_{workers}.bin")
+            download = timed_transfer(lambda: backend.download(f"big/{workers}.bin", target))
+            check(os.path.getsize(target) == os.path.getsize(source), "размер скачанного файла")
+            with open(source, "rb") as a, open(target, "rb") as b:
+                check(a.read() == b.read(), "содержимое скачанного файла")
+            label = "последовательно" if workers == 1 else f"{workers} потоков"
+            print(f"  {label:<16} {args.size_mb / upload:>15.1f} {args.size_mb / download:>17.1f} "
+                  f"{server.max_active:>15}")
+            backend.close()
+        print(f"  Запросы заглушки: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк устойчивости загрузок.
+Сравнивает время завершения файлов (p50/p99) без защиты, только с повторами
+и с повторами + хеджированием на сервере-заглушке с внедренными сбоями.
+
+Запуск: python -m benchmarks.bench_download_resilience
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from tqdm import tqdm
+
+from src.scenarios.network_scenario import NetworkDownloadScenario
+from src.utils.latency import LatencyHistogram
+from src.utils.resilience import ResilientFetcher, RetryPolicy, RetryBudget
+from src.utils.simulated_server import SimulatedServer
+
+
+def run_config(name: str, policy: RetryPolicy, hedging: bool, files: int,
+               file_size: int, time_scale: float, seed: int) -> dict:
+    server = SimulatedServer(slow_rate=0.05, slow_factor=20, reset_rate=0.03,
+                             error_rate=0.03, time_scale=time_scale, seed=seed)
+    scenario = NetworkDownloadScenario(server=server, policy=policy, hedging=hedging)
+
+    completion_times = LatencyHistogram()
+    failed = 0
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        with ResilientFetcher(policy, hedging=hedging) as fetcher, \
+                tqdm(total=files * file_size, disable=True) as overall:
+            for i in range(files):
+                started = time.perf_counter()
+                success, _ = scenario.download_file(
+                    {"name": f"file_{i:03d}.bin", "size": file_size}, overall, fetcher
+                )
+                completion_times.record(time.perf_counter() - started)
+                if not success:
+                    failed += 1
+            stats = fetcher.snapshot()
+
+    return {
+        "name": name,
+        "p50": completion_times.percentile(50) / time_scale,
+        "p99": completion_times.percentile(99) / time_scale,
+        "failed": failed,
+        "retries": stats["retries"],
+        "hedged": stats["hedged"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size", type=int, default=500, help="Размер файла в KB")
+    parser.add_argument("--time-scale", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scale = args.time_scale
+    configs = [
+        ("без защиты", RetryPolicy(max_attempts=1, attempt_timeout=None), False),
+        ("повторы", RetryPolicy(attempt_timeout=None, base_delay=0.05 * scale,
+                                budget=RetryBudget()), False),
+        ("повторы+таймаут+хедж", RetryPolicy(attempt_timeout=3.0 * scale,
+                                             base_delay=0.05 * scale,
+                                             budget=RetryBudget()), True),
+    ]
+
+    print(f"{'Режим':<24} {'p50, с':>8} {'p99, с':>8} {'ошибок':>7} {'повторов':>9} {'хеджей':>7}")
+    for name, policy, hedging in configs:
+        r = run_config(name, policy, hedging, args.files, args.size, scale, args.seed)
+        print(f"{r['name']:<24} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['failed']:>7} "
+              f"{r['retries']:>9} {r['hedged']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Память на одну запись о файле в листинге хранилища.
+Для N файлов строится список записей прежнего вида (dict с путем,
+строкой размера и datetime) и список FileEntry; tracemalloc считает,
+сколько байт добавил каждый список (имена файлов учтены в обоих).
+С --real замеряется get_directory_info по директории с N пустыми файлами.
+
+Запуск: python -m benchmarks.bench_file_entry [--files N] [--real]
+"""
+
+import argparse
+import datetime
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from src.utils.storage_manager import FileEntry, StorageManager, human_readable_size
+
+PARENT = os.path.join("storage", "processed")
+
+
+def legacy_entries(files: int, mtime: float):
+    # Прежний _file_entry: все поля считаются при сканировании
+    entries = []
+    for i in range(files):
+        name = f"file_{i:07d}.dat"
+        size = 4096 + i % 512
+        entries.append({
+            "name": name,
+            "path": os.path.join(PARENT, name),
+            "size": size,
+            "size_hr": human_readable_size(size),
+            "modified": datetime.datetime.fromtimestamp(mtime + i)
+        })
+    return entries
+
+
+def compact_entries(files: int, mtime: float):
+    return [FileEntry(f"file_{i:07d}.dat", PARENT, 4096 + i % 512, mtime + i)
+            for i in range(files)]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    entries = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entries, current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--real", action="store_true",
+                        help="Замерить get_directory_info по настоящей директории")
+    args = parser.parse_args()
+
+    mtime = time.time()
+    print(f"{args.files:,} записей:")
+    print(f"  {'вид':<12} {'байт/запись':>12} {'пик, MB':>10} {'построение, с':>14}")
+    results = {}
+    for label, build in (("dict", lambda: legacy_entries(args.files, mtime)),
+                         ("FileEntry", lambda: compact_entries(args.files, mtime))):
+        entries, current, peak, elapsed = measure(build)
+        results[label] = current / args.files
+        print(f"  {label:<12} {current / args.files:>12.1f} {peak / 2**20:>10.1f} {elapsed:>14.2f}")
+        del entries
+    print(f"  Экономия: x{results['dict'] / results['FileEntry']:.1f}")
+
+    if args.real:
+        root = tempfile.mkdtemp(prefix="bench_file_entry_")
+        try:
+            manager = StorageManager(root)
+            processed = manager.directories["processed"]
+            for i in range(args.files):
+                open(os.path.join(processed, f"file_{i:07d}.dat"), "wb").close()
+            info, current, peak, elapsed = measure(lambda: manager.get_directory_info("processed"))
+            print(f"\nget_directory_info: {current / info['count']:.1f} байт/файл, "
+                  f"пик {peak / 2**20:.1f} MB, {elapsed:.2f} с")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк мемоизации complex_calculation.
+Показывает ускорение MemoCache в зависимости от доли повторяющихся значений.
+Стоимость расчета моделируется занятым ожиданием --cost-us микросекунд
+(при --cost-us 0 видны чистые накладные расходы кэша).
+
+Запуск: python -m benchmarks.bench_memo [--items N] [--cost-us 50]
+"""
+
+import argparse
+import random
+import time
+
+from src.scenarios.processing_scenario import calculate
+from src.utils.memo import MemoCache
+
+
+def make_values(items: int, duplicate_ratio: float, seed: int):
+    rng = random.Random(seed)
+    values = []
+    for i in range(items):
+        if values and rng.random() < duplicate_ratio:
+            values.append(rng.choice(values))
+        else:
+            values.append(i * 1000 + rng.randint(0, 999))
+    return values
+
+
+def expensive(value: int, cost_us: int):
+    deadline = time.perf_counter() + cost_us / 1_000_000
+    while time.perf_counter() < deadline:
+        pass
+    return calculate(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--cost-us", type=int, default=50)
+    parser.add_argument("--maxsize", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'Повторы':>8} {'без кэша, с':>12} {'с кэшем, с':>11} {'ускорение':>10} "
+          f"{'попадания':>10} {'вытеснено':>10}")
+    for ratio in (0.0, 0.25, 0.5, 0.75, 0.9, 0.99):
+        values = make_values(args.items, ratio, args.seed)
+
+        started = time.perf_counter()
+        for value in values:
+            expensive(value, args.cost_us)
+        plain = time.perf_counter() - started
+
+        cache = MemoCache(maxsize=args.maxsize)
+        started = time.perf_counter()
+        for value in values:
+            cache.get_or_compute(value, lambda: expensive(value, args.cost_us))
+        cached = time.perf_counter() - started
+
+        print(f"{ratio:>8.0%} {plain:>12.3f} {cached:>11.3f} {plain / cached:>9.2f}x "
+              f"{cache.hit_rate:>10.1%} {cache.evictions:>10}")
+
+
+if __name__ == "__main__":
+    main()
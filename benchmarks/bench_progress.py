@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк накладных расходов прогресс-бара на итерацию.
+Сравнивает цикл без бара, tqdm с update()+set_postfix() на каждой итерации
+(как в сценариях), голый tqdm.update() и FastProgress.
+
+Запуск: python -m benchmarks.bench_progress [--items N]
+"""
+
+import argparse
+import io
+import time
+
+from tqdm import tqdm
+
+from src.utils.progress import FastProgress
+
+
+def bench_none(items: int):
+    total = 0
+    for i in range(items):
+        total += i
+
+
+def bench_tqdm_postfix(items: int):
+    total = 0
+    with tqdm(total=items, file=io.StringIO()) as pbar:
+        for i in range(items):
+            total += i
+            pbar.set_postfix(min=f"{i * 0.001:.1f}ms", max=f"{i * 0.002:.1f}ms",
+                             avg=f"{i * 0.0015:.1f}ms")
+            pbar.update(1)
+
+
+def bench_tqdm_update(items: int):
+    total = 0
+    with tqdm(total=items, file=io.StringIO()) as pbar:
+        for i in range(items):
+            total += i
+            pbar.update(1)
+
+
+def bench_fast_postfix(items: int):
+    total = 0
+    state = {"i": 0}
+    with FastProgress(total=items, file=io.StringIO()) as progress:
+        progress.postfix_from(lambda: {"min": f"{state['i'] * 0.001:.1f}ms"})
+        for i in range(items):
+            total += i
+            state["i"] = i
+            progress.update(1)
+
+
+def bench_fast_tick(items: int):
+    total = 0
+    with FastProgress(total=items, file=io.StringIO()) as progress:
+        tick = progress.tick
+        for i in range(items):
+            total += i
+            tick()
+
+
+def bench_fast_iterate(items: int):
+    total = 0
+    with FastProgress(total=items, file=io.StringIO()) as progress:
+        for i in progress.iterate(range(items)):
+            total += i
+
+
+# Третий элемент - ограничение числа итераций для очень медленных вариантов
+CASES = [
+    ("без бара", bench_none, None),
+    ("tqdm update+postfix", bench_tqdm_postfix, 20_000),
+    ("tqdm update", bench_tqdm_update, None),
+    ("FastProgress update+postfix", bench_fast_postfix, None),
+    ("FastProgress tick", bench_fast_tick, None),
+    ("FastProgress iterate", bench_fast_iterate, None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'Вариант':<30} {'нс/итер':>9} {'сверх цикла':>12}")
+    for name, fn, limit in CASES:
+        items = min(args.items, limit) if limit else args.items
+        best = float("inf")
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            fn(items)
+            best = min(best, time.perf_counter() - started)
+        per_item = best / items * 1e9
+        if baseline is None:
+            baseline = per_item
+        print(f"{name:<30} {per_item:>9.1f} {per_item - baseline:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
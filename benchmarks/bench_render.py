@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк вывода листинга и перерисовки меню.
+Листинг из N строк выводится в построчно буферизованный поток (как
+stdout терминала): прежним способом - print на каждую строку - и через
+ScreenRenderer одним вызовом write. Для меню сравнивается объем вывода
+при полной перерисовке и при перерисовке только изменившихся строк.
+
+Запуск: python -m benchmarks.bench_render [--rows N] [--repeats R]
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import time
+
+# Замеряется терминальный режим (ANSI-коды), даже если вывод перенаправлен
+os.environ.setdefault("TQDM_DEMO_HEADLESS", "0")
+
+from src.utils.console import ScreenRenderer, header_lines
+from src.utils.storage_console import ACTION_LINES, StorageConsole
+from src.utils.storage_manager import FileEntry
+
+
+class CountingStream:
+    """Поток-приемник: считает вызовы write и байты, пишет в /dev/null построчно."""
+
+    def __init__(self):
+        self._sink = open(os.devnull, "w", buffering=1, encoding="utf-8")
+        self.writes = 0
+        self.chars = 0
+
+    def write(self, text: str) -> int:
+        self.writes += text.count("\n") or 1
+        self.chars += len(text)
+        return self._sink.write(text)
+
+    def flush(self):
+        self._sink.flush()
+
+    def fileno(self) -> int:
+        # Не терминал: рендерер берет размер по умолчанию (80x24)
+        raise OSError
+
+    def close(self):
+        self._sink.close()
+
+
+def make_listing(rows: int):
+    mtime = datetime.datetime(2024, 1, 1, 12, 0).timestamp()
+    files = [FileEntry(f"file_{i:06d}.dat", "storage/temp", 4096, mtime) for i in range(rows)]
+    return {"count": rows, "size_hr": f"{rows * 4 / 1024:.1f} MB", "files": files}
+
+
+def listing_print(info, stream: CountingStream):
+    # Прежний list_directory: форматирование и print на каждую строку
+    print(f"\nСОДЕРЖИМОЕ TEMP:", file=stream)
+    print(f"{'─' * 90}", file=stream)
+    print(f"{'#':<4} {'Имя файла':<50} {'Размер':<10} {'Дата изменения':<20}", file=stream)
+    print(f"{'─' * 90}", file=stream)
+    for i, file in enumerate(info["files"], 1):
+        name = file.name
+        if len(name) > 48:
+            name = name[:45] + "..."
+        date = file.modified.strftime("%Y-%m-%d %H:%M")
+        print(f"{i:<4} {name:<50} {file.size_hr:<10} {date:<20}", file=stream)
+    print(f"{'─' * 90}", file=stream)
+    print(f"Всего: {info['count']} файлов, {info['size_hr']}", file=stream)
+
+
+def listing_buffered(info, stream: CountingStream):
+    renderer = ScreenRenderer(stream)
+    renderer.lines(StorageConsole.listing_lines("temp", info))
+    renderer.flush()
+
+
+def timed(func, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        stream = CountingStream()
+        started = time.perf_counter()
+        func(stream)
+        samples.append(time.perf_counter() - started)
+        stream.close()
+    return statistics.median(samples)
+
+
+def menu_frame(count: int):
+    return header_lines("МЕНЕДЖЕР ХРАНИЛИЩА") + [f"TEMP         📄 {count:4} файлов"] + ACTION_LINES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    info = make_listing(args.rows)
+    print(f"Листинг из {args.rows:,} строк (медиана из {args.repeats}):")
+    baseline = timed(lambda stream: listing_print(info, stream), args.repeats)
+    buffered = timed(lambda stream: listing_buffered(info, stream), args.repeats)
+    print(f"  {'print на строку':<22} {baseline * 1000:>9.1f} мс")
+    print(f"  {'ScreenRenderer':<22} {buffered * 1000:>9.1f} мс  "
+          f"(x{baseline / buffered:.1f})")
+
+    print("\nПерерисовка меню (изменилась одна строка):")
+    for diff in (False, True):
+        stream = CountingStream()
+        renderer = ScreenRenderer(stream)
+        renderer.draw(menu_frame(0))
+        stream.chars = 0
+        started = time.perf_counter()
+        frames = 1000
+        for count in range(1, frames + 1):
+            if not diff:
+                renderer.invalidate()
+            renderer.draw(menu_frame(count))
+        elapsed = time.perf_counter() - started
+        stream.close()
+        label = "только изменения" if diff else "полная"
+        print(f"  {label:<22} {elapsed * 1000 / frames:>9.4f} мс/кадр  "
+              f"{stream.chars / frames:>7.0f} символов/кадр")
+
+
+if __name__ == "__main__":
+    main()
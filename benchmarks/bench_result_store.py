@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк памяти хранилища результатов.
+С помощью tracemalloc сравнивает байты на элемент для списка словарей
+(прежний формат results) и колоночного ColumnarResults.
+
+Запуск: python -m benchmarks.bench_result_store [--items N]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from src.scenarios.processing_scenario import calculate
+from src.utils.columnar import ColumnarResults
+
+
+def measure(fill, items: int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    store = fill(items)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, (current - before) / items, (peak - before) / items, elapsed
+
+
+def fill_dicts(items: int):
+    results = []
+    for i in range(items):
+        results.append(calculate(i * 37))
+    return results
+
+
+def fill_columnar(items: int, **kwargs):
+    results = ColumnarResults(**kwargs)
+    for i in range(items):
+        results.append(calculate(i * 37))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        cases = [
+            ("список словарей", fill_dicts),
+            ("колонки", fill_columnar),
+            ("колонки + выгрузка", lambda n: fill_columnar(
+                n, memory_budget=1 << 20, spill_dir=spill_dir)),
+        ]
+        print(f"{'Хранилище':<22} {'байт/эл':>10} {'пик байт/эл':>12} {'время, с':>9}")
+        for name, fill in cases:
+            store, per_item, peak_per_item, elapsed = measure(fill, args.items)
+            print(f"{name:<22} {per_item:>10.1f} {peak_per_item:>12.1f} {elapsed:>9.2f}")
+            if isinstance(store, ColumnarResults):
+                store.close()
+            del store
+
+
+if __name__ == "__main__":
+    main()
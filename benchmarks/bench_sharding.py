@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Плоская и шардированная раскладка директории хранилища.
+В две директории кладется по N пустых файлов (плоско и по хеш-шардам),
+затем замеряются операции StorageManager: поиск файла по имени
+(существующего и отсутствующего), проверка совпадения имени при
+копировании, полный листинг и поиск по подстроке. В конце плоская
+директория переносится в шарды инструментом миграции.
+
+Запуск: python -m benchmarks.bench_sharding [--files N] [--lookups K] [--dir PATH]
+                                            [--layout sharded:глубина:ширина]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from src.utils.storage_manager import StorageManager
+
+
+def populate(manager: StorageManager, dir_key: str, files: int) -> float:
+    dir_path = manager.directories[dir_key]
+    layout = manager.layouts[dir_key]
+    created = set()
+    started = time.perf_counter()
+    for i in range(files):
+        path = layout.path(dir_path, f"file_{i:07d}.dat")
+        shard = os.path.dirname(path)
+        if shard not in created:
+            os.makedirs(shard, exist_ok=True)
+            created.add(shard)
+        open(path, "wb").close()
+    return time.perf_counter() - started
+
+
+def timed(func, repeats: int = 1) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--dir", default=None, help="Где создать файлы (по умолчанию - временная директория)")
+    parser.add_argument("--layout", default="sharded", help="Шардированная раскладка для сравнения")
+    parser.add_argument("--no-migrate", action="store_true", help="Не замерять миграцию")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_sharding_", dir=args.dir)
+    try:
+        managers = {
+            "flat": StorageManager(os.path.join(root, "flat"), layout="flat"),
+            "sharded": StorageManager(os.path.join(root, "sharded"), layout=args.layout),
+        }
+        rng = random.Random(42)
+        names = [f"file_{rng.randrange(args.files):07d}.dat" for _ in range(args.lookups)]
+        missing = [f"missing_{i:07d}.dat" for i in range(args.lookups)]
+        source = os.path.join(root, "source.dat")
+        open(source, "wb").close()
+
+        print(f"{args.files:,} файлов в директории, {args.lookups:,} поисков по имени")
+        print(f"  {'операция':<28} {'flat':>12} {'sharded':>12}")
+        rows = {}
+        for label, manager in managers.items():
+            rows.setdefault("создание файлов, с", {})[label] = populate(manager, "processed", args.files)
+
+        def lookup(manager, batch):
+            return lambda: [manager.find_file("processed", name) for name in batch]
+
+        def collision(manager):
+            # Проверка совпадения имени в copy_file/move_file
+            return lambda: [manager._target_path("processed", name) for name in names]
+
+        for label, manager in managers.items():
+            rows.setdefault("поиск существующего, мкс", {})[label] = \
+                timed(lookup(manager, names), 3) / len(names) * 1e6
+            rows.setdefault("поиск отсутствующего, мкс", {})[label] = \
+                timed(lookup(manager, missing), 3) / len(missing) * 1e6
+            rows.setdefault("проверка имени, мкс", {})[label] = \
+                timed(collision(manager), 3) / len(names) * 1e6
+            rows.setdefault("копирование, мкс", {})[label] = \
+                timed(lambda: manager.copy_file(source, "processed"), 3) * 1e6
+            rows.setdefault("листинг, с", {})[label] = \
+                timed(lambda: manager.get_directory_info("processed"))
+            rows.setdefault("поиск по подстроке, с", {})[label] = \
+                timed(lambda: manager.search_files("file_00000"))
+
+        for name, values in rows.items():
+            print(f"  {name:<28} {values['flat']:>12.3f} {values['sharded']:>12.3f}")
+
+        if not args.no_migrate:
+            flat = managers["flat"]
+            started = time.perf_counter()
+            layout = managers["sharded"].layouts["processed"]
+            migration, message = flat.migrate_to_sharded("processed", layout.depth, layout.width)
+            success, message = migration.join()
+            elapsed = time.perf_counter() - started
+            assert flat.find_file("processed", names[0]) == layout.path(
+                flat.directories["processed"], names[0])
+            print(f"\nМиграция flat -> sharded: {migration.moved:,} файлов за {elapsed:.1f} с "
+                  f"({migration.moved / elapsed:,.0f} файлов/с) {message}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
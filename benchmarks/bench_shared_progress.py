@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк стоимости одного обновления межпроцессного прогресса.
+Сравнивает запись в слот разделяемой памяти (WorkerProgress.add)
+с multiprocessing.Value под блокировкой и multiprocessing.Queue.
+
+Запуск: python -m benchmarks.bench_shared_progress [--updates N]
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils import shared_progress
+from src.utils.shared_progress import SharedProgress
+
+
+def shm_updates(updates: int) -> float:
+    progress = shared_progress.current()
+    started = time.perf_counter()
+    for _ in range(updates):
+        progress.add(1)
+    return time.perf_counter() - started
+
+
+_counter = None
+_queue = None
+
+
+def _init_value(counter):
+    global _counter
+    _counter = counter
+
+
+def _init_queue(queue):
+    global _queue
+    _queue = queue
+
+
+def value_updates(updates: int) -> float:
+    started = time.perf_counter()
+    for _ in range(updates):
+        with _counter.get_lock():
+            _counter.value += 1
+    return time.perf_counter() - started
+
+
+def queue_updates(updates: int) -> float:
+    started = time.perf_counter()
+    for _ in range(updates):
+        _queue.put(1)
+    return time.perf_counter() - started
+
+
+def run(workers: int, updates: int, fn, initializer, initargs) -> float:
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as executor:
+        elapsed = list(executor.map(fn, [updates] * workers))
+    return max(elapsed) / updates * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'Способ':<28} {'нс/обновление':>14}")
+
+    with SharedProgress(total=args.updates * args.workers, workers=args.workers,
+                        per_worker_bars=False, disable=True) as progress:
+        ns = run(args.workers, args.updates, shm_updates, progress.initializer, progress.initargs)
+    print(f"{'разделяемая память':<28} {ns:>14.1f}")
+
+    counter = multiprocessing.Value("q", 0)
+    ns = run(args.workers, args.updates, value_updates, _init_value, (counter,))
+    print(f"{'Value с блокировкой':<28} {ns:>14.1f}")
+
+    manager_queue = multiprocessing.Manager().Queue()
+    ns = run(args.workers, args.updates // 10, queue_updates, _init_queue, (manager_queue,))
+    print(f"{'Queue (Manager)':<28} {ns:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
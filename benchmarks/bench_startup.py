@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Время до меню: сколько стоит импорт точки входа.
+Каждый замер - новый интерпретатор с -X importtime; берется
+накопленное время импорта модуля и время всего процесса.
+Дополнительно проверяется, что тяжелые модули не загружаются до
+выбора сценария.
+
+Запуск:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --save benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --compare benchmarks/startup_baseline.json
+
+Код возврата 1 - регрессия относительно базовой линии или тяжелый
+модуль в импорте меню.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+from benchmarks.harness import (DEFAULT_THRESHOLD, compare, format_row, load_baseline,
+                                print_comparison, save_baseline)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES = ["src.main", "src.demostrator"]
+
+# Модули, которые нужны только сценариям и хранилищу
+HEAVY_MODULES = ["tqdm", "numpy", "asyncio", "http.server", "zipfile", "shutil",
+                 "sqlite3", "cProfile"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(module: str) -> Tuple[float, float, Set[str]]:
+    """
+    Импортирует модуль в свежем интерпретаторе.
+
+    Returns:
+        Tuple[float, float, Set[str]]: (накопленное время импорта, время процесса,
+                                        все загруженные модули)
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=ROOT
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    cumulative = None
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name)
+        if name == module:
+            cumulative = int(match.group(2)) / 1e6
+    if cumulative is None:
+        raise RuntimeError(f"{module} не найден в выводе -X importtime")
+    return cumulative, wall, loaded
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    q = statistics.quantiles(samples, n=4, method="inclusive") if len(samples) > 1 \
+        else [samples[0]] * 3
+    median = statistics.median(samples)
+    return {"median": median, "iqr": q[2] - q[0], "min": min(samples),
+            "max": max(samples), "ops_per_sec": 1 / median if median else None,
+            "peak_rss_kb": None, "repeats": len(samples), "samples": samples}
+
+
+def measure_module(module: str, warmup: int, repeats: int):
+    imports, walls = [], []
+    loaded: Set[str] = set()
+    for index in range(warmup + repeats):
+        cumulative, wall, modules = import_once(module)
+        if index >= warmup:
+            imports.append(cumulative)
+            walls.append(wall)
+        loaded |= modules
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    return _stats(imports), _stats(walls), heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Прогрев кэша байткода и файловой системы")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--save", metavar="PATH", help="Сохранить результаты как базовую линию")
+    parser.add_argument("--compare", metavar="PATH", help="Сравнить с базовой линией")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимый рост медианы (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for module in ENTRY_MODULES:
+        imports, walls, heavy = measure_module(module, args.warmup, args.repeats)
+        results[f"startup.import[module={module}]"] = imports
+        results[f"startup.process[module={module}]"] = walls
+        print(format_row(f"startup.import[module={module}]", imports))
+        print(format_row(f"startup.process[module={module}]", walls))
+        if heavy:
+            failed = True
+            print(f"❌ {module}: при показе меню загружены {', '.join(heavy)}")
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\n✅ Базовая линия сохранена: {args.save}")
+
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        print(f"\nСравнение с {args.compare} (порог {args.threshold:.0%}):")
+        print_comparison(rows)
+        failed = failed or any(row["status"] == "regression" for row in rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
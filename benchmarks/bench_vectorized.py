@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пакетного режима DataProcessingScenario.
+Сравнивает пропускную способность поэлементного complex_calculation
+и векторизованного complex_calculation_batch при разных размерах блока.
+
+Запуск: python -m benchmarks.bench_vectorized [--items N]
+"""
+
+import argparse
+import random
+import time
+
+from src.scenarios.processing_scenario import DataProcessingScenario
+
+
+def measure(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[10, 100, 1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    scenario = DataProcessingScenario(simulate_latency=False)
+    random.seed(0)
+    values = list(scenario.data_generator(args.items))
+
+    def per_item():
+        for v in values:
+            scenario.complex_calculation(v)
+
+    baseline = measure(per_item, args.repeats)
+    print(f"{'Режим':<22} {'эл/с':>14} {'ускорение':>10}")
+    print(f"{'поэлементно':<22} {args.items / baseline:>14,.0f} {1.0:>9.1f}x")
+
+    for size in args.batch_sizes:
+        blocks = [values[i:i + size] for i in range(0, len(values), size)]
+
+        def batched():
+            for block in blocks:
+                scenario.complex_calculation_batch(block)
+
+        elapsed = measure(batched, args.repeats)
+        print(f"{'блок ' + format(size, ','):<22} {args.items / elapsed:>14,.0f} "
+              f"{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
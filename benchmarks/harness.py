@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Общая обвязка бенчмарков: прогрев, повторные замеры, статистика
+(медиана, IQR, оп/с, пиковый RSS), базовая линия в JSON и поиск регрессий.
+
+Каждый случай - фабрика-контекстный менеджер, которая готовит окружение
+и отдает функцию замера (или пару (prepare, run), где prepare
+выполняется перед каждым повтором и в замер не входит).
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Сценарии пишут прогресс и сообщения - во время замеров они не нужны
+os.environ.setdefault("TQDM_DEMO_HEADLESS", "1")
+os.environ.setdefault("TQDM_DEMO_EVENTS", os.devnull)
+
+DEFAULT_THRESHOLD = 0.10
+
+
+class Case:
+    """
+    Один параметризованный случай бенчмарка.
+    """
+
+    def __init__(self, name: str, factory: Callable[..., Any],
+                 params: Optional[Dict[str, Any]] = None, ops: int = 1):
+        """
+        Инициализация случая.
+
+        Args:
+            name: Имя случая (группа.вариант)
+            factory: factory(**params) -> контекстный менеджер, отдающий
+                     run или (prepare, run)
+            params: Параметры фабрики (размеры, число воркеров)
+            ops: Сколько операций выполняет один вызов run (для оп/с)
+        """
+        self.name = name
+        self.factory = factory
+        self.params = params or {}
+        self.ops = ops
+
+    @property
+    def id(self) -> str:
+        if not self.params:
+            return self.name
+        args = ",".join(f"{key}={value}" for key, value in sorted(self.params.items()))
+        return f"{self.name}[{args}]"
+
+
+def _peak_rss_kb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, на Linux - в килобайтах
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def _quartiles(samples: List[float]):
+    if len(samples) < 2:
+        return samples[0], samples[0]
+    q = statistics.quantiles(samples, n=4, method="inclusive")
+    return q[0], q[2]
+
+
+def measure(case: Case, warmup: int = 1, repeats: int = 5, quiet: bool = True) -> Dict[str, Any]:
+    """
+    Прогревает и замеряет случай в текущем процессе.
+
+    Returns:
+        Dict[str, Any]: median, iqr, min, max, ops_per_sec, peak_rss_kb, samples
+    """
+    sink = io.StringIO() if quiet else None
+    redirect = (contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink)) \
+        if quiet else (contextlib.nullcontext(), contextlib.nullcontext())
+
+    samples = []
+    with redirect[0], redirect[1], case.factory(**case.params) as target:
+        prepare, run = target if isinstance(target, tuple) else (None, target)
+        for index in range(warmup + repeats):
+            if prepare is not None:
+                prepare()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            if index >= warmup:
+                samples.append(elapsed)
+            if sink is not None:
+                sink.seek(0)
+                sink.truncate()
+
+    q1, q3 = _quartiles(samples)
+    median = statistics.median(samples)
+    return {
+        "median": median,
+        "iqr": q3 - q1,
+        "min": min(samples),
+        "max": max(samples),
+        "ops_per_sec": case.ops / median if median > 0 else None,
+        "peak_rss_kb": _peak_rss_kb(),
+        "repeats": repeats,
+        "samples": samples,
+    }
+
+
+def _child(case: Case, warmup: int, repeats: int, queue):
+    try:
+        queue.put(("ok", measure(case, warmup, repeats)))
+    except BaseException as e:
+        queue.put(("error", repr(e)))
+
+
+def measure_isolated(case: Case, warmup: int = 1, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Замер в отдельном процессе: пиковый RSS относится только к этому случаю.
+    """
+    ctx = multiprocessing.get_context()
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(case, warmup, repeats, queue))
+    process.start()
+    status, payload = queue.get()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"{case.id}: {payload}")
+    return payload
+
+
+def run_cases(cases: List[Case], warmup: int = 1, repeats: int = 5,
+              isolate: bool = True, log: Callable[[str], None] = print) -> Dict[str, Dict[str, Any]]:
+    """Замеряет все случаи; ошибка одного случая не останавливает остальные."""
+    results = {}
+    for case in cases:
+        try:
+            if isolate:
+                stats = measure_isolated(case, warmup, repeats)
+            else:
+                stats = measure(case, warmup, repeats)
+        except Exception as e:
+            log(f"❌ {case.id}: {e}")
+            continue
+        results[case.id] = stats
+        log(format_row(case.id, stats))
+    return results
+
+
+def format_row(case_id: str, stats: Dict[str, Any]) -> str:
+    ops = stats.get("ops_per_sec")
+    rss = stats.get("peak_rss_kb")
+    return (f"{case_id:<58} {stats['median'] * 1000:>10.2f} мс "
+            f"±{stats['iqr'] * 1000:>8.2f} "
+            f"{(f'{ops:,.0f}' if ops else '-'):>12} оп/с "
+            f"{(f'{rss / 1024:.1f} MB' if rss else '-'):>10}")
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f,
+                  ensure_ascii=False, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Сравнивает медианы с базовой линией.
+
+    Регрессия - медиана выросла больше чем на threshold и больше,
+    чем разброс (IQR) базовой линии, чтобы шум не давал ложных срабатываний.
+    """
+    rows = []
+    for case_id, stats in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            rows.append({"id": case_id, "status": "new", "change": None})
+            continue
+        delta = stats["median"] - base["median"]
+        change = delta / base["median"] if base["median"] else 0.0
+        noise = max(threshold * base["median"], base.get("iqr", 0.0))
+        if delta > noise:
+            status = "regression"
+        elif -delta > noise:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({"id": case_id, "status": status, "change": change,
+                     "baseline_ms": base["median"] * 1000,
+                     "current_ms": stats["median"] * 1000})
+    for case_id in baseline:
+        if case_id not in results:
+            rows.append({"id": case_id, "status": "missing", "change": None})
+    return rows
+
+
+STATUS_MARKS = {
+    "regression": "❌ регрессия",
+    "improvement": "✅ ускорение",
+    "same": "   без изменений",
+    "new": "   новый",
+    "missing": "⚠️ нет замера",
+}
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else ""
+        print(f"{row['id']:<58} {change:>9}  {STATUS_MARKS[row['status']]}")
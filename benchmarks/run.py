@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Набор бенчмарков всех сценариев и операций StorageManager.
+Сценарии запускаются без интерактива и без искусственных задержек
+(simulate_latency=False), каждый случай - в отдельном процессе.
+
+Запуск:
+    python -m benchmarks.run                              # все случаи
+    python -m benchmarks.run -k storage --repeats 10      # фильтр по имени
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.15
+
+С --compare код возврата 1, если найдена регрессия.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+from typing import List
+
+from benchmarks.harness import (Case, DEFAULT_THRESHOLD, compare, load_baseline,
+                                print_comparison, run_cases, save_baseline)
+
+SIZES = {
+    "quick": {"files": [20], "items": [1_000], "workers": [1, 2]},
+    "full": {"files": [20, 200], "items": [1_000, 20_000], "workers": [1, 2, 4]},
+}
+
+
+@contextlib.contextmanager
+def scenario_files(files: int):
+    from src.scenarios.file_scenario import FileProcessingScenario
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = FileProcessingScenario(simulate_latency=False, base_dir=tmp,
+                                          file_count=files)
+        yield scenario.run
+
+
+@contextlib.contextmanager
+def scenario_network(files: int):
+    from src.scenarios.network_scenario import NetworkDownloadScenario
+    from src.utils.simulated_server import SimulatedServer
+    scenario = NetworkDownloadScenario(
+        server=SimulatedServer(time_scale=0.0, seed=42), simulate_latency=False
+    )
+    scenario.files_to_download = [{"name": f"file_{i:03d}.bin", "size": 500}
+                                  for i in range(files)]
+    yield scenario.run
+
+
+@contextlib.contextmanager
+def scenario_processing(mode: str, items: int, workers: int = 1):
+    from src.scenarios.processing_scenario import DataProcessingScenario
+    scenario = DataProcessingScenario(simulate_latency=False)
+    runners = {
+        "batch": lambda: scenario.run_batch(items, batch_size=1000),
+        "parallel": lambda: scenario.run_parallel(items, workers=workers),
+        "async": lambda: scenario.run_async(items, consumers=workers),
+    }
+    yield runners[mode]
+
+
+def _populate(directory: str, files: int, size: int = 4096):
+    payload = os.urandom(size)
+    for i in range(files):
+        with open(os.path.join(directory, f"bench_{i:05d}.dat"), "wb") as f:
+            f.write(payload)
+
+
+@contextlib.contextmanager
+def storage_operation(operation: str, files: int):
+    from src.utils.storage_manager import StorageManager
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = StorageManager(base_dir=tmp)
+        temp_dir = manager.directories["temp"]
+
+        def reset():
+            for key in ("temp", "processed", "archive"):
+                shutil.rmtree(manager.directories[key])
+                os.makedirs(manager.directories[key])
+            _populate(temp_dir, files)
+
+        def paths():
+            return [os.path.join(temp_dir, name) for name in sorted(os.listdir(temp_dir))]
+
+        runners = {
+            "list": lambda: manager.get_directory_info("temp"),
+            "search": lambda: manager.search_files("bench_0"),
+            "summary": manager.get_storage_summary,
+            "copy": lambda: [manager.copy_file(path, "processed") for path in paths()],
+            "move": lambda: [manager.move_file(path, "processed") for path in paths()],
+            "delete": lambda: [manager.delete_file(path) for path in paths()],
+            "copy_batch": lambda: manager.copy_files(paths(), "processed"),
+            "move_batch": lambda: manager.move_files(paths(), "processed"),
+            "delete_batch": lambda: manager.delete_files(paths()),
+            "delete_all": lambda: manager.delete_all_in_directory("temp"),
+            "archive": lambda: manager.create_archive("temp", "bench.zip"),
+        }
+        reset()
+        yield reset, runners[operation]
+
+
+@contextlib.contextmanager
+def history_record(runs: int, batch_size: int):
+    from src.utils.run_history import RunHistory
+    results = {"successful": 20, "failed": 0, "success_rate": "100.0%",
+               "latency_ms": {"p50": 1.5, "p99": 4.0, "avg": 1.8}}
+    with tempfile.TemporaryDirectory() as tmp:
+        history = RunHistory(os.path.join(tmp, "history.db"), batch_size=batch_size)
+
+        def run():
+            for _ in range(runs):
+                history.record("bench", results, 1.0, throughput="successful")
+            history.flush()
+
+        yield run
+        history.close()
+
+
+def build_cases(size: str = "quick") -> List[Case]:
+    sizes = SIZES[size]
+    cases = []
+    for files in sizes["files"]:
+        cases.append(Case("scenario.files", scenario_files, {"files": files}, ops=files))
+        cases.append(Case("scenario.network", scenario_network, {"files": files // 4 or 1},
+                          ops=files // 4 or 1))
+    for items in sizes["items"]:
+        cases.append(Case("scenario.processing", scenario_processing,
+                          {"mode": "batch", "items": items}, ops=items))
+        for workers in sizes["workers"]:
+            cases.append(Case("scenario.processing", scenario_processing,
+                              {"mode": "parallel", "items": items, "workers": workers},
+                              ops=items))
+            cases.append(Case("scenario.processing", scenario_processing,
+                              {"mode": "async", "items": items, "workers": workers},
+                              ops=items))
+    for files in sizes["files"]:
+        for operation in ("list", "search", "summary", "copy", "move", "delete",
+                          "copy_batch", "move_batch", "delete_batch", "delete_all", "archive"):
+            per_call = 1 if operation in ("list", "search", "summary", "archive") else files
+            cases.append(Case("storage", storage_operation,
+                              {"operation": operation, "files": files}, ops=per_call))
+    for batch_size in (1, 16):
+        cases.append(Case("history.record", history_record,
+                          {"runs": 100, "batch_size": batch_size}, ops=100))
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="Подстрока в имени случая")
+    parser.add_argument("--size", choices=sorted(SIZES), default="quick")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Замерять в текущем процессе (RSS общий для всех случаев)")
+    parser.add_argument("--save", metavar="PATH", help="Сохранить результаты как базовую линию")
+    parser.add_argument("--compare", metavar="PATH", help="Сравнить с базовой линией")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимый рост медианы (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    cases = [case for case in build_cases(args.size) if args.filter in case.id]
+    print(f"{'Случай':<58} {'медиана':>13} {'IQR':>9} {'':>17} {'пик RSS':>10}")
+    results = run_cases(cases, args.warmup, args.repeats, isolate=not args.no_isolate)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\n✅ Базовая линия сохранена: {args.save}")
+
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        print(f"\nСравнение с {args.compare} (порог {args.threshold:.0%}):")
+        print_comparison(rows)
+        if any(row["status"] == "regression" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Пакетный запуск сценариев без меню.
+
+Задания берутся из JSON-файла и выполняются по очереди или параллельно
+(--parallel N). Каждое задание - отдельный процесс со своим каталогом:
+там его хранилище (storage/), вывод (output.log), события прогресса
+(events.jsonl) и результат (result.json). Прогресс задания показывается
+на своей строке экрана; в конце печатается и сохраняется общий отчет
+(report.json) со сводкой по сценариям.
+
+Формат файла заданий:
+
+    {
+        "parallel": 2,
+        "defaults": {"simulate_latency": false, "clock": "virtual"},
+        "jobs": [
+            {"scenario": "1", "file_count": 50, "seed": 1},
+            {"scenario": "Обработка данных", "mode": "parallel",
+             "data_count": 10000, "workers": 2, "repeat": 3},
+            {"scenario": "2", "name": "без хеджирования", "hedging": false}
+        ]
+    }
+
+Поля задания:
+    scenario  Клавиша меню, название сценария или "модуль:фабрика"
+    name      Имя задания в отчете
+    mode      Метод сценария run_<mode> (по умолчанию run)
+    seed      Зерно (TQDM_DEMO_SEED); при repeat - seed, seed+1, ...
+    clock     real или virtual (TQDM_DEMO_CLOCK)
+    repeat    Сколько раз выполнить задание
+    env       Дополнительные переменные окружения процесса
+Остальные поля - параметры конструктора сценария (file_count,
+simulate_latency, ...) или метода режима (data_count, workers, ...).
+Вместо объекта можно передать просто список заданий.
+
+Запуск: python -m src.batch_runner JOBS.json [--parallel N] [--out DIR] [--history]
+"""
+
+import datetime
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.scenarios.registry import ScenarioEntry, ScenarioRegistry, default_registry
+
+RESERVED = ("name", "scenario", "mode", "seed", "clock", "repeat", "env")
+RESULT_NAME = "result.json"
+EVENTS_NAME = "events.jsonl"
+LOG_NAME = "output.log"
+# Период опроса процессов и их событий, с
+POLL_INTERVAL = 0.2
+
+
+class BatchJob:
+    """
+    Одно задание пакета (после разворачивания repeat).
+    """
+
+    def __init__(self, index: int, name: str, entry: ScenarioEntry, mode: Optional[str],
+                 params: Dict[str, Any], seed: Optional[int] = None,
+                 clock: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+        self.index = index
+        self.name = name
+        self.entry = entry
+        self.mode = mode
+        self.params = params
+        self.seed = seed
+        self.clock = clock
+        self.env = env or {}
+
+    @property
+    def method(self) -> str:
+        return "run" if not self.mode or self.mode == "run" else f"run_{self.mode}"
+
+    @property
+    def group(self) -> str:
+        """Ключ сводки: сценарий и режим."""
+        return self.entry.name if self.method == "run" else f"{self.entry.name} [{self.mode}]"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index, "name": self.name, "scenario": self.entry.name,
+            "target": self.entry.target, "throughput": self.entry.throughput,
+            "method": self.method, "params": self.params, "seed": self.seed,
+            "clock": self.clock, "env": self.env,
+        }
+
+
+def resolve_scenario(registry: ScenarioRegistry, spec: str) -> ScenarioEntry:
+    """
+    Пункт реестра по клавише, названию (без учета регистра) или "модуль:фабрика".
+
+    Raises:
+        ValueError: Сценарий не найден
+    """
+    spec = str(spec).strip()
+    if spec in registry:
+        return registry.get(spec)
+    for entry in registry:
+        if entry.name.lower() == spec.lower():
+            return entry
+    if ":" in spec:
+        return ScenarioEntry("", spec, "", spec)
+    names = ", ".join(f"{entry.key} - {entry.name}" for entry in registry)
+    raise ValueError(f"Сценарий не найден: {spec} (доступны: {names})")
+
+
+def load_jobs(path: str, registry: Optional[ScenarioRegistry] = None) -> Tuple[List[BatchJob], Dict[str, Any]]:
+    """
+    Читает файл заданий.
+
+    Returns:
+        Tuple[List[BatchJob], Dict]: Задания и общие настройки файла (parallel)
+
+    Raises:
+        ValueError: Ошибка формата или неизвестный сценарий
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"jobs": data}
+    if not isinstance(data, dict) or not isinstance(data.get("jobs"), list):
+        raise ValueError("Файл заданий: ожидается список заданий или объект с полем jobs")
+    registry = registry or default_registry()
+    defaults = data.get("defaults") or {}
+
+    jobs = []
+    for number, raw in enumerate(data["jobs"], 1):
+        if not isinstance(raw, dict) or "scenario" not in raw:
+            raise ValueError(f"Задание {number}: нужен объект с полем scenario")
+        spec = {**defaults, **raw}
+        try:
+            entry = resolve_scenario(registry, spec["scenario"])
+        except ValueError as e:
+            raise ValueError(f"Задание {number}: {e}") from None
+        repeat = int(spec.get("repeat", 1))
+        if repeat < 1:
+            raise ValueError(f"Задание {number}: repeat должен быть не меньше 1")
+        clock = spec.get("clock")
+        if clock not in (None, "real", "virtual"):
+            raise ValueError(f"Задание {number}: clock - real или virtual, а не {clock}")
+        params = {key: value for key, value in spec.items() if key not in RESERVED}
+        seed = spec.get("seed")
+        name = spec.get("name") or entry.name
+        for run in range(repeat):
+            jobs.append(BatchJob(
+                len(jobs) + 1,
+                f"{name} #{run + 1}" if repeat > 1 else name,
+                entry, spec.get("mode"), params,
+                seed=None if seed is None else int(seed) + run,
+                clock=clock,
+                env={key: str(value) for key, value in (spec.get("env") or {}).items()},
+            ))
+    return jobs, {key: value for key, value in data.items() if key not in ("jobs", "defaults")}
+
+
+# --- Процесс задания ---------------------------------------------------------
+
+def _accepted(func: Callable, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Забирает из params аргументы, которые принимает func."""
+    signature = inspect.signature(func)
+    if any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values()):
+        taken = dict(params)
+    else:
+        taken = {key: value for key, value in params.items()
+                 if key in signature.parameters
+                 and signature.parameters[key].kind is not inspect.Parameter.POSITIONAL_ONLY}
+    for key in taken:
+        del params[key]
+    return taken
+
+
+def _run_scenario(job: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    factory = ScenarioEntry("", job["scenario"], "", job["target"]).load()
+    params = dict(job["params"])
+    scenario = factory(**_accepted(factory, params))
+    method = getattr(scenario, job["method"], None)
+    if method is None:
+        raise ValueError(f"У сценария нет метода {job['method']}")
+    run_kwargs = _accepted(method, params)
+    if params:
+        raise ValueError(f"Параметры не поддерживаются сценарием: {', '.join(sorted(params))}")
+    return method(**run_kwargs) or {}, scenario
+
+
+def _job_main(job: Dict[str, Any], workdir: str):
+    """Точка входа процесса задания (запускается через spawn)."""
+    os.chdir(workdir)
+    os.environ.update({
+        "TQDM_DEMO_HEADLESS": "1",
+        "TQDM_DEMO_EVENTS": os.path.abspath(EVENTS_NAME),
+        "TQDM_DEMO_EVENTS_INTERVAL": "0.5",
+    })
+    if job["seed"] is not None:
+        os.environ["TQDM_DEMO_SEED"] = str(job["seed"])
+    if job["clock"]:
+        os.environ["TQDM_DEMO_CLOCK"] = job["clock"]
+    os.environ.update(job["env"])
+
+    log = open(LOG_NAME, "w", encoding="utf-8", buffering=1)
+    sys.stdout = sys.stderr = log
+    result = {"status": "error", "error": None, "results": {}, "scenario_duration": None}
+    started = time.perf_counter()
+    try:
+        results, scenario = _run_scenario(job)
+        result["results"] = results
+        result["status"] = "ok"
+        if getattr(scenario, "end_time", 0) and getattr(scenario, "start_time", 0):
+            result["scenario_duration"] = scenario.end_time - scenario.start_time
+    except Exception as e:
+        traceback.print_exc()
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["duration"] = time.perf_counter() - started
+        with open(RESULT_NAME + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, default=str)
+        os.replace(RESULT_NAME + ".tmp", RESULT_NAME)
+        log.flush()
+
+
+# --- Отчет -------------------------------------------------------------------
+
+class JobResult:
+    """
+    Итог задания: статус, длительность и результаты сценария.
+    """
+
+    def __init__(self, job: BatchJob, workdir: str, status: str, duration: float = 0.0,
+                 results: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+                 scenario_duration: Optional[float] = None, started_at: Optional[float] = None):
+        self.job = job
+        self.workdir = workdir
+        self.status = status
+        self.duration = duration
+        self.results = results or {}
+        self.error = error
+        # Длительность по часам сценария (с виртуальными часами - модельная)
+        self.scenario_duration = scenario_duration
+        self.started_at = started_at
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    @property
+    def per_sec(self) -> Optional[float]:
+        key = self.job.entry.throughput
+        duration = self.scenario_duration or self.duration
+        value = self.results.get(key) if key else None
+        if not isinstance(value, (int, float)) or duration <= 0:
+            return None
+        return value / duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.job.to_dict(),
+            "workdir": self.workdir, "status": self.status, "error": self.error,
+            "duration_s": round(self.duration, 3),
+            "scenario_duration_s": self.scenario_duration,
+            "per_sec": self.per_sec, "results": self.results,
+        }
+
+
+class BatchReport:
+    """
+    Итоги пакета и сводка по сценариям.
+    """
+
+    def __init__(self, results: List[JobResult], wall_time: float, parallel: int, out_dir: str):
+        self.results = results
+        self.wall_time = wall_time
+        self.parallel = parallel
+        self.out_dir = out_dir
+
+    @property
+    def failed(self) -> List[JobResult]:
+        return [result for result in self.results if not result.ok]
+
+    def groups(self) -> Dict[str, Dict[str, Any]]:
+        """Сводка по сценариям: запуски, длительность, скорость, средние метрики."""
+        from src.utils.run_history import flatten_metrics
+
+        grouped: Dict[str, List[JobResult]] = {}
+        for result in self.results:
+            grouped.setdefault(result.job.group, []).append(result)
+        summary = {}
+        for group, results in grouped.items():
+            ok = [result for result in results if result.ok]
+            durations = [result.duration for result in ok]
+            rates = [result.per_sec for result in ok if result.per_sec is not None]
+            totals: Dict[str, List[float]] = {}
+            for result in ok:
+                for key, value in flatten_metrics(result.results).items():
+                    totals.setdefault(key, []).append(value)
+            summary[group] = {
+                "runs": len(results),
+                "ok": len(ok),
+                "failed": len(results) - len(ok),
+                "duration_s": {
+                    "min": min(durations, default=0.0),
+                    "avg": sum(durations) / len(durations) if durations else 0.0,
+                    "max": max(durations, default=0.0),
+                },
+                "per_sec_avg": sum(rates) / len(rates) if rates else None,
+                "metrics_avg": {key: sum(values) / len(values) for key, values in sorted(totals.items())},
+            }
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        busy = sum(result.duration for result in self.results)
+        return {
+            "out_dir": self.out_dir,
+            "parallel": self.parallel,
+            "wall_time_s": round(self.wall_time, 3),
+            "jobs_time_s": round(busy, 3),
+            "speedup": busy / self.wall_time if self.wall_time > 0 else None,
+            "jobs": [result.to_dict() for result in self.results],
+            "scenarios": self.groups(),
+        }
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"{'№':>3}  {'задание':<34} {'статус':<10} {'время, с':>9} {'скорость':>10}"]
+        for result in self.results:
+            rate = f"{result.per_sec:.1f}/с" if result.per_sec is not None else "-"
+            lines.append(f"{result.job.index:>3}  {result.job.name[:34]:<34} {result.status:<10} "
+                         f"{result.duration:>9.2f} {rate:>10}")
+            if result.error:
+                lines.append(f"     ❌ {result.error}")
+        lines.append("")
+        lines.append(f"{'сценарий':<40} {'запусков':>8} {'ошибок':>7} {'ср. время, с':>13} {'ср. скорость':>13}")
+        for group, data in self.groups().items():
+            rate = f"{data['per_sec_avg']:.1f}/с" if data["per_sec_avg"] is not None else "-"
+            lines.append(f"{group[:40]:<40} {data['runs']:>8} {data['failed']:>7} "
+                         f"{data['duration_s']['avg']:>13.2f} {rate:>13}")
+        busy = sum(result.duration for result in self.results)
+        lines.append("")
+        lines.append(f"Пакет: {len(self.results)} заданий за {self.wall_time:.2f} с "
+                     f"(сумма времени заданий {busy:.2f} с, процессов: {self.parallel})")
+        return lines
+
+
+# --- Запуск пакета -----------------------------------------------------------
+
+class _Running:
+    """Выполняющееся задание: процесс, строка прогресса и позиция в его событиях."""
+
+    def __init__(self, job: BatchJob, workdir: str, process, lane: int, bar):
+        self.job = job
+        self.workdir = workdir
+        self.process = process
+        self.lane = lane
+        self.bar = bar
+        self.offset = 0
+        self.partial = b""
+        self.started_at = time.time()
+
+    def poll_events(self):
+        """Переносит на строку задания последнее событие прогресса."""
+        try:
+            with open(os.path.join(self.workdir, EVENTS_NAME), "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        if not data:
+            return
+        self.offset += len(data)
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        for line in reversed(lines):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") in ("progress", "close"):
+                self.bar.total = event.get("total")
+                self.bar.set_description(f"{self.job.name}: {event.get('stage') or ''}".strip(": "))
+                self.bar.update((event.get("n") or 0) - self.bar.n)
+                break
+
+
+class BatchRunner:
+    """
+    Выполняет задания в отдельных процессах, не больше parallel одновременно.
+    """
+
+    def __init__(self, jobs: List[BatchJob], out_dir: str, parallel: int = 1):
+        """
+        Инициализация.
+
+        Args:
+            jobs: Задания (см. load_jobs)
+            out_dir: Каталог пакета; у каждого задания там свой подкаталог
+            parallel: Число одновременно выполняемых заданий
+        """
+        self.jobs = jobs
+        self.out_dir = os.path.abspath(out_dir)
+        self.parallel = max(1, parallel)
+
+    def _workdir(self, job: BatchJob) -> str:
+        import shutil
+
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in job.name)
+        path = os.path.join(self.out_dir, f"{job.index:03d}_{safe}")
+        # Каталог прошлого запуска: его result.json выдал бы убитое задание
+        # за успешное, а хранилище и события смешались бы с новыми
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+    def _collect(self, running: _Running) -> JobResult:
+        try:
+            with open(os.path.join(running.workdir, RESULT_NAME), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return JobResult(running.job, running.workdir, "error",
+                             time.time() - running.started_at, started_at=running.started_at,
+                             error=f"Процесс завершился без результата (код {running.process.exitcode})")
+        return JobResult(running.job, running.workdir, data["status"], data["duration"],
+                         data.get("results"), data.get("error"), data.get("scenario_duration"),
+                         started_at=running.started_at)
+
+    def run(self) -> BatchReport:
+        """Выполняет пакет. Ctrl+C останавливает задания, отчет все равно строится."""
+        import multiprocessing
+        from src.utils.headless import progress_bar
+
+        # spawn: у каждого задания чистое состояние модулей (часы, события, метрики)
+        context = multiprocessing.get_context("spawn")
+        os.makedirs(self.out_dir, exist_ok=True)
+        pending = list(self.jobs)
+        pending.reverse()
+        running: Dict[int, _Running] = {}
+        finished: Dict[int, JobResult] = {}
+        started = time.perf_counter()
+
+        with progress_bar(total=len(self.jobs), desc="Пакет", unit="задание", position=0) as overall:
+            try:
+                while pending or running:
+                    for lane in range(self.parallel):
+                        if lane in running or not pending:
+                            continue
+                        job = pending.pop()
+                        workdir = self._workdir(job)
+                        process = context.Process(target=_job_main, args=(job.to_dict(), workdir),
+                                                  name=f"batch-job-{job.index}")
+                        process.start()
+                        bar = progress_bar(total=None, desc=job.name, position=lane + 1, leave=False)
+                        running[lane] = _Running(job, workdir, process, lane, bar)
+
+                    time.sleep(POLL_INTERVAL)
+                    for lane, item in list(running.items()):
+                        item.poll_events()
+                        if item.process.is_alive():
+                            continue
+                        item.process.join()
+                        item.bar.close()
+                        del running[lane]
+                        result = self._collect(item)
+                        finished[item.job.index] = result
+                        mark = "✅" if result.ok else "❌"
+                        overall.write(f"{mark} {item.job.name}: {result.duration:.2f} с"
+                                      + (f" - {result.error}" if result.error else ""))
+                        overall.update(1)
+            except KeyboardInterrupt:
+                for item in running.values():
+                    item.process.terminate()
+                    item.process.join()
+                    item.bar.close()
+                    finished[item.job.index] = JobResult(
+                        item.job, item.workdir, "cancelled", time.time() - item.started_at,
+                        started_at=item.started_at, error="Прервано пользователем")
+                for job in pending:
+                    finished[job.index] = JobResult(job, "", "skipped", error="Не запускалось")
+
+        results = [finished[job.index] for job in self.jobs]
+        return BatchReport(results, time.perf_counter() - started, self.parallel, self.out_dir)
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Пакетный запуск сценариев из файла заданий")
+    parser.add_argument("jobs", help="JSON-файл заданий")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="Одновременных заданий (по умолчанию из файла или 1)")
+    parser.add_argument("--out", help="Каталог пакета (по умолчанию storage/batches/<время>)")
+    parser.add_argument("--history", action="store_true", help="Записать запуски в историю")
+    args = parser.parse_args()
+
+    try:
+        jobs, options = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    parallel = args.parallel or int(options.get("parallel", 1))
+    out_dir = args.out or os.path.join(
+        "storage", "batches", datetime.datetime.now().strftime("batch_%Y%m%d_%H%M%S"))
+
+    print(f"Заданий: {len(jobs)}, процессов: {parallel}, каталог: {out_dir}")
+    report = BatchRunner(jobs, out_dir, parallel).run()
+
+    print()
+    for line in report.summary_lines():
+        print(line)
+    report_path = os.path.join(report.out_dir, "report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+    print(f"Отчет сохранен: {report_path}")
+
+    if args.history:
+        from src.utils.run_history import RunHistory
+        with RunHistory() as history:
+            for result in report.results:
+                if result.status not in ("ok", "error"):
+                    continue
+                history.record(result.job.entry.name, result.results,
+                               result.scenario_duration or result.duration,
+                               started_at=result.started_at, status=result.status,
+                               throughput=result.job.entry.throughput,
+                               extra={"batch": report.out_dir, "job": result.job.name,
+                                      "params": result.job.params})
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,12 +7,11 @@
 import sys
 import time
 from typing import Dict, Any, Optional
-from tqdm import tqdm
 
-from src.scenarios.file_scenario import FileProcessingScenario
-from src.scenarios.network_scenario import NetworkDownloadScenario
-from src.scenarios.processing_scenario import DataProcessingScenario
+from src.scenarios.registry import default_registry
+from src.utils.run_history import RunHistory
 from src.utils.console import print_header, print_menu, clear_screen, Colors
+from src.utils import metrics
 
 class TqdmDemonstrator:
     """
@@ -27,31 +26,22 @@ class TqdmDemonstrator:
     
     def __init__(self):
         """Инициализация демонстратора."""
+        # Экземпляры сценариев создаются при первом запуске: до этого
+        # их модули (tqdm, numpy, asyncio) не импортируются
+        self.registry = default_registry()
         self.scenarios = {
-            "1": {
-                "name": "Обработка файлов",
-                "description": "Базовый прогресс-бар, пакетная обработка, настройка внешнего вида",
-                "instance": FileProcessingScenario(),
-                "color": Colors.GREEN
-            },
-            "2": {
-                "name": "Загрузка из сети", 
-                "description": "Вложенные прогресс-бары, имитация множественных загрузок",
-                "instance": NetworkDownloadScenario(),
-                "color": Colors.BLUE
-            },
-            "3": {
-                "name": "Обработка данных",
-                "description": "Ручное управление прогрессом, кастомные метрики, генераторы",
-                "instance": DataProcessingScenario(),
-                "color": Colors.MAGENTA
+            entry.key: {
+                "name": entry.name,
+                "description": entry.description,
+                "entry": entry,
+                "instance": None,
+                "color": getattr(Colors, entry.color, Colors.WHITE)
             }
+            for entry in self.registry
         }
-        self.results_history: Dict[str, list] = {
-            "file": [],
-            "network": [],
-            "processing": []
-        }
+        self.exit_key = self.registry.next_key()
+        # История запусков переживает перезапуск программы
+        self.history = RunHistory()
         self.session_start = time.time()
     
     def show_welcome(self):
@@ -85,11 +75,11 @@ class TqdmDemonstrator:
                 f"   {Colors.WHITE}{scenario['description']}{Colors.END}"
             )
         
-        menu_items.append(f"{Colors.RED}4. Выход{Colors.END}\n   Завершение работы программы")
+        menu_items.append(f"{Colors.RED}{self.exit_key}. Выход{Colors.END}\n   Завершение работы программы")
         
         print("\n" + "\n\n".join(menu_items) + "\n")
         
-        choice = input(f"{Colors.YELLOW}Выберите сценарий (1-4): {Colors.END}").strip()
+        choice = input(f"{Colors.YELLOW}Выберите сценарий (1-{self.exit_key}): {Colors.END}").strip()
         return choice
     
     def run_scenario(self, scenario_key: str) -> Optional[Dict[str, Any]]:
@@ -106,7 +96,6 @@ class TqdmDemonstrator:
             return None
         
         scenario_info = self.scenarios[scenario_key]
-        scenario = scenario_info["instance"]
         
         clear_screen()
         print_header(f"СЦЕНАРИЙ: {scenario_info['name']}")
@@ -120,10 +109,12 @@ class TqdmDemonstrator:
             input()
             
             # Запускаем сценарий
-            results = scenario.run()
+            if scenario_info["instance"] is None:
+                scenario_info["instance"] = scenario_info["entry"].create()
+            results = scenario_info["instance"].run()
             
             # Сохраняем результаты
-            self._save_results(scenario_key, results)
+            self._save_results(scenario_key, results, scenario_info["instance"])
             
             # Показываем сводку
             self._show_scenario_summary(results)
@@ -135,6 +126,8 @@ class TqdmDemonstrator:
             return None
         except Exception as e:
             print(f"\n{Colors.RED}Ошибка при выполнении сценария: {e}{Colors.END}")
+            if scenario_info["instance"] is not None:
+                self._save_results(scenario_key, {}, scenario_info["instance"], status="error")
             return None
     
     def _show_scenario_hints(self, scenario_key: str):
@@ -144,51 +137,28 @@ class TqdmDemonstrator:
         Args:
             scenario_key: Ключ сценария
         """
-        hints = {
-            "1": [
-                "✓ Автоматическое создание прогресс-бара при оборачивании итератора",
-                "✓ Изменение описания (desc) в процессе работы",
-                "✓ Дополнительная информация справа (postfix)",
-                "✓ Цветовое оформление и единицы измерения",
-                "✓ Запись логов без поломки прогресс-бара"
-            ],
-            "2": [
-                "✓ Два уровня вложенности: общий прогресс и по файлам",
-                "✓ Параметр position для фиксации позиции баров",
-                "✓ leave=False для автоматического скрытия завершенных баров",
-                "✓ Обновление обоих баров одновременно",
-                "✓ Имитация реальной загрузки с меняющейся скоростью"
-            ],
-            "3": [
-                "✓ Ручное управление прогрессом через update()",
-                "✓ Работа с генераторами, где неизвестен total",
-                "✓ Множественные кастомные метрики в постфиксе",
-                "✓ Детальная статистика по времени выполнения",
-                "✓ Комбинирование с дополнительным выводом"
-            ]
-        }
+        scenario_info = self.scenarios.get(scenario_key)
+        hints = scenario_info["entry"].hints if scenario_info else []
         
-        for hint in hints.get(scenario_key, []):
+        for hint in hints:
             print(f"  {hint}")
     
-    def _save_results(self, scenario_key: str, results: Dict[str, Any]):
+    def _save_results(self, scenario_key: str, results: Dict[str, Any], scenario,
+                      status: str = "ok"):
         """
-        Сохраняет результаты выполнения.
+        Сохраняет результаты выполнения в историю запусков.
         
         Args:
             scenario_key: Ключ сценария
             results: Результаты выполнения
+            scenario: Экземпляр сценария (время начала и конца)
+            status: ok или error
         """
-        category = {
-            "1": "file",
-            "2": "network", 
-            "3": "processing"
-        }.get(scenario_key, "other")
-        
-        self.results_history[category].append({
-            "timestamp": time.time(),
-            "results": results
-        })
+        entry = self.scenarios[scenario_key]["entry"]
+        duration = max(0.0, scenario.end_time - scenario.start_time)
+        self.history.record(entry.name, results, duration,
+                            started_at=scenario.start_time or None, status=status,
+                            throughput=entry.throughput)
     
     def _show_scenario_summary(self, results: Dict[str, Any]):
         """
@@ -225,20 +195,46 @@ class TqdmDemonstrator:
         print(f"\n{Colors.CYAN}Время работы: {session_duration:.1f} секунд{Colors.END}")
         print(f"\n{Colors.BOLD}Выполнено сценариев:{Colors.END}")
         
+        session_runs = self.history.count_since(self.session_start)
         total_runs = 0
-        for category, runs in self.results_history.items():
-            count = len(runs)
+        for scenario in self.scenarios.values():
+            count = session_runs.get(scenario["name"], 0)
             total_runs += count
             if count > 0:
-                color = Colors.GREEN if category == "file" else Colors.BLUE if category == "network" else Colors.MAGENTA
-                print(f"  {color}• {category.capitalize()}: {count} запусков{Colors.END}")
+                print(f"  {scenario['color']}• {scenario['name']}: {count} запусков{Colors.END}")
         
         if total_runs > 0:
             print(f"\n{Colors.YELLOW}Всего демонстраций: {total_runs}{Colors.END}")
         
+        self._show_trends()
+        self.history.close()
+        
         print(f"\n{Colors.GREEN}Спасибо за использование демонстратора!{Colors.END}")
         print(f"{Colors.CYAN}Исследование библиотеки tqdm завершено.{Colors.END}\n")
     
+    def _show_trends(self, last: int = 30):
+        """
+        Показывает скорость сценариев за последние запуски из истории.
+        
+        Args:
+            last: Сколько последних запусков учитывать
+        """
+        lines = []
+        for scenario in self.scenarios.values():
+            trend = self.history.trend(scenario["name"], "per_sec", last)
+            overall = self.history.aggregate(scenario["name"], "duration_s")
+            if trend is None or overall is None:
+                continue
+            arrow = "↑" if trend["slope"] > 0 else "↓" if trend["slope"] < 0 else "→"
+            lines.append(
+                f"  {scenario['color']}• {scenario['name']}: {trend['mean']:.1f}/с "
+                f"за {trend['count']} запусков {arrow} "
+                f"(всего запусков: {overall['count']}){Colors.END}"
+            )
+        if lines:
+            print(f"\n{Colors.BOLD}История (скорость, последние {last}):{Colors.END}")
+            print("\n".join(lines))
+    
     def run(self):
         """
         Запускает основной цикл демонстратора.
@@ -248,7 +244,7 @@ class TqdmDemonstrator:
         while True:
             choice = self.show_menu()
             
-            if choice == "4":
+            if choice == self.exit_key:
                 self.show_farewell()
                 break
             
@@ -266,6 +262,7 @@ def main() -> int:
     Returns:
         int: Код возврата
     """
+    metrics.start_from_env()
     try:
         demonstrator = TqdmDemonstrator()
         demonstrator.run()
@@ -7,12 +7,9 @@
 import sys
 from typing import Optional
 
-from src.utils.console import Colors, print_header, print_menu, clear_screen, wait_for_enter
-from src.scenarios.file_scenario import FileProcessingScenario
-from src.scenarios.network_scenario import NetworkDownloadScenario
-from src.scenarios.processing_scenario import DataProcessingScenario
-from src.utils.storage_manager import StorageManager
-from src.utils.storage_console import StorageConsole
+from src.utils.console import Colors, header_lines, menu_lines, screen, wait_for_enter
+from src.scenarios.registry import default_registry
+from src.utils import metrics
 
 def main() -> int:
     """
@@ -21,51 +18,52 @@ def main() -> int:
     Returns:
         int: Код возврата (0 - успешно, 1 - ошибка)
     """
+    metrics.start_from_env()
+    registry = default_registry()
+    storage_key = registry.next_key()
+    exit_key = str(int(storage_key) + 1)
+    
+    menu_items = [(entry.name, entry.description) for entry in registry]
+    menu_items += [
+        ("Управление хранилищем", "Просмотр, удаление, архивация файлов"),
+        ("Выход", "Завершение программы")
+    ]
+    frame = header_lines("ДЕМОНСТРАТОР ВОЗМОЖНОСТЕЙ БИБЛИОТЕКИ TQDM")
+    frame += ["", f"{Colors.BOLD}Выберите сценарий для демонстрации:{Colors.END}", ""]
+    frame += menu_lines(menu_items)
+    # Менеджер хранилища создается при первом входе в меню и живет до
+    # выхода: файлы бэкенда в памяти и заглушка S3 сохраняются между входами
+    storage_mgr = None
     try:
         while True:
-            clear_screen()
-            print_header("ДЕМОНСТРАТОР ВОЗМОЖНОСТЕЙ БИБЛИОТЕКИ TQDM")
-            print(f"\n{Colors.BOLD}Выберите сценарий для демонстрации:{Colors.END}\n")
-            
-            menu_items = [
-                ("Обработка файлов", "Базовый прогресс-бар, пакетная обработка"),
-                ("Загрузка из сети", "Вложенные прогресс-бары, имитация загрузки"),
-                ("Обработка данных", "Ручное управление прогрессом, кастомные метрики"),
-                ("Управление хранилищем", "Просмотр, удаление, архивация файлов"),
-                ("Выход", "Завершение программы")
-            ]
-            
-            print_menu(menu_items)
+            # Меню не меняется: после неверного ввода кадр не перерисовывается
+            screen.draw(frame)
             
-            choice = input(f"\n{Colors.YELLOW}Введите номер пункта (1-5): {Colors.END}").strip()
+            choice = screen.input(f"\n{Colors.YELLOW}Введите номер пункта (1-{exit_key}): {Colors.END}").strip()
             
-            if choice == "1":
-                scenario = FileProcessingScenario()
-                scenario.run()
-                wait_for_enter()
-                
-            elif choice == "2":
-                scenario = NetworkDownloadScenario()
-                scenario.run()
-                wait_for_enter()
-                
-            elif choice == "3":
-                scenario = DataProcessingScenario()
+            if choice in registry:
+                # Модуль сценария импортируется только при первом выборе
+                scenario = registry.get(choice).create()
                 scenario.run()
                 wait_for_enter()
+                screen.invalidate()
                 
-            elif choice == "4":
-                storage_mgr = StorageManager()
+            elif choice == storage_key:
+                from src.utils.storage_manager import StorageManager
+                from src.utils.storage_console import StorageConsole
+                if storage_mgr is None:
+                    storage_mgr = StorageManager()
                 storage_console = StorageConsole(storage_mgr)
                 storage_console.run()
                 wait_for_enter()
+                screen.invalidate()
                 
-            elif choice == "5":
+            elif choice == exit_key:
                 print(f"\n{Colors.GREEN}Программа завершена.{Colors.END}")
                 break
                 
             else:
-                print(f"\n{Colors.RED}Неверный выбор. Пожалуйста, введите 1-5.{Colors.END}")
+                screen.print(f"\n{Colors.RED}Неверный выбор. Пожалуйста, введите 1-{exit_key}.{Colors.END}")
                 wait_for_enter()
                 
     except KeyboardInterrupt:
@@ -74,6 +72,9 @@ def main() -> int:
     except Exception as e:
         print(f"\n{Colors.RED}Критическая ошибка: {e}{Colors.END}")
         return 1
+    finally:
+        if storage_mgr is not None:
+            storage_mgr.close()
     
     return 0
 
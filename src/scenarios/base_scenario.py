@@ -5,26 +5,63 @@
 
 from abc import ABC, abstractmethod
 from typing import Dict, Any
-import time
+
+from src.utils import headless
+from src.utils import metrics
+from src.utils.tracing import Tracer
+from src.utils.clock import RealClock, get_clock
 
 class BaseScenario(ABC):
     
-    def __init__(self, name: str, description: str):
+    def __init__(self, name: str, description: str, clock: RealClock = None):
         self.name = name
         self.description = description
+        self.clock = clock or get_clock()
         self.start_time = 0
         self.end_time = 0
+        self.tracer = Tracer.from_env()
+        self.trace_files: Dict[str, str] = {}
+        self._root_span = None
+    
+    def span(self, name: str, profile: bool = None, memory: bool = None):
+        """
+        Именованная фаза сценария (может быть вложенной).
+        
+        Args:
+            name: Имя фазы
+            profile: Включить cProfile для фазы (None - по TQDM_DEMO_PROFILE)
+            memory: Учитывать память через tracemalloc (None - по TQDM_DEMO_TRACEMALLOC)
+        """
+        return self.tracer.span(name, profile=profile, memory=memory)
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = self.clock.time()
+        self.tracer.reset()
+        self._root_span = self.tracer.span(self.name, profile=False)
+        self._root_span.__enter__()
+        metrics.SCENARIO_ACTIVE.labels(self.name).set(1)
+        if headless.is_headless():
+            headless.set_scenario(self.name)
+            headless.emit("scenario_start", stage=self.description)
         print(f"\n=== Запуск сценария: {self.name} ===")
         print(f"Описание: {self.description}\n")
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.time()
+        self.end_time = self.clock.time()
         duration = self.end_time - self.start_time
+        self._root_span.__exit__(exc_type, exc_val, exc_tb)
+        self.trace_files = self.tracer.save(self.name)
         print(f"\n=== Сценарий завершен за {duration:.2f}с ===\n")
+        if self.trace_files:
+            print(f"Трассировка: {self.trace_files['chrome']}")
+        metrics.SCENARIO_ACTIVE.labels(self.name).set(0)
+        metrics.SCENARIO_DURATION.labels(self.name).observe(duration)
+        metrics.SCENARIO_RUNS.labels(self.name, "error" if exc_type else "ok").inc()
+        if headless.is_headless():
+            headless.emit("scenario_end", duration=round(duration, 3),
+                          error=repr(exc_val) if exc_val else None)
+            headless.set_scenario(None)
     
     @abstractmethod
     def run(self) -> Dict[str, Any]:
@@ -4,71 +4,91 @@
 """
 
 import os
-import time
-import random
-from tqdm import tqdm
 from typing import Dict, Any, List
 
 from src.scenarios.base_scenario import BaseScenario
 from src.utils.file_generator import FileGenerator
 from src.utils.console import Colors, Style
+from src.utils.latency import LatencyHistogram
+from src.utils.progress import FastProgress
+from src.utils import metrics
+from src.utils.clock import RealClock
 
 class FileProcessingScenario(BaseScenario):
     
-    def __init__(self):
+    def __init__(self, simulate_latency: bool = True, base_dir: str = "storage",
+                 file_count: int = 20, clock: RealClock = None):
         super().__init__(
             "Обработка файлов",
-            "Реальная обработка файлов с сохранением результатов в storage/processed/"
+            "Реальная обработка файлов с сохранением результатов в storage/processed/",
+            clock
         )
-        self.file_generator = FileGenerator()
+        self.simulate_latency = simulate_latency
+        self.file_count = file_count
+        self.file_generator = FileGenerator(base_dir)
     
     def run(self) -> Dict[str, Any]:
         with self:
             self.file_generator.show_storage_status()
             
-            print(f"\n{Colors.YELLOW}ШАГ 1: Генерация тестовых файлов{Style.RESET_ALL}")
-            test_files = self.file_generator.generate_test_files(
-                count=20,
-                extensions=['.txt', '.log', '.dat', '.csv', '.tmp']
-            )
+            with self.span("Генерация"):
+                print(f"\n{Colors.YELLOW}ШАГ 1: Генерация тестовых файлов{Style.RESET_ALL}")
+                test_files = self.file_generator.generate_test_files(
+                    count=self.file_count,
+                    extensions=['.txt', '.log', '.dat', '.csv', '.tmp']
+                )
             
-            print(f"\n{Colors.YELLOW}ШАГ 2: Обработка файлов{Style.RESET_ALL}")
-            successful = 0
-            failed = 0
-            processed_paths = []
-            
-            with tqdm(
-                total=len(test_files),
-                desc="Обработка файлов",
-                unit="файл",
-                colour="green",
-                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
-            ) as pbar:
+            with self.span("Обработка"):
+                print(f"\n{Colors.YELLOW}ШАГ 2: Обработка файлов{Style.RESET_ALL}")
+                successful = 0
+                failed = 0
+                processed_paths = []
+                latency = LatencyHistogram()
+                processed_ok = metrics.FILES_PROCESSED.labels("ok")
+                processed_error = metrics.FILES_PROCESSED.labels("error")
                 
-                for file_path in test_files:
-                    filename = os.path.basename(file_path)
-                    pbar.set_description(f"Обработка {filename}")
-                    
-                    time.sleep(random.uniform(0.3, 0.8))
-                    
-                    success, result = self.file_generator.process_file(file_path)
-                    
-                    if success:
-                        successful += 1
-                        processed_paths.append(result)
-                        pbar.set_postfix(успешно=successful, ошибок=failed)
-                    else:
-                        failed += 1
-                        pbar.set_postfix(успешно=successful, ошибок=failed)
-                        pbar.write(f"   ⚠️ Ошибка обработки {filename}: {result}")
+                with FastProgress(
+                    total=len(test_files),
+                    desc="Обработка файлов",
+                    unit="файл",
+                    colour="green",
+                    clock=self.clock,
+                    bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}{postfix}]"
+                ) as pbar:
+                    pbar.postfix_from(lambda: {"успешно": successful, "ошибок": failed,
+                                               **latency.postfix()})
                     
-                    pbar.update(1)
+                    for file_path in test_files:
+                        filename = os.path.basename(file_path)
+                        pbar.set_description(f"Обработка {filename}")
+                        
+                        start_time = self.clock.perf()
+                        if self.simulate_latency:
+                            self.clock.sleep(self.clock.random.uniform(0.3, 0.8))
+                        
+                        success, result = self.file_generator.process_file(file_path)
+                        elapsed = self.clock.perf() - start_time
+                        latency.record(elapsed)
+                        metrics.FILE_LATENCY.observe(elapsed)
+                        
+                        if success:
+                            successful += 1
+                            processed_paths.append(result)
+                            processed_ok.inc()
+                        else:
+                            failed += 1
+                            processed_error.inc()
+                            pbar.write(f"   ⚠️ Ошибка обработки {filename}: {result}")
+                        
+                        pbar.update(1)
             
-            print(f"\n{Colors.YELLOW}ШАГ 3: Результаты{Style.RESET_ALL}")
-            print(f"\n{Colors.GREEN}Обработано успешно: {successful}, ошибок: {failed}{Style.RESET_ALL}")
+            with self.span("Результаты"):
+                print(f"\n{Colors.YELLOW}ШАГ 3: Результаты{Style.RESET_ALL}")
+                print(f"\n{Colors.GREEN}Обработано успешно: {successful}, ошибок: {failed}{Style.RESET_ALL}")
             
-            print(f"\n{Colors.YELLOW}ШАГ 4: Очистка временных файлов{Style.RESET_ALL}")
-            self.file_generator.cleanup_temp()
+            with self.span("Очистка"):
+                print(f"\n{Colors.YELLOW}ШАГ 4: Очистка временных файлов{Style.RESET_ALL}")
+                self.file_generator.cleanup_temp()
             
             self.file_generator.show_storage_status()
             
@@ -76,5 +96,6 @@ class FileProcessingScenario(BaseScenario):
                 "total": len(test_files),
                 "successful": successful,
                 "failed": failed,
-                "success_rate": f"{(successful/len(test_files))*100:.1f}%"
+                "success_rate": f"{(successful/len(test_files))*100:.1f}%",
+                "latency_ms": latency.to_dict()
             }
\ No newline at end of file
@@ -3,57 +3,86 @@
 Сценарий имитации сетевых загрузок.
 """
 
-import time
-import random
 from tqdm import tqdm
 from typing import Dict, Any, List, Tuple
 
 from src.scenarios.base_scenario import BaseScenario
 from src.utils.console import Colors, Style
+from src.utils.resilience import ResilientFetcher, RetryPolicy, RetryBudget, TransferError
+from src.utils.latency import LatencyHistogram
+from src.utils.headless import progress_bar
+from src.utils import metrics
+from src.utils.simulated_server import SimulatedServer
+from src.utils.clock import RealClock
 
 class NetworkDownloadScenario(BaseScenario):
     
-    def __init__(self):
+    def __init__(self, server: SimulatedServer = None, policy: RetryPolicy = None,
+                 hedging: bool = True, simulate_latency: bool = True,
+                 clock: RealClock = None):
         super().__init__(
             "Сетевые загрузки",
-            "Демонстрация вложенных прогресс-баров"
+            "Демонстрация вложенных прогресс-баров",
+            clock
         )
         
+        self.simulate_latency = simulate_latency
+        self.server = server or SimulatedServer(
+            slow_rate=0.03, reset_rate=0.02, error_rate=0.02,
+            time_scale=1.0 if simulate_latency else 0.0,
+            seed=self.clock.seed, clock=self.clock
+        )
+        self.policy = policy or RetryPolicy(budget=RetryBudget())
+        self.hedging = hedging
+        
         self.files_to_download = [
-            {"name": "document.pdf", "size": random.randint(100, 500)},
-            {"name": "image.jpg", "size": random.randint(50, 200)},
-            {"name": "video.mp4", "size": random.randint(1000, 5000)},
-            {"name": "archive.zip", "size": random.randint(500, 2000)},
-            {"name": "music.mp3", "size": random.randint(30, 100)},
+            {"name": "document.pdf", "size": self.clock.random.randint(100, 500)},
+            {"name": "image.jpg", "size": self.clock.random.randint(50, 200)},
+            {"name": "video.mp4", "size": self.clock.random.randint(1000, 5000)},
+            {"name": "archive.zip", "size": self.clock.random.randint(500, 2000)},
+            {"name": "music.mp3", "size": self.clock.random.randint(30, 100)},
         ]
     
-    def simulate_chunk_download(self, chunk_size: int) -> float:
-        speed = random.uniform(50, 200)
-        time.sleep(chunk_size / speed)
-        return speed
-    
     def download_file(self, file_info: Dict[str, Any], 
-                     overall_progress: tqdm) -> Tuple[bool, float]:
+                     overall_progress: tqdm, fetcher: ResilientFetcher,
+                     latency: LatencyHistogram = None) -> Tuple[bool, float]:
         
         file_name = file_info["name"]
         file_size = file_info["size"]
         chunk_size = 50
         chunks = (file_size + chunk_size - 1) // chunk_size
         speeds = []
+        if latency is None:
+            latency = LatencyHistogram()
         
-        with tqdm(
+        with progress_bar(
             total=file_size,
             desc=f"  Загрузка {file_name}",
             unit="KB",
             unit_scale=True,
             leave=False,
             position=1,
-            colour="blue"
+            colour="blue",
+            clock=self.clock
         ) as file_progress:
             
             for chunk in range(chunks):
-                current_chunk_size = min(chunk_size, file_size - chunk * chunk_size)
-                speed = self.simulate_chunk_download(current_chunk_size)
+                start = chunk * chunk_size
+                end = min(start + chunk_size, file_size)
+                current_chunk_size = end - start
+                chunk_start = self.clock.perf()
+                try:
+                    speed = fetcher.call(
+                        lambda cancel, start=start, end=end:
+                            self.server.fetch_range(file_name, start, end, cancel)
+                    )
+                except TransferError as e:
+                    file_progress.write(f"   ⚠️ Ошибка загрузки {file_name}: {e}")
+                    return False, sum(speeds) / len(speeds) if speeds else 0.0
+                chunk_elapsed = self.clock.perf() - chunk_start
+                latency.record(chunk_elapsed)
+                metrics.DOWNLOAD_CHUNK_LATENCY.observe(chunk_elapsed)
+                metrics.DOWNLOAD_BYTES.inc(current_chunk_size * 1024)
                 speeds.append(speed)
                 
                 file_progress.update(current_chunk_size)
@@ -62,7 +91,9 @@ class NetworkDownloadScenario(BaseScenario):
                 avg_speed = sum(speeds[-5:]) / len(speeds[-5:])
                 file_progress.set_postfix(
                     скорость=f"{avg_speed:.1f} KB/s",
-                    чанк=f"{chunk+1}/{chunks}"
+                    чанк=f"{chunk+1}/{chunks}",
+                    повторов=fetcher.stats["retries"],
+                    **latency.postfix((99,))
                 )
         
         return True, sum(speeds) / len(speeds)
@@ -75,32 +106,59 @@ class NetworkDownloadScenario(BaseScenario):
             print(f"Общий размер: {total_size} KB ({total_size/1024:.2f} MB)\n")
             
             download_results = []
+            completion_times = LatencyHistogram()
+            chunk_latency = LatencyHistogram()
+            failed = 0
             
-            with tqdm(
+            with ResilientFetcher(self.policy, hedging=self.hedging,
+                                  clock=self.clock) as fetcher, progress_bar(
                 total=total_size,
                 desc="Общий прогресс",
                 unit="KB",
                 unit_scale=True,
                 colour="cyan",
-                position=0
+                position=0,
+                clock=self.clock
             ) as overall_progress:
                 
                 for file_info in self.files_to_download:
-                    success, avg_speed = self.download_file(file_info, overall_progress)
+                    started = self.clock.perf()
+                    file_latency = LatencyHistogram()
+                    with self.span(f"Загрузка {file_info['name']}"):
+                        success, avg_speed = self.download_file(
+                            file_info, overall_progress, fetcher, file_latency
+                        )
+                    completion_times.record(self.clock.perf() - started)
+                    chunk_latency.merge(file_latency)
+                    overall_progress.set_postfix(**chunk_latency.postfix((50, 99)))
                     
+                    metrics.DOWNLOAD_FILES.labels("ok" if success else "error").inc()
                     if success:
                         download_results.append({
                             "name": file_info["name"],
                             "size": file_info["size"],
                             "speed": avg_speed
                         })
+                    else:
+                        failed += 1
                     
-                    time.sleep(0.5)
+                    if self.simulate_latency:
+                        self.clock.sleep(0.5)
+                
+                fetch_stats = fetcher.snapshot()
             
             print(f"\n{Colors.GREEN}Загрузка завершена{Style.RESET_ALL}")
             
             return {
                 "total_files": len(self.files_to_download),
                 "total_size_kb": total_size,
-                "successful": len(download_results)
+                "successful": len(download_results),
+                "failed": failed,
+                "retries": fetch_stats["retries"],
+                "hedged": fetch_stats["hedged"],
+                "hedge_wins": fetch_stats["hedge_wins"],
+                "timeouts": fetch_stats["timeouts"],
+                "p50_file_s": completion_times.percentile(50),
+                "p99_file_s": completion_times.percentile(99),
+                "chunk_latency_ms": chunk_latency.to_dict()
             }
\ No newline at end of file
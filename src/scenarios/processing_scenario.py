@@ -3,81 +3,429 @@
 Сценарий обработки данных.
 """
 
+import os
 import time
-import random
-from tqdm import tqdm
-from typing import Dict, Any, List, Generator
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Generator, AsyncGenerator, Sequence, Optional, Tuple
+from functools import partial
+from itertools import islice
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from src.scenarios.base_scenario import BaseScenario
 from src.utils.console import Colors, Style, print_progress_info
+from src.utils.parallel import parallel_map
+from src.utils.columnar import ColumnarResults
+from src.utils.latency import LatencyHistogram
+from src.utils.memo import MemoCache
+from src.utils.progress import FastProgress
+from src.utils.shared_progress import SharedProgress
+from src.utils.headless import progress_bar
+from src.utils import metrics
+from src.utils.clock import RealClock, get_clock
+
+def calculate(data: int, simulate_latency: bool = False,
+              clock: Optional[RealClock] = None) -> Dict[str, float]:
+    """Расчет производных величин для одного значения (функция уровня модуля для пула процессов)."""
+    if simulate_latency:
+        clock = clock or get_clock()
+        clock.sleep(clock.random.uniform(0.05, 0.2))
+    return {
+        "value": data,
+        "sqrt": math.sqrt(data if data > 0 else 1),
+        "log": math.log(data + 1),
+        "sin": math.sin(data),
+        "cos": math.cos(data)
+    }
+
+def timed_calculation(data: int, simulate_latency: bool = False,
+                      clock: Optional[RealClock] = None) -> Tuple[Dict[str, float], float]:
+    """Расчет с замером времени внутри воркера (по часам clock, копия которых есть у воркера)."""
+    clock = clock or get_clock()
+    start_time = clock.perf()
+    result = calculate(data, simulate_latency, clock)
+    return result, clock.perf() - start_time
 
 class DataProcessingScenario(BaseScenario):
     
-    def __init__(self):
+    def __init__(self, simulate_latency: bool = True, cache: Optional[MemoCache] = None,
+                 clock: RealClock = None):
         super().__init__(
             "Обработка данных",
-            "Ручное управление прогрессом и кастомные метрики"
+            "Ручное управление прогрессом и кастомные метрики",
+            clock
         )
+        self.simulate_latency = simulate_latency
+        self.cache = cache
     
     def data_generator(self, count: int) -> Generator[int, None, None]:
         for i in range(count):
-            time.sleep(random.uniform(0.01, 0.05))
-            yield i * random.randint(1, 100)
+            if self.simulate_latency:
+                self.clock.sleep(self.clock.random.uniform(0.01, 0.05))
+            yield i * self.clock.random.randint(1, 100)
+    
+    async def async_data_generator(self, count: int) -> AsyncGenerator[int, None]:
+        """Асинхронный вариант data_generator: задержка не блокирует цикл событий."""
+        for i in range(count):
+            if self.simulate_latency:
+                await self.clock.async_sleep(self.clock.random.uniform(0.01, 0.05))
+            yield i * self.clock.random.randint(1, 100)
+    
+    def iter_batches(self, count: int, batch_size: int) -> Generator[List[int], None, None]:
+        """Нарезает поток data_generator на блоки по batch_size элементов."""
+        source = self.data_generator(count)
+        while True:
+            block = list(islice(source, batch_size))
+            if not block:
+                return
+            yield block
     
     def complex_calculation(self, data: int) -> Dict[str, float]:
-        time.sleep(random.uniform(0.05, 0.2))
+        if self.cache is None:
+            return calculate(data, self.simulate_latency, self.clock)
+        return self.cache.get_or_compute(
+            data, lambda: calculate(data, self.simulate_latency, self.clock)
+        )
+    
+    async def complex_calculation_async(self, data: int) -> Dict[str, float]:
+        """Асинхронный вариант complex_calculation для конвейера run_async."""
+        if self.cache is not None:
+            cached = self.cache.get(data)
+            if cached is not None:
+                return cached
+        if self.simulate_latency:
+            await self.clock.async_sleep(self.clock.random.uniform(0.05, 0.2))
+        result = calculate(data)
+        if self.cache is not None:
+            self.cache.put(data, result)
+        return result
+    
+    def complex_calculation_batch(self, values: Sequence[int]) -> Dict[str, Any]:
+        """
+        Векторизованный вариант complex_calculation для блока значений.
+        
+        Args:
+            values: Блок входных значений
+            
+        Returns:
+            Dict[str, Any]: Колонки value/sqrt/log/sin/cos (массивы NumPy,
+            или списки, если NumPy не установлен)
+        """
+        if np is None:
+            return {
+                "value": list(values),
+                "sqrt": [math.sqrt(v if v > 0 else 1) for v in values],
+                "log": [math.log(v + 1) for v in values],
+                "sin": [math.sin(v) for v in values],
+                "cos": [math.cos(v) for v in values]
+            }
+        
+        data = np.asarray(values, dtype=np.int64)
+        as_float = data.astype(np.float64)
         return {
             "value": data,
-            "sqrt": math.sqrt(data if data > 0 else 1),
-            "log": math.log(data + 1),
-            "sin": math.sin(data),
-            "cos": math.cos(data)
+            "sqrt": np.sqrt(np.where(data > 0, as_float, 1.0)),
+            "log": np.log(as_float + 1.0),
+            "sin": np.sin(as_float),
+            "cos": np.cos(as_float)
         }
     
-    def run(self) -> Dict[str, Any]:
+    def run_batch(self, data_count: int = 100, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Пакетный режим: блоки из data_generator считаются за один
+        векторизованный проход, прогресс-бар обновляется раз на блок.
+        """
         with self:
-            data_count = 100
-            print(f"Генерация {data_count} элементов...")
+            print(f"Генерация {data_count} элементов блоками по {batch_size}...")
+            if np is None:
+                print(f"{Colors.YELLOW}NumPy не установлен, используется поэлементный расчет{Style.RESET_ALL}")
             
-            results = []
-            processing_stats = {
-                "min_time": float('inf'),
-                "max_time": 0,
-                "total_time": 0
-            }
+            results = ColumnarResults()
+            batches = 0
+            calc_time = 0.0
+            items_metric = metrics.ITEMS_PROCESSED.labels("batch")
             
-            with tqdm(
+            with progress_bar(
                 total=data_count,
-                desc="Обработка данных",
+                desc="Пакетная обработка",
                 unit="элемент",
-                colour="magenta"
+                unit_scale=True,
+                colour="magenta",
+                clock=self.clock
             ) as pbar:
                 
-                for i, data in enumerate(self.data_generator(data_count)):
-                    start_time = time.time()
-                    result = self.complex_calculation(data)
-                    process_time = time.time() - start_time
+                for block in self.iter_batches(data_count, batch_size):
+                    # Векторизованный расчет не содержит имитируемых задержек,
+                    # поэтому его стоимость всегда меряется реальным временем
+                    start_time = time.perf_counter()
+                    columns = self.complex_calculation_batch(block)
+                    calc_time += time.perf_counter() - start_time
                     
-                    processing_stats["min_time"] = min(processing_stats["min_time"], process_time)
-                    processing_stats["max_time"] = max(processing_stats["max_time"], process_time)
-                    processing_stats["total_time"] += process_time
-                    
-                    results.append(result)
+                    results.extend(columns)
+                    batches += 1
+                    items_metric.inc(len(block))
                     
                     pbar.set_postfix(
-                        min=f"{processing_stats['min_time']*1000:.1f}ms",
-                        max=f"{processing_stats['max_time']*1000:.1f}ms",
-                        avg=f"{(processing_stats['total_time']/(i+1))*1000:.1f}ms"
+                        блок=len(block),
+                        расчет=f"{len(results) / calc_time:,.0f} эл/с" if calc_time else "-"
                     )
+                    pbar.update(len(block))
+            
+            print(f"\n{Colors.GREEN}Обработка завершена{Style.RESET_ALL}")
+            
+            return {
+                "processed_items": len(results),
+                "batches": batches,
+                "batch_size": batch_size,
+                "calc_time_ms": calc_time * 1000,
+                "items_per_sec": len(results) / calc_time if calc_time else 0.0,
+                "result_bytes": results.nbytes
+            }
+    
+    def run_parallel(self, data_count: int = 100, workers: Optional[int] = None,
+                     ordered: bool = True, shared_bars: bool = False) -> Dict[str, Any]:
+        """
+        Параллельный режим: complex_calculation выполняется в пуле процессов.
+        
+        Args:
+            data_count: Количество элементов
+            workers: Число процессов (по умолчанию - число ядер)
+            ordered: True - результаты в исходном порядке, False - по готовности
+            shared_bars: Прогресс из разделяемой памяти: общий бар и бар на
+                         каждого воркера, обновляемые самими воркерами
+            
+        Returns:
+            Dict[str, Any]: Результаты, включая ускорение относительно
+            последовательного выполнения тех же операций
+        """
+        with self:
+            workers = workers or os.cpu_count() or 1
+            print(f"Генерация {data_count} элементов, воркеров: {workers}...")
+            
+            results = ColumnarResults()
+            latency = LatencyHistogram()
+            generate_time = 0.0
+            pool_stats: Dict[str, Any] = {}
+            items_metric = metrics.ITEMS_PROCESSED.labels("parallel")
+            
+            def timed_source():
+                nonlocal generate_time
+                source = self.data_generator(data_count)
+                while True:
+                    start_time = self.clock.perf()
+                    data = next(source, None)
+                    generate_time += self.clock.perf() - start_time
+                    if data is None:
+                        return
+                    yield data
+            
+            bar_kwargs = {"total": data_count, "desc": "Параллельная обработка",
+                          "unit": "элемент", "colour": "magenta", "clock": self.clock}
+            if shared_bars:
+                pbar = SharedProgress(workers=workers, **bar_kwargs)
+            else:
+                pbar = progress_bar(**bar_kwargs)
+            
+            pool_broken = False
+            wall_start = self.clock.perf()
+            with pbar:
+                func = partial(timed_calculation, simulate_latency=self.simulate_latency,
+                               clock=self.clock)
+                try:
+                    for chunk in parallel_map(func, timed_source(), workers=workers,
+                                              ordered=ordered, stats=pool_stats,
+                                              progress=pbar if shared_bars else None):
+                        chunk_time = 0.0
+                        for result, process_time in chunk:
+                            latency.record(process_time)
+                            results.append(result)
+                            chunk_time += process_time
+                        items_metric.inc(len(chunk))
+                        if self.clock.virtual:
+                            # Воркеры спят по своим копиям часов; чанки идут
+                            # параллельно, поэтому общее время растет в workers раз медленнее
+                            self.clock.advance(chunk_time / workers)
+                        
+                        pbar.set_postfix(
+                            **latency.postfix((50, 90, 99)),
+                            чанк=pool_stats.get("chunk_size", 0)
+                        )
+                        if not shared_bars:
+                            pbar.update(len(chunk))
+                except BrokenProcessPool as e:
+                    pool_broken = True
+                    print(f"\n{Colors.RED}Пул процессов остановлен: {e}{Style.RESET_ALL}")
+            wall_time = self.clock.perf() - wall_start
+            
+            print(f"\n{Colors.GREEN}Обработка завершена{Style.RESET_ALL}")
+            
+            serial_time = generate_time + latency.total
+            stats = latency.to_dict()
+            return {
+                "processed_items": len(results),
+                "avg_time_ms": stats["avg"],
+                "min_time_ms": stats["min"],
+                "max_time_ms": stats["max"],
+                "latency_ms": stats,
+                "chunks": pool_stats.get("chunks", 0),
+                "wall_time_s": wall_time,
+                "serial_time_s": serial_time,
+                "speedup": serial_time / wall_time if wall_time else 0.0,
+                "result_bytes": results.nbytes,
+                "pool_broken": pool_broken,
+                "workers_lost": pbar.lost_workers if shared_bars else 0
+            }
+    
+    def run_async(self, data_count: int = 100, consumers: int = 4,
+                  queue_size: int = 16) -> Dict[str, Any]:
+        """
+        Конвейер на asyncio: производитель заполняет ограниченную очередь,
+        N потребителей обрабатывают элементы параллельно.
+        
+        Args:
+            data_count: Количество элементов
+            consumers: Число потребителей
+            queue_size: Емкость очереди (при заполнении производитель ждет)
+            
+        Returns:
+            Dict[str, Any]: Результаты с временем производства, обработки и
+            общим временем конвейера
+        """
+        with self:
+            print(f"Генерация {data_count} элементов, потребителей: {consumers}...")
+            return asyncio.run(self._run_pipeline(data_count, consumers, queue_size))
+    
+    async def _run_pipeline(self, data_count: int, consumers: int,
+                            queue_size: int) -> Dict[str, Any]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        results = ColumnarResults()
+        latency = LatencyHistogram()
+        items_metric = metrics.ITEMS_PROCESSED.labels("async")
+        state = {
+            "produce_time": 0.0,
+            "consume_time": 0.0,
+            "blocked": False,
+            "backpressure_events": 0,
+            "blocked_time": 0.0
+        }
+        
+        with FastProgress(
+            total=data_count,
+            desc="Конвейер asyncio",
+            unit="элемент",
+            colour="magenta",
+            clock=self.clock
+        ) as pbar:
+            pbar.postfix_from(lambda: {
+                "очередь": f"{queue.qsize()}/{queue_size}",
+                "давление": "⛔" if state["blocked"] else "ok",
+                **latency.postfix((50, 99))
+            })
+            
+            async def produce():
+                started = self.clock.perf()
+                async for data in self.async_data_generator(data_count):
+                    if queue.full():
+                        state["blocked"] = True
+                        state["backpressure_events"] += 1
+                        blocked_at = self.clock.perf()
+                        await self.clock.blocked(queue.put(data))
+                        state["blocked_time"] += self.clock.perf() - blocked_at
+                        state["blocked"] = False
+                    else:
+                        queue.put_nowait(data)
+                for _ in range(consumers):
+                    await self.clock.blocked(queue.put(None))
+                state["produce_time"] = self.clock.perf() - started - state["blocked_time"]
+            
+            async def consume():
+                while True:
+                    data = await self.clock.blocked(queue.get())
+                    if data is None:
+                        return
+                    start_time = self.clock.perf()
+                    result = await self.complex_calculation_async(data)
+                    process_time = self.clock.perf() - start_time
+                    state["consume_time"] += process_time
                     
+                    latency.record(process_time)
+                    results.append(result)
+                    items_metric.inc()
                     pbar.update(1)
             
+            wall_start = self.clock.perf()
+            await asyncio.gather(produce(), *(consume() for _ in range(consumers)))
+            wall_time = self.clock.perf() - wall_start
+        
+        print(f"\n{Colors.GREEN}Обработка завершена{Style.RESET_ALL}")
+        
+        stats = latency.to_dict()
+        return {
+            "processed_items": len(results),
+            "consumers": consumers,
+            "wall_time_s": wall_time,
+            "produce_time_s": state["produce_time"],
+            "consume_time_s": state["consume_time"] / consumers,
+            "serial_time_s": state["produce_time"] + state["consume_time"],
+            "backpressure_events": state["backpressure_events"],
+            "latency_ms": stats,
+            "result_bytes": results.nbytes
+        }
+    
+    def run(self, data_count: int = 100) -> Dict[str, Any]:
+        with self:
+            print(f"Генерация {data_count} элементов...")
+            
+            results = ColumnarResults()
+            latency = LatencyHistogram()
+            items_metric = metrics.ITEMS_PROCESSED.labels("serial")
+            
+            def postfix() -> Dict[str, str]:
+                fields = latency.postfix((50, 90, 99))
+                if self.cache is not None:
+                    fields.update(self.cache.postfix())
+                return fields
+            
+            with FastProgress(
+                total=data_count,
+                desc="Обработка данных",
+                unit="элемент",
+                colour="magenta",
+                clock=self.clock
+            ) as pbar:
+                pbar.postfix_from(postfix)
+                
+                for data in pbar.iterate(self.data_generator(data_count)):
+                    start_time = self.clock.perf()
+                    result = self.complex_calculation(data)
+                    process_time = self.clock.perf() - start_time
+                    
+                    latency.record(process_time)
+                    items_metric.inc()
+                    
+                    results.append(result)
+            
+            if self.cache is not None:
+                self.cache.flush()
+            
             print(f"\n{Colors.GREEN}Обработка завершена{Style.RESET_ALL}")
             
+            stats = latency.to_dict()
             return {
                 "processed_items": len(results),
-                "avg_time_ms": (processing_stats['total_time']/len(results))*1000,
-                "min_time_ms": processing_stats['min_time']*1000,
-                "max_time_ms": processing_stats['max_time']*1000
-            }
\ No newline at end of file
+                "avg_time_ms": stats["avg"],
+                "min_time_ms": stats["min"],
+                "max_time_ms": stats["max"],
+                "latency_ms": stats,
+                "result_bytes": results.nbytes,
+                "cache": self.cache.stats() if self.cache is not None else {}
+            }
+
+def create_scenario(simulate_latency: bool = True, clock: RealClock = None) -> DataProcessingScenario:
+    """Сценарий для меню: с кэшем мемоизации в памяти."""
+    return DataProcessingScenario(simulate_latency=simulate_latency, cache=MemoCache(), clock=clock)
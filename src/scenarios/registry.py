@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Реестр сценариев меню.
+Для каждого пункта хранится только путь "модуль:фабрика", поэтому
+модуль сценария (и его tqdm, numpy, asyncio) импортируется только
+при первом запуске сценария, а не при показе меню.
+
+Сторонние сценарии подключаются через entry points группы
+tqdm_demo.scenarios, если задана переменная окружения TQDM_DEMO_PLUGINS=1
+(поиск пакетов сам по себе заметно замедляет старт).
+"""
+
+import importlib
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ENTRY_POINT_GROUP = "tqdm_demo.scenarios"
+
+
+class ScenarioEntry:
+    """
+    Пункт меню: описание сценария и отложенная ссылка на его фабрику.
+    """
+
+    def __init__(self, key: str, name: str, description: str, target: str,
+                 color: str = "", hints: Optional[List[str]] = None,
+                 throughput: Optional[str] = None):
+        """
+        Инициализация.
+
+        Args:
+            key: Клавиша пункта меню
+            name: Название сценария
+            description: Описание для меню
+            target: Фабрика в виде "пакет.модуль:имя"
+            color: Имя цвета из Colors (GREEN, BLUE, ...)
+            hints: Подсказки, что показывает сценарий
+            throughput: Ключ результата со счетчиком обработанного
+                        (для скорости в истории запусков)
+        """
+        self.key = key
+        self.name = name
+        self.description = description
+        self.target = target
+        self.color = color
+        self.hints = hints or []
+        self.throughput = throughput
+        self._factory: Optional[Callable[..., Any]] = None
+
+    def load(self) -> Callable[..., Any]:
+        """Импортирует модуль сценария и возвращает фабрику."""
+        if self._factory is None:
+            module_name, _, attr = self.target.partition(":")
+            factory: Any = importlib.import_module(module_name)
+            for part in attr.split("."):
+                factory = getattr(factory, part)
+            self._factory = factory
+        return self._factory
+
+    def create(self, **kwargs: Any):
+        return self.load()(**kwargs)
+
+    @property
+    def loaded(self) -> bool:
+        return self._factory is not None
+
+
+class ScenarioRegistry:
+    """
+    Упорядоченный набор пунктов меню.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ScenarioEntry] = {}
+        self._plugins_loaded = False
+
+    def register(self, key: str, name: str, description: str, target: str,
+                 color: str = "", hints: Optional[List[str]] = None,
+                 throughput: Optional[str] = None) -> ScenarioEntry:
+        entry = ScenarioEntry(key, name, description, target, color, hints, throughput)
+        self._entries[key] = entry
+        return entry
+
+    def get(self, key: str) -> Optional[ScenarioEntry]:
+        return self._entries.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[ScenarioEntry]:
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def next_key(self) -> str:
+        numeric = [int(key) for key in self._entries if key.isdigit()]
+        return str(max(numeric, default=0) + 1)
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """
+        Добавляет сценарии из entry points. Значение entry point -
+        "модуль:фабрика", имя - название пункта меню.
+
+        Returns:
+            int: Число добавленных сценариев
+        """
+        if self._plugins_loaded:
+            return 0
+        self._plugins_loaded = True
+
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=group)
+        except TypeError:
+            # Python < 3.10: entry_points() возвращает словарь групп
+            found = entry_points().get(group, [])
+
+        added = 0
+        for entry_point in found:
+            self.register(self.next_key(), entry_point.name,
+                          f"Плагин {entry_point.value}", entry_point.value, "CYAN")
+            added += 1
+        return added
+
+
+def _plugins_enabled() -> bool:
+    return os.environ.get("TQDM_DEMO_PLUGINS", "").strip().lower() in ("1", "true", "yes")
+
+
+def default_registry() -> ScenarioRegistry:
+    """Встроенные сценарии (и плагины, если они включены)."""
+    registry = ScenarioRegistry()
+    registry.register(
+        "1", "Обработка файлов",
+        "Базовый прогресс-бар, пакетная обработка, настройка внешнего вида",
+        "src.scenarios.file_scenario:FileProcessingScenario", "GREEN",
+        [
+            "✓ Автоматическое создание прогресс-бара при оборачивании итератора",
+            "✓ Изменение описания (desc) в процессе работы",
+            "✓ Дополнительная информация справа (postfix)",
+            "✓ Цветовое оформление и единицы измерения",
+            "✓ Запись логов без поломки прогресс-бара"
+        ],
+        throughput="successful"
+    )
+    registry.register(
+        "2", "Загрузка из сети",
+        "Вложенные прогресс-бары, имитация множественных загрузок",
+        "src.scenarios.network_scenario:NetworkDownloadScenario", "BLUE",
+        [
+            "✓ Два уровня вложенности: общий прогресс и по файлам",
+            "✓ Параметр position для фиксации позиции баров",
+            "✓ leave=False для автоматического скрытия завершенных баров",
+            "✓ Обновление обоих баров одновременно",
+            "✓ Имитация реальной загрузки с меняющейся скоростью"
+        ],
+        throughput="successful"
+    )
+    registry.register(
+        "3", "Обработка данных",
+        "Ручное управление прогрессом, кастомные метрики, генераторы",
+        "src.scenarios.processing_scenario:create_scenario", "MAGENTA",
+        [
+            "✓ Ручное управление прогрессом через update()",
+            "✓ Работа с генераторами, где неизвестен total",
+            "✓ Множественные кастомные метрики в постфиксе",
+            "✓ Детальная статистика по времени выполнения",
+            "✓ Комбинирование с дополнительным выводом"
+        ],
+        throughput="processed_items"
+    )
+    if _plugins_enabled():
+        registry.load_entry_points()
+    return registry
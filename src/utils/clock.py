@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Часы сценариев: реальные или виртуальные.
+В виртуальном режиме sleep() мгновенно сдвигает модельное время,
+поэтому тот же сценарий отрабатывает за миллисекунды, а длительности
+и скорости считаются по модельному времени и воспроизводимы при
+фиксированном зерне.
+
+Переменные окружения:
+    TQDM_DEMO_CLOCK  real (по умолчанию) или virtual
+    TQDM_DEMO_SEED   Зерно генератора задержек
+"""
+
+import contextlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+
+class RealClock:
+    """
+    Обычное время процесса.
+    """
+
+    virtual = False
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Инициализация.
+
+        Args:
+            seed: Зерно генератора случайных задержек (None - случайное)
+        """
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def time(self) -> float:
+        """Время по календарю (секунды с эпохи)."""
+        return time.time()
+
+    def perf(self) -> float:
+        """Монотонное время для замеров длительности."""
+        return time.perf_counter()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def async_sleep(self, seconds: float):
+        # asyncio нужен только асинхронному режиму - не грузим его при старте
+        import asyncio
+        await asyncio.sleep(seconds)
+
+    async def blocked(self, awaitable):
+        """
+        Ожидание чего-либо, кроме сна (очереди, события, другой задачи).
+        Реальным часам отметка не нужна; виртуальные считают такую
+        задачу заблокированной (см. VirtualClock).
+        """
+        return await awaitable
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        """Ждет событие не дольше timeout. True - если событие наступило."""
+        return event.wait(timeout)
+
+
+class Timeline:
+    """
+    Собственное модельное время одной ветки работы (см. VirtualClock.timeline).
+    """
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+
+class VirtualClock(RealClock):
+    """
+    Модельное время: sleep() не ждет, а сдвигает часы.
+
+    Для asyncio сон регистрируется в очереди пробуждений, а часы ведут
+    счет готовых к работе задач. Задача учитывается с первого
+    async_sleep() или blocked() и до своего завершения; пока она спит
+    или ждет в blocked(), она не готова. Когда готовых задач не
+    осталось, время сдвигается до ближайшего срока, поэтому
+    одновременные задержки перекрываются, а не складываются. Поэтому
+    учтенная задача любое ожидание, кроме сна, оборачивает в
+    clock.blocked(...) - иначе часы сочтут ее работающей и не пойдут.
+
+    Внутри timeline() сны потока копятся на отдельной шкале и не
+    сдвигают общие часы: так измеряется длительность одной попытки,
+    не зависящая от снов других потоков.
+    """
+
+    virtual = True
+
+    def __init__(self, seed: Optional[int] = 0, start: float = 0.0,
+                 epoch: Optional[float] = None):
+        """
+        Инициализация.
+
+        Args:
+            seed: Зерно генератора задержек
+            start: Начальное значение perf()
+            epoch: Календарное время в момент start (по умолчанию - текущее)
+        """
+        super().__init__(seed)
+        self._now = start
+        self._start = start
+        self._epoch = time.time() if epoch is None else epoch
+        self._lock = threading.Lock()
+        self._sleepers = []
+        self._order = itertools.count()
+        self._tasks = set()
+        self._runnable = 0
+        self._loop = None
+        self._waker_scheduled = False
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Копия для дочерних процессов: без блокировки и очереди asyncio
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_local"]
+        state["_sleepers"] = []
+        state["_order"] = None
+        state["_tasks"] = set()
+        state["_runnable"] = 0
+        state["_loop"] = None
+        state["_waker_scheduled"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._order = itertools.count()
+        self._local = threading.local()
+
+    def time(self) -> float:
+        return self._epoch + (self.perf() - self._start)
+
+    def perf(self) -> float:
+        timeline = getattr(self._local, "timeline", None)
+        return self._now if timeline is None else self._now + timeline.elapsed
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            timeline = getattr(self._local, "timeline", None)
+            if timeline is not None:
+                timeline.elapsed += seconds
+                return
+            with self._lock:
+                self._now += seconds
+
+    @contextlib.contextmanager
+    def timeline(self):
+        """
+        Отдельная шкала времени для текущего потока: sleep() и wait()
+        внутри блока увеличивают timeline.elapsed, а не общие часы.
+        """
+        outer = getattr(self._local, "timeline", None)
+        timeline = self._local.timeline = Timeline()
+        try:
+            yield timeline
+        finally:
+            self._local.timeline = outer
+
+    def advance(self, seconds: float):
+        """Сдвигает часы (например, на время работы, выполненной вне процесса)."""
+        self.sleep(seconds)
+
+    async def async_sleep(self, seconds: float):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        self._attach(loop)
+        future = loop.create_future()
+        heapq.heappush(self._sleepers, (self._now + max(0.0, seconds),
+                                        next(self._order), future))
+        await self._wait(future)
+
+    async def blocked(self, awaitable):
+        import asyncio
+        self._attach(asyncio.get_running_loop())
+        return await self._wait(awaitable)
+
+    def _attach(self, loop):
+        if loop is self._loop:
+            return
+        # Новый цикл событий (asyncio.run) - прошлые очередь и задачи ему не нужны
+        self._loop = loop
+        self._sleepers = []
+        self._tasks = set()
+        self._runnable = 0
+        self._waker_scheduled = False
+
+    async def _wait(self, awaitable):
+        import asyncio
+        task = asyncio.current_task()
+        if task is not None and task not in self._tasks:
+            self._tasks.add(task)
+            self._runnable += 1
+            task.add_done_callback(self._task_done)
+        self._runnable -= 1
+        self._schedule_wake()
+        try:
+            return await awaitable
+        finally:
+            self._runnable += 1
+
+    def _task_done(self, task):
+        if task in self._tasks:
+            self._tasks.discard(task)
+            self._runnable -= 1
+            self._schedule_wake()
+
+    def _schedule_wake(self):
+        if self._runnable == 0 and self._sleepers and not self._waker_scheduled:
+            self._waker_scheduled = True
+            self._loop.call_soon(self._wake_next)
+
+    def _wake_next(self):
+        self._waker_scheduled = False
+        if self._runnable:
+            # До пробуждения успела продолжиться задача, дождавшаяся
+            # очереди или события: она сама запланирует сдвиг, когда уснет
+            return
+        woke = False
+        while self._sleepers:
+            deadline, _, future = self._sleepers[0]
+            if future.done():
+                # Сон отменен вместе с задачей
+                heapq.heappop(self._sleepers)
+                continue
+            if woke and deadline > self._now:
+                break
+            heapq.heappop(self._sleepers)
+            with self._lock:
+                self._now = max(self._now, deadline)
+            future.set_result(None)
+            woke = True
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        if event.is_set():
+            return True
+        self.sleep(timeout)
+        return event.is_set()
+
+
+_clock: Optional[RealClock] = None
+
+
+def clock_from_env() -> RealClock:
+    seed = os.environ.get("TQDM_DEMO_SEED")
+    seed = int(seed) if seed else None
+    if os.environ.get("TQDM_DEMO_CLOCK", "").strip().lower() == "virtual":
+        return VirtualClock(seed=seed if seed is not None else 0)
+    return RealClock(seed)
+
+
+def get_clock() -> RealClock:
+    """Часы по умолчанию (создаются по переменным окружения при первом вызове)."""
+    global _clock
+    if _clock is None:
+        _clock = clock_from_env()
+    return _clock
+
+
+def set_clock(clock: Optional[RealClock]):
+    """Задает часы по умолчанию (None - снова взять из окружения)."""
+    global _clock
+    _clock = clock
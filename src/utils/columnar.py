@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Колоночное хранилище результатов обработки данных.
+Вместо списка словарей значения лежат в плотных массивах по колонкам,
+при превышении бюджета памяти колонки выгружаются в memory-mapped файлы.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from array import array
+from typing import Dict, Iterator, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ColumnarResults:
+    """
+    Хранилище строк value/sqrt/log/sin/cos в виде колонок.
+
+    Емкость растет удвоением, поэтому добавление амортизированно O(1).
+    Агрегаты считаются прямо по колонкам, без создания словарей-строк.
+    """
+
+    COLUMNS = (("value", "q"), ("sqrt", "d"), ("log", "d"), ("sin", "d"), ("cos", "d"))
+    ROW_BYTES = 8 * len(COLUMNS)
+
+    def __init__(self, initial_capacity: int = 1024, memory_budget: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            initial_capacity: Начальная емкость в строках
+            memory_budget: Бюджет памяти в байтах, после которого колонки
+                           переезжают в memory-mapped файлы (None - без выгрузки)
+            spill_dir: Директория для файлов выгрузки (по умолчанию временная)
+        """
+        if memory_budget is not None and np is None:
+            raise RuntimeError("Выгрузка колонок на диск требует NumPy")
+
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.spilled = False
+        self._spill_path: Optional[str] = None
+        self._allocate(max(1, initial_capacity))
+
+    def _allocate(self, capacity: int):
+        self._size = 0
+        self._capacity = capacity
+        if np is not None:
+            self._columns = {name: np.empty(capacity, dtype=self._dtype(code))
+                             for name, code in self.COLUMNS}
+        else:
+            self._columns = {name: array(code) for name, code in self.COLUMNS}
+
+    @staticmethod
+    def _dtype(code: str):
+        return np.int64 if code == "q" else np.float64
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Объем, занимаемый колонками (с учетом резерва емкости)."""
+        if np is None:
+            return sum(col.itemsize * len(col) for col in self._columns.values())
+        return self._capacity * self.ROW_BYTES
+
+    def _reserve(self, required: int):
+        if np is None or required <= self._capacity:
+            return
+
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+
+        spill = self.spilled or (
+            self.memory_budget is not None and capacity * self.ROW_BYTES > self.memory_budget
+        )
+        new_columns = {}
+        for name, code in self.COLUMNS:
+            if spill:
+                column = self._open_spill_column(name, code, capacity)
+            else:
+                column = np.empty(capacity, dtype=self._dtype(code))
+            column[:self._size] = self._columns[name][:self._size]
+            new_columns[name] = column
+
+        old_files = [getattr(col, "filename", None) for col in self._columns.values()]
+        self._columns = new_columns
+        self._capacity = capacity
+        self.spilled = spill
+        self._remove_files(old_files)
+
+    def _open_spill_column(self, name: str, code: str, capacity: int):
+        if self._spill_path is None:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill_path = tempfile.mkdtemp(prefix="columnar_", dir=self.spill_dir)
+        path = os.path.join(self._spill_path, f"{name}_{capacity}.bin")
+        return np.memmap(path, dtype=self._dtype(code), mode="w+", shape=(capacity,))
+
+    @staticmethod
+    def _remove_files(filenames):
+        for filename in filenames:
+            if not filename:
+                continue
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def append(self, row: Dict[str, float]):
+        """Добавляет одну строку (словарь с ключами колонок)."""
+        if np is None:
+            for name, _ in self.COLUMNS:
+                self._columns[name].append(row[name])
+            self._size += 1
+            return
+
+        self._reserve(self._size + 1)
+        index = self._size
+        for name, _ in self.COLUMNS:
+            self._columns[name][index] = row[name]
+        self._size += 1
+
+    def extend(self, columns: Dict[str, Sequence]):
+        """Добавляет блок строк, заданный колонками одинаковой длины."""
+        count = len(columns["value"])
+        if np is None:
+            for name, _ in self.COLUMNS:
+                self._columns[name].extend(columns[name])
+            self._size += count
+            return
+
+        self._reserve(self._size + count)
+        for name, _ in self.COLUMNS:
+            self._columns[name][self._size:self._size + count] = columns[name]
+        self._size += count
+
+    def column(self, name: str):
+        """Колонка длиной len(self) без копирования."""
+        if np is None:
+            return memoryview(self._columns[name])
+        return self._columns[name][:self._size]
+
+    def row(self, index: int) -> Dict[str, float]:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return {name: self._columns[name][index].item() if np is not None
+                else self._columns[name][index] for name, _ in self.COLUMNS}
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        for index in range(self._size):
+            yield self.row(index)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Минимум, максимум, сумма и среднее по каждой колонке."""
+        result = {}
+        for name, _ in self.COLUMNS:
+            col = self.column(name)
+            if not self._size:
+                result[name] = {"min": 0.0, "max": 0.0, "sum": 0.0, "mean": 0.0}
+                continue
+            if np is not None:
+                total = float(col.sum())
+                result[name] = {"min": float(col.min()), "max": float(col.max()),
+                                "sum": total, "mean": total / self._size}
+            else:
+                total = math.fsum(col)
+                result[name] = {"min": float(min(col)), "max": float(max(col)),
+                                "sum": total, "mean": total / self._size}
+        return result
+
+    def close(self):
+        """Освобождает файлы выгрузки."""
+        if self._spill_path:
+            self._allocate(1)
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+            self.spilled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
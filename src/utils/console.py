@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 """
 Утилиты для работы с консолью.
+
+Экраны меню и списки выводятся через ScreenRenderer: кадр собирается
+в буфер и пишется одним вызовом write, экран очищается ANSI-кодами,
+а при повторной отрисовке переписываются только изменившиеся строки.
 """
 
 import os
+import re
 import sys
+import threading
+import unicodedata
+from typing import Iterable, List, Optional, TextIO
+
+from src.utils.headless import is_headless
 
 # Цвета для вывода
 class Colors:
@@ -27,9 +37,224 @@ class Colors:
 Fore = Colors
 Style = Colors
 
+# Без терминала (CI, cron) цвета и очистка экрана только засоряют логи
+HEADLESS = is_headless()
+
+def disable_colors():
+    """Заменяет все ANSI-коды в Colors пустыми строками."""
+    for name in list(vars(Colors)):
+        if name.isupper():
+            setattr(Colors, name, '')
+
+if HEADLESS:
+    disable_colors()
+
+CLEAR = "\033[H\033[2J\033[3J"
+CLEAR_BELOW = "\033[J"
+CLEAR_LINE_END = "\033[K"
+
+_ANSI_CODE = re.compile(r"\033\[[0-9;?]*[A-Za-z]")
+
+
+def display_width(text: str) -> int:
+    """Ширина строки в колонках терминала (без ANSI-кодов, широкие символы - 2)."""
+    text = _ANSI_CODE.sub("", text)
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+               for char in text if not unicodedata.combining(char))
+
+
+class ScreenRenderer:
+    """
+    Буферизованный вывод в терминал.
+    
+    draw() показывает кадр с верхней строки экрана. Если прошлый кадр
+    еще на экране (все, что было выведено после него, прошло через
+    этот объект и не прокрутило экран), переписываются только строки,
+    которые отличаются, иначе экран очищается и кадр пишется целиком.
+    print()/lines() копят текст в буфере до flush() или input().
+    
+    patch() обновляет показанный кадр из другого потока, пока основной
+    ждет ввода: текст под кадром (подсказки и введенные строки)
+    запоминается и при изменении высоты кадра выводится заново.
+    """
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Инициализация.
+        
+        Args:
+            stream: Поток вывода (по умолчанию текущий sys.stdout)
+        """
+        self._stream = stream
+        self._buffer: List[str] = []
+        self._frame: Optional[List[str]] = None
+        self._tail: List[str] = []
+        self._lock = threading.RLock()
+        self.full_redraws = 0
+        self.lines_written = 0
+    
+    @property
+    def stream(self) -> TextIO:
+        return self._stream or sys.stdout
+    
+    def terminal_size(self):
+        try:
+            size = os.get_terminal_size(self.stream.fileno())
+        except (AttributeError, OSError, ValueError):
+            return 80, 24
+        # Псевдотерминал без заданного размера сообщает 0x0
+        return size.columns or 80, size.lines or 24
+    
+    def _rows(self, text: str, columns: int) -> int:
+        lines = text.split("\n")
+        if text.endswith("\n"):
+            lines.pop()
+        return sum(max(1, -(-display_width(line) // columns)) for line in lines)
+    
+    def print(self, *args, sep: str = " ", end: str = "\n"):
+        """Как print(), но в буфер."""
+        self._buffer.append(sep.join(str(arg) for arg in args) + end)
+    
+    def lines(self, rows: Iterable[str]):
+        """Добавляет строки в буфер одним куском."""
+        text = "\n".join(rows)
+        if text:
+            self._buffer.append(text + "\n")
+    
+    def flush(self):
+        """Пишет накопленный текст одним вызовом write."""
+        with self._lock:
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._write(text)
+            self._after_frame(text)
+    
+    def input(self, prompt: str = "") -> str:
+        """Сбрасывает буфер и читает строку (подсказка и ввод запоминаются под кадром)."""
+        with self._lock:
+            self.flush()
+            self._after_frame(prompt)
+        value = input(prompt)
+        with self._lock:
+            self._after_frame(value + "\n")
+        return value
+    
+    def _after_frame(self, text: str):
+        if self._frame is None:
+            return
+        self._tail.append(text)
+        columns, rows = self.terminal_size()
+        if len(self._frame) + self._rows("".join(self._tail), columns) >= rows:
+            # Экран прокрутился - позиции строк кадра больше не известны
+            self.invalidate()
+    
+    def invalidate(self):
+        """Экран изменен в обход рендерера - следующий кадр рисуется целиком."""
+        with self._lock:
+            self._frame = None
+            self._tail = []
+    
+    def clear(self):
+        """Очистка экрана ANSI-кодами (без запуска внешней команды)."""
+        with self._lock:
+            self._buffer = []
+            self.invalidate()
+            if HEADLESS:
+                return
+            self._write(CLEAR)
+    
+    def _fits(self, frame: List[str]) -> bool:
+        columns, rows = self.terminal_size()
+        return len(frame) < rows and all(display_width(line) < columns for line in frame)
+    
+    def _changed_lines(self, previous: List[str], frame: List[str]) -> List[str]:
+        parts = []
+        for index, line in enumerate(frame):
+            if index >= len(previous) or previous[index] != line:
+                parts.append(f"\033[{index + 1};1H{line}{CLEAR_LINE_END}")
+        self.lines_written += len(parts)
+        return parts
+    
+    def draw(self, frame: List[str]):
+        """
+        Показывает кадр с начала экрана.
+        
+        Args:
+            frame: Строки кадра (без переводов строки)
+        """
+        with self._lock:
+            self.flush()
+            if HEADLESS:
+                self._write("\n".join(frame) + "\n")
+                return
+            
+            previous = self._frame
+            # Позиции строк прошлого кадра известны, только если ни одна
+            # строка не переносилась и экран с тех пор не прокручивался
+            fits = self._fits(frame)
+            if previous is not None and fits:
+                parts = self._changed_lines(previous, frame)
+                parts.append(f"\033[{len(frame) + 1};1H{CLEAR_BELOW}")
+                self._write("".join(parts))
+            else:
+                self.full_redraws += 1
+                self.lines_written += len(frame)
+                self._write(CLEAR + "\n".join(frame) + "\n")
+            
+            self._frame = list(frame) if fits else None
+            self._tail = []
+    
+    def patch(self, frame: List[str]) -> bool:
+        """
+        Обновляет показанный кадр, не трогая курсор ввода.
+        
+        Returns:
+            bool: False - кадра нет на экране или он не помещается
+        """
+        with self._lock:
+            previous = self._frame
+            if HEADLESS or previous is None or self._buffer or not self._fits(frame):
+                return False
+            tail = "".join(self._tail)
+            columns, rows = self.terminal_size()
+            if len(frame) + self._rows(tail, columns) >= rows:
+                return False
+            parts = self._changed_lines(previous, frame)
+            if len(frame) == len(previous):
+                if not parts:
+                    return True
+                # Сохранить и вернуть позицию курсора (DECSC/DECRC)
+                self._write("\0337" + "".join(parts) + "\0338")
+            else:
+                # Высота изменилась: текст под кадром выводится заново
+                parts.append(f"\033[{len(frame) + 1};1H{CLEAR_BELOW}{tail}")
+                self._write("".join(parts))
+            self._frame = list(frame)
+            return True
+    
+    def _write(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+screen = ScreenRenderer()
+
 def clear_screen():
     """Очистка экрана терминала."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    screen.clear()
+
+def header_lines(text: str) -> List[str]:
+    """Строки заголовка с рамкой."""
+    width = min(len(text) + 4, 80)
+    return [
+        f"{Colors.CYAN}{Colors.BOLD}┌{'─' * (width-2)}┐{Colors.END}",
+        f"{Colors.CYAN}{Colors.BOLD}│ {text:^{width-4}} │{Colors.END}",
+        f"{Colors.CYAN}{Colors.BOLD}└{'─' * (width-2)}┘{Colors.END}",
+    ]
 
 def print_header(text: str):
     """
@@ -38,10 +263,18 @@ def print_header(text: str):
     Args:
         text: Текст заголовка
     """
-    width = min(len(text) + 4, 80)
-    print(f"{Colors.CYAN}{Colors.BOLD}┌{'─' * (width-2)}┐{Colors.END}")
-    print(f"{Colors.CYAN}{Colors.BOLD}│ {text:^{width-4}} │{Colors.END}")
-    print(f"{Colors.CYAN}{Colors.BOLD}└{'─' * (width-2)}┘{Colors.END}")
+    screen.lines(header_lines(text))
+    screen.flush()
+
+def menu_lines(items: list) -> List[str]:
+    """Строки меню из кортежей (название, описание), нумерация с 1."""
+    rows = []
+    for i, (title, desc) in enumerate(items, 1):
+        rows.append(f"  {Colors.YELLOW}{Colors.BOLD}{i}.{Colors.END} {Colors.WHITE}{title}{Colors.END}")
+        if desc:
+            rows.append(f"     {Colors.BLUE}{desc}{Colors.END}")
+        rows.append("")
+    return rows
 
 def print_menu(items: list):
     """
@@ -50,16 +283,12 @@ def print_menu(items: list):
     Args:
         items: Список кортежей (название, описание)
     """
-    for i, (title, desc) in enumerate(items, 1):
-        print(f"  {Colors.YELLOW}{Colors.BOLD}{i}.{Colors.END} ", end="")
-        print(f"{Colors.WHITE}{title}{Colors.END}")
-        if desc:
-            print(f"     {Colors.BLUE}{desc}{Colors.END}")
-        print()
+    screen.lines(menu_lines(items))
+    screen.flush()
 
 def wait_for_enter():
     """Ожидание нажатия Enter."""
-    input(f"\n{Colors.GREEN}Нажмите Enter для продолжения...{Colors.END}")
+    screen.input(f"\n{Colors.GREEN}Нажмите Enter для продолжения...{Colors.END}")
 
 def print_progress_info(iteration: int, total: int, elapsed: float, 
                         speed: float, **kwargs):
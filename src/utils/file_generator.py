@@ -2,13 +2,18 @@
 """
 Утилита для генерации и обработки тестовых файлов.
 Создает файлы в storage/temp/ и сохраняет результаты в storage/processed/
+
+Директории читаются с учетом раскладки (см. sharding): файлы в шардах
+видны, служебный маркер .layout не считается файлом и не удаляется.
 """
 
 import os
 import random
 import string
 import datetime
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+from src.utils.sharding import RESERVED, FlatLayout, read_layout
 
 class FileGenerator:
     """
@@ -34,6 +39,28 @@ class FileGenerator:
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.processed_dir, exist_ok=True)
     
+    def _layout(self, directory: str) -> FlatLayout:
+        return read_layout(directory) or FlatLayout()
+    
+    def _iter_files(self, directory: str) -> Iterator[os.DirEntry]:
+        """Файлы директории с учетом раскладки, без служебных файлов."""
+        if not os.path.isdir(directory):
+            return
+        for entry in self._layout(directory).iter_files(directory):
+            if entry.name not in RESERVED:
+                yield entry
+    
+    def _directory_totals(self, directory: str) -> Tuple[int, int]:
+        """Число файлов и их общий размер."""
+        count = size = 0
+        for entry in self._iter_files(directory):
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+            count += 1
+        return count, size
+    
     def _human_readable_size(self, size: int) -> str:
         """Конвертирует размер в человекочитаемый формат."""
         for unit in ['B', 'KB', 'MB', 'GB']:
@@ -47,40 +74,42 @@ class FileGenerator:
         print(f"\n📊 СТАТУС ХРАНИЛИЩА:")
         
         if os.path.exists(self.temp_dir):
-            temp_files = [f for f in os.listdir(self.temp_dir) 
-                         if os.path.isfile(os.path.join(self.temp_dir, f))]
-            temp_size = sum(os.path.getsize(os.path.join(self.temp_dir, f)) 
-                          for f in temp_files)
+            temp_count, temp_size = self._directory_totals(self.temp_dir)
             print(f"   📁 Временные файлы (temp):")
-            print(f"      Файлов: {len(temp_files)}")
+            print(f"      Файлов: {temp_count}")
             print(f"      Размер: {self._human_readable_size(temp_size)}")
         
         if os.path.exists(self.processed_dir):
-            proc_files = [f for f in os.listdir(self.processed_dir) 
-                         if os.path.isfile(os.path.join(self.processed_dir, f))]
-            proc_size = sum(os.path.getsize(os.path.join(self.processed_dir, f)) 
-                          for f in proc_files)
+            proc_count, proc_size = self._directory_totals(self.processed_dir)
             print(f"   📁 Обработанные файлы (processed):")
-            print(f"      Файлов: {len(proc_files)}")
+            print(f"      Файлов: {proc_count}")
             print(f"      Размер: {self._human_readable_size(proc_size)}")
     
     def generate_test_files(self, count: int = 20, 
-                           extensions: List[str] = None) -> List[str]:
+                           extensions: List[str] = None,
+                           quiet: bool = False) -> List[str]:
         """
         Генерация тестовых файлов во временную папку.
+        
+        Args:
+            quiet: Не печатать ход генерации
         """
         if extensions is None:
             extensions = ['.txt', '.log', '.dat', '.csv', '.tmp']
         
         generated = []
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        layout = self._layout(self.temp_dir)
         
-        print(f"\n🔨 Генерация {count} тестовых файлов...")
+        if not quiet:
+            print(f"\n🔨 Генерация {count} тестовых файлов...")
         
         for i in range(1, count + 1):
             ext = random.choice(extensions)
             filename = f"test_file_{i:03d}_{timestamp}{ext}"
-            filepath = os.path.join(self.temp_dir, filename)
+            filepath = layout.path(self.temp_dir, filename)
+            if layout.sharded:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
             
             content = self._generate_content(i, timestamp)
             
@@ -90,10 +119,11 @@ class FileGenerator:
             self.generated_files.append(filepath)
             generated.append(filepath)
             
-            if i % 5 == 0:
+            if not quiet and i % 5 == 0:
                 print(f"   Создано {i} файлов...")
         
-        print(f"✅ Создано {count} файлов")
+        if not quiet:
+            print(f"✅ Создано {count} файлов")
         return generated
     
     def _generate_content(self, file_num: int, timestamp: str) -> str:
@@ -129,7 +159,10 @@ class FileGenerator:
             
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             processed_filename = f"{name_without_ext}_processed_{timestamp}.txt"
-            processed_path = os.path.join(self.processed_dir, processed_filename)
+            layout = self._layout(self.processed_dir)
+            processed_path = layout.path(self.processed_dir, processed_filename)
+            if layout.sharded:
+                os.makedirs(os.path.dirname(processed_path), exist_ok=True)
             
             processed_lines = []
             processed_lines.append("=" * 60)
@@ -155,29 +188,22 @@ class FileGenerator:
     
     def get_temp_files(self) -> List[str]:
         """Возвращает список временных файлов."""
-        if not os.path.exists(self.temp_dir):
-            return []
-        return [f for f in os.listdir(self.temp_dir) 
-                if os.path.isfile(os.path.join(self.temp_dir, f))]
+        return [entry.name for entry in self._iter_files(self.temp_dir)]
     
     def get_processed_files(self) -> List[str]:
         """Возвращает список обработанных файлов."""
-        if not os.path.exists(self.processed_dir):
-            return []
-        return [f for f in os.listdir(self.processed_dir) 
-                if os.path.isfile(os.path.join(self.processed_dir, f))]
+        return [entry.name for entry in self._iter_files(self.processed_dir)]
     
     def cleanup_temp(self):
-        """Очищает временную папку."""
+        """Очищает временную папку (маркер раскладки остается на месте)."""
         if os.path.exists(self.temp_dir):
-            files = os.listdir(self.temp_dir)
-            for filename in files:
-                filepath = os.path.join(self.temp_dir, filename)
+            removed = 0
+            for entry in list(self._iter_files(self.temp_dir)):
                 try:
-                    if os.path.isfile(filepath):
-                        os.remove(filepath)
+                    os.remove(entry.path)
+                    removed += 1
                 except Exception as e:
-                    print(f"   Ошибка удаления {filename}: {e}")
-            print(f"\n🧹 Временная папка очищена: {len(files)} файлов удалено")
+                    print(f"   Ошибка удаления {entry.name}: {e}")
+            print(f"\n🧹 Временная папка очищена: {removed} файлов удалено")
         
         self.generated_files = []
\ No newline at end of file
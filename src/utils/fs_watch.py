@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Наблюдение за директориями хранилища.
+
+На Linux используется inotify (через ctypes, без сторонних пакетов):
+ядро само сообщает о создании, удалении и изменении файлов, а в простое
+поток наблюдения спит в select(). На остальных системах и при ошибке
+inotify работает опрос: на каждом шаге проверяется только mtime
+директорий, и директория пересканируется, лишь если он изменился.
+Изменение содержимого файла не меняет mtime директории, поэтому раз в
+несколько шагов выполняется полная сверка.
+
+Для шардированных директорий (см. sharding) наблюдение охватывает
+подкаталоги до заданной глубины; события по-прежнему несут только имя
+файла, без пути шарда.
+
+Переменные окружения:
+    TQDM_DEMO_WATCH  auto (по умолчанию), inotify или poll
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ADD = "add"
+REMOVE = "remove"
+MODIFY = "modify"
+RESCAN = "rescan"
+
+# Флаги из <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE
+              | IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+# Значения mtime моложе этого могут совпасть со следующим изменением
+# (грубая гранулярность часов ФС), такие директории проверяются повторно
+RACY_MTIME_NS = 2_000_000_000
+
+
+class FileEvent:
+    """
+    Изменение в директории хранилища.
+    """
+
+    __slots__ = ("kind", "dir_key", "name")
+
+    def __init__(self, kind: str, dir_key: str, name: Optional[str] = None):
+        """
+        Args:
+            kind: add, remove, modify или rescan (потеряны события - нужен пересчет)
+            dir_key: Ключ директории
+            name: Имя файла (None для rescan)
+        """
+        self.kind = kind
+        self.dir_key = dir_key
+        self.name = name
+
+    def __eq__(self, other):
+        return (isinstance(other, FileEvent) and self.kind == other.kind
+                and self.dir_key == other.dir_key and self.name == other.name)
+
+    def __hash__(self):
+        return hash((self.kind, self.dir_key, self.name))
+
+    def __repr__(self):
+        return f"FileEvent({self.kind!r}, {self.dir_key!r}, {self.name!r})"
+
+
+def _coalesce(events: List[FileEvent]) -> List[FileEvent]:
+    """Убирает повторы (серия IN_MODIFY при записи файла кусками)."""
+    seen = set()
+    result = []
+    for event in events:
+        if event not in seen:
+            seen.add(event)
+            result.append(event)
+    return result
+
+
+class _Watcher:
+    """
+    Общая часть: фоновый поток, который передает события в callback.
+    """
+
+    method = ""
+
+    def __init__(self, directories: Dict[str, str], interval: float = 1.0,
+                 depths: Optional[Dict[str, int]] = None):
+        self.directories = dict(directories)
+        self.interval = interval
+        # Глубина подкаталогов под наблюдением (0 - только сама директория)
+        self.depths = {key: (depths or {}).get(key, 0) for key in self.directories}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def poll(self, timeout: float = 0.0) -> List[FileEvent]:
+        raise NotImplementedError
+
+    def start(self, callback: Callable[[List[FileEvent]], None]):
+        """Запускает поток наблюдения; callback получает пачки событий."""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    events = self.poll(timeout=self.interval)
+                except (OSError, ValueError):
+                    # Директории или дескриптора больше нет - поток завершается
+                    break
+                if events and not self._stop.is_set():
+                    callback(events)
+
+        self._thread = threading.Thread(target=loop, name=f"fs-watch-{self.method}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1.0)
+        self._thread = None
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class InotifyWatcher(_Watcher):
+    """
+    Наблюдение через inotify (Linux).
+    """
+
+    method = "inotify"
+
+    def __init__(self, directories: Dict[str, str], interval: float = 1.0,
+                 depths: Optional[Dict[str, int]] = None):
+        super().__init__(directories, interval, depths)
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._ctypes = ctypes
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+        self._lock = threading.Lock()
+        # wd -> (ключ, путь, уровень подкаталога)
+        self._keys: Dict[int, Tuple[str, str, int]] = {}
+        try:
+            for key, path in self.directories.items():
+                self._watch_tree(key, path, 0)
+        except OSError:
+            os.close(fd)
+            raise
+
+    def _watch_tree(self, key: str, path: str, level: int,
+                    found: Optional[List[str]] = None):
+        """
+        Ставит наблюдение на каталог и его подкаталоги до глубины ключа.
+
+        Args:
+            found: Сюда добавляются имена файлов, уже лежащих в новом
+                   каталоге (могли появиться до того, как наблюдение
+                   было поставлено)
+        """
+        wd = self._add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self._keys[wd] = (key, path, level)
+        if level >= self.depths[key] and found is None:
+            return
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if level < self.depths[key] and entry.is_dir(follow_symlinks=False):
+                    self._watch_tree(key, entry.path, level + 1, found)
+                elif found is not None and entry.is_file():
+                    found.append(entry.name)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def poll(self, timeout: float = 0.0) -> List[FileEvent]:
+        fd = self._fd
+        if fd < 0:
+            raise ValueError("наблюдение остановлено")
+        ready, _, _ = select.select([fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        events = []
+        with self._lock:
+            while True:
+                try:
+                    data = os.read(fd, _READ_SIZE)
+                except BlockingIOError:
+                    break
+                if not data:
+                    break
+                events.extend(self._parse(data))
+        return _coalesce(events)
+
+    def _parse(self, data: bytes) -> List[FileEvent]:
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.extend(FileEvent(RESCAN, key) for key in self.directories)
+                continue
+            watched = self._keys.get(wd)
+            if watched is None:
+                continue
+            key, path, level = watched
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                if level == 0:
+                    events.append(FileEvent(RESCAN, key))
+                elif mask & IN_IGNORED:
+                    # Удален пустой подкаталог шарда
+                    del self._keys[wd]
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and level < self.depths[key]:
+                    events.extend(self._watch_new(key, os.path.join(path, os.fsdecode(raw_name)),
+                                                  level + 1))
+                continue
+            name = os.fsdecode(raw_name)
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                events.append(FileEvent(ADD, key, name))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append(FileEvent(REMOVE, key, name))
+            elif mask & (IN_CLOSE_WRITE | IN_MODIFY | IN_ATTRIB):
+                events.append(FileEvent(MODIFY, key, name))
+        return events
+
+    def _watch_new(self, key: str, path: str, level: int) -> List[FileEvent]:
+        names: List[str] = []
+        try:
+            self._watch_tree(key, path, level, names)
+        except FileNotFoundError:
+            return []
+        except OSError:
+            # Исчерпан лимит max_user_watches: изменения в этом каталоге
+            # видны не будут, но текущее состояние перечитывается
+            return [FileEvent(RESCAN, key)]
+        return [FileEvent(ADD, key, name) for name in names]
+
+    def close(self):
+        # Сначала дождаться потока: закрытый номер дескриптора может
+        # тут же достаться другому файлу
+        super().close()
+        fd, self._fd = self._fd, -1
+        if fd >= 0:
+            os.close(fd)
+
+
+def _dir_mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _scan(path: str) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """Файлы каталога (имя -> размер, mtime) и пути подкаталогов."""
+    files = {}
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+class PollingWatcher(_Watcher):
+    """
+    Опрос по mtime каталогов: в простое - один stat на каталог за шаг.
+    """
+
+    method = "poll"
+
+    def __init__(self, directories: Dict[str, str], interval: float = 1.0,
+                 full_scan_every: int = 10, depths: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            directories: Ключ -> путь директории
+            interval: Период опроса в фоновом потоке, секунды
+            full_scan_every: Каждый N-й шаг сверяет размеры и mtime всех
+                             файлов (изменения содержимого mtime директории не видны)
+            depths: Ключ -> глубина подкаталогов под наблюдением
+        """
+        super().__init__(directories, interval, depths)
+        self.full_scan_every = max(1, full_scan_every)
+        self._polls = 0
+        self._lock = threading.Lock()
+        # Путь каталога -> [ключ, уровень, mtime]; файлы и подкаталоги каждого
+        self._dirs: Dict[str, List] = {}
+        self._files: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._subdirs: Dict[str, List[str]] = {}
+        for key, path in self.directories.items():
+            self._track(key, path, 0)
+
+    def _track(self, key: str, path: str, level: int) -> List[FileEvent]:
+        """Начинает следить за каталогом; события add для его файлов."""
+        self._dirs[path] = [key, level, _dir_mtime(path)]
+        files, subdirs = _scan(path)
+        self._files[path] = files
+        self._subdirs[path] = subdirs if level < self.depths[key] else []
+        events = [FileEvent(ADD, key, name) for name in files]
+        for subdir in self._subdirs[path]:
+            events.extend(self._track(key, subdir, level + 1))
+        return events
+
+    def _untrack(self, path: str) -> List[FileEvent]:
+        key = self._dirs.pop(path)[0]
+        events = [FileEvent(REMOVE, key, name) for name in self._files.pop(path)]
+        for subdir in self._subdirs.pop(path):
+            events.extend(self._untrack(subdir))
+        return events
+
+    def poll(self, timeout: float = 0.0) -> List[FileEvent]:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            events = self._check()
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0 or self._stop.is_set():
+                return events
+            self._stop.wait(min(self.interval, remaining))
+
+    def _check(self) -> List[FileEvent]:
+        with self._lock:
+            self._polls += 1
+            full = self._polls % self.full_scan_every == 0
+            now = time.time_ns()
+            events = []
+            for path, state in list(self._dirs.items()):
+                if path not in self._dirs:
+                    # Подкаталог уже убран вместе с родителем
+                    continue
+                key, level, previous = state
+                mtime = _dir_mtime(path)
+                racy = now - previous < RACY_MTIME_NS
+                if mtime == previous and not full and not racy:
+                    continue
+                state[2] = mtime
+                events.extend(self._diff(path, key, level))
+            return events
+
+    def _diff(self, path: str, key: str, level: int) -> List[FileEvent]:
+        current, subdirs = _scan(path)
+        previous = self._files[path]
+        self._files[path] = current
+        events = [FileEvent(REMOVE, key, name) for name in previous if name not in current]
+        for name, state in current.items():
+            old = previous.get(name)
+            if old is None:
+                events.append(FileEvent(ADD, key, name))
+            elif old != state:
+                events.append(FileEvent(MODIFY, key, name))
+        if level < self.depths[key]:
+            known = self._subdirs[path]
+            for subdir in known:
+                if subdir not in subdirs:
+                    events.extend(self._untrack(subdir))
+            for subdir in subdirs:
+                if subdir not in self._dirs:
+                    events.extend(self._track(key, subdir, level + 1))
+            self._subdirs[path] = subdirs
+        return events
+
+
+def create_watcher(directories: Dict[str, str], interval: float = 1.0,
+                   method: Optional[str] = None,
+                   depths: Optional[Dict[str, int]] = None) -> _Watcher:
+    """
+    Наблюдатель для директорий: inotify, если доступен, иначе опрос.
+
+    Args:
+        directories: Ключ -> путь директории
+        interval: Период опроса (и пробуждений фонового потока), секунды
+        method: auto, inotify или poll (по умолчанию из TQDM_DEMO_WATCH)
+        depths: Ключ -> глубина подкаталогов (для шардированных директорий)
+    """
+    method = (method or os.environ.get("TQDM_DEMO_WATCH") or "auto").strip().lower()
+    if method in ("auto", "inotify") and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories, interval, depths)
+        except (OSError, AttributeError):
+            # Нет inotify (не Linux-ядро, исчерпан лимит max_user_watches)
+            if method == "inotify":
+                raise
+    return PollingWatcher(directories, interval, depths=depths)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Безголовый режим для запусков без терминала (CI, cron).
+Вместо прогресс-баров пишет события JSON Lines не чаще раза в интервал.
+
+Переменные окружения:
+    TQDM_DEMO_HEADLESS        1 - включить, 0 - выключить (по умолчанию: stdout не TTY)
+    TQDM_DEMO_EVENTS          Путь к файлу событий (по умолчанию stdout)
+    TQDM_DEMO_EVENTS_INTERVAL Минимальный интервал между событиями, секунды (1.0)
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+from src.utils.clock import RealClock, get_clock
+
+_lock = threading.Lock()
+_stream: Optional[TextIO] = None
+_scenario: Optional[str] = None
+
+
+def is_headless() -> bool:
+    """Определяет режим: переменная окружения или отсутствие TTY."""
+    forced = os.environ.get("TQDM_DEMO_HEADLESS")
+    if forced is not None and forced != "":
+        return forced.strip().lower() not in ("0", "false", "no")
+    try:
+        return not sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return True
+
+
+def _events_stream() -> TextIO:
+    global _stream
+    if _stream is None:
+        path = os.environ.get("TQDM_DEMO_EVENTS")
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _stream = open(path, "a", encoding="utf-8", buffering=1 << 16)
+            atexit.register(_stream.close)
+        else:
+            _stream = sys.stdout
+    return _stream
+
+
+def set_scenario(name: Optional[str]):
+    """Запоминает текущий сценарий, он попадает во все события."""
+    global _scenario
+    _scenario = name
+
+
+def emit(event: str, **fields: Any):
+    """Пишет одно событие одной буферизованной записью."""
+    record = {"ts": round(time.time(), 3), "event": event, "scenario": _scenario}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        stream = _events_stream()
+        stream.write(line)
+        stream.flush()
+
+
+class JsonProgress:
+    """
+    Замена tqdm с тем же подмножеством API: события вместо отрисовки.
+    """
+
+    def __init__(self, iterable=None, total: Optional[float] = None,
+                 desc: Optional[str] = None, unit: str = "it",
+                 interval: Optional[float] = None, initial: float = 0,
+                 clock: Optional[RealClock] = None, **_ignored: Any):
+        """
+        Инициализация.
+
+        Args:
+            iterable: Итерируемый объект (как в tqdm)
+            total: Общее количество
+            desc: Описание (стадия)
+            unit: Единица измерения
+            interval: Минимальный интервал между событиями
+            initial: Начальное значение счетчика
+            clock: Часы для elapsed/rate/eta (по умолчанию get_clock())
+            **_ignored: Параметры отрисовки tqdm (colour, position, ...)
+        """
+        if total is None and iterable is not None:
+            try:
+                total = len(iterable)
+            except TypeError:
+                total = None
+        self.iterable = iterable
+        self.total = total
+        self.desc = desc or ""
+        self.unit = unit
+        self.n = initial
+        self.interval = interval if interval is not None else float(
+            os.environ.get("TQDM_DEMO_EVENTS_INTERVAL", "1.0"))
+        self.postfix: Dict[str, Any] = {}
+        self.clock = clock or get_clock()
+        self.start_t = self.clock.perf()
+        self._last_emit = self.start_t
+        self._closed = False
+
+    def __iter__(self):
+        for item in self.iterable:
+            yield item
+            self.update(1)
+
+    def __len__(self):
+        return int(self.total or 0)
+
+    def _event(self, event: str):
+        elapsed = self.clock.perf() - self.start_t
+        rate = self.n / elapsed if elapsed > 0 else None
+        eta = None
+        if rate and self.total:
+            eta = max(0.0, (self.total - self.n) / rate)
+        emit(event, stage=self.desc, n=self.n, total=self.total, unit=self.unit,
+             rate=round(rate, 3) if rate else None,
+             eta=round(eta, 3) if eta is not None else None,
+             elapsed=round(elapsed, 3), postfix=self.postfix)
+
+    def update(self, n: float = 1):
+        self.n += n
+        now = self.clock.perf()
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self._event("progress")
+
+    def refresh(self):
+        now = self.clock.perf()
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self._event("progress")
+
+    def set_postfix(self, ordered_dict=None, refresh: bool = True, **kwargs: Any):
+        postfix = dict(ordered_dict or {})
+        postfix.update(kwargs)
+        self.postfix = postfix
+
+    def set_postfix_str(self, s: str = "", refresh: bool = True):
+        self.postfix = {"text": s}
+
+    def set_description(self, desc: Optional[str] = None, refresh: bool = True):
+        self.desc = desc or ""
+
+    def write(self, s: str, file=None, end: str = "\n", nolock: bool = False):
+        emit("log", stage=self.desc, message=s.strip())
+
+    def clear(self, nolock: bool = False):
+        pass
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._event("close")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def progress_bar(*args: Any, clock: Optional[RealClock] = None, **kwargs: Any):
+    """
+    Прогресс-бар tqdm в терминале или JsonProgress в безголовом режиме.
+    С виртуальными часами elapsed и скорость считаются по модельному времени.
+    """
+    clock = clock or get_clock()
+    if is_headless():
+        return JsonProgress(*args, clock=clock, **kwargs)
+    from tqdm import tqdm
+    bar = tqdm(*args, **kwargs)
+    if clock.virtual:
+        bar._time = clock.time
+        bar.start_t = bar.last_print_t = clock.time()
+    return bar
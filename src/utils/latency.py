@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Потоковая статистика задержек.
+Лог-линейная гистограмма в стиле HDR Histogram: фиксированный массив
+счетчиков дает перцентили с относительной погрешностью около 1%
+при постоянном объеме памяти и объединяется между воркерами сложением.
+"""
+
+from array import array
+from typing import Dict, Iterable, Optional
+
+# Разрешение - 1 мкс, верхняя граница - около 19 часов
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_BUCKETS = SUB_BUCKETS >> 1
+MAX_VALUE_BITS = 36
+BUCKET_COUNT = SUB_BUCKETS + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * HALF_BUCKETS
+MAX_VALUE = (1 << MAX_VALUE_BITS) - 1
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((value >> shift) - HALF_BUCKETS)
+
+
+def _bucket_bounds(index: int):
+    if index < SUB_BUCKETS:
+        return index, index
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    top = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return top << shift, ((top + 1) << shift) - 1
+
+
+def format_duration(seconds: float) -> str:
+    """Форматирует длительность для postfix прогресс-бара."""
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    return f"{seconds * 1000:.1f}ms"
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с перцентилями p50/p90/p99/p99.9.
+
+    Значения записываются в секундах и хранятся с точностью до микросекунды.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def __getstate__(self):
+        return (self.counts, self.count, self.total, self.min, self.max)
+
+    def __setstate__(self, state):
+        self.counts, self.count, self.total, self.min, self.max = state
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, seconds: float, count: int = 1):
+        """Записывает одно (или count одинаковых) значение задержки."""
+        micros = min(MAX_VALUE, max(0, int(seconds * 1_000_000)))
+        self.counts[_bucket_index(micros)] += count
+        self.count += count
+        self.total += seconds * count
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def record_many(self, values: Iterable[float]):
+        for seconds in values:
+            self.record(seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Добавляет к гистограмме данные другой (например, от другого воркера)."""
+        if not other.count:
+            return self
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Значение перцентиля в секундах.
+
+        Args:
+            q: Перцентиль от 0 до 100
+        """
+        return self.percentiles([q])[_label(q)]
+
+    def percentiles(self, qs: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Несколько перцентилей за один проход по счетчикам."""
+        qs = sorted(qs)
+        result = {}
+        if not self.count:
+            return {_label(q): 0.0 for q in qs}
+
+        ranks = [(q, max(1, int(q / 100.0 * self.count + 0.5))) for q in qs]
+        position = 0
+        seen = 0
+        for index, value in enumerate(self.counts):
+            if not value:
+                continue
+            seen += value
+            while position < len(ranks) and seen >= ranks[position][1]:
+                low, high = _bucket_bounds(index)
+                estimate = (low + high) / 2 / 1_000_000
+                result[_label(ranks[position][0])] = min(self.max, max(self.min, estimate))
+                position += 1
+            if position == len(ranks):
+                break
+        return result
+
+    def postfix(self, qs: Iterable[float] = (50.0, 99.0)) -> Dict[str, str]:
+        """Перцентили в виде строк для tqdm.set_postfix."""
+        return {key: format_duration(value) for key, value in self.percentiles(qs).items()}
+
+    def to_dict(self, scale: float = 1000.0) -> Dict[str, float]:
+        """
+        Сводка для словаря результатов сценария.
+
+        Args:
+            scale: Множитель единиц (1000 - миллисекунды)
+        """
+        summary = {
+            "count": self.count,
+            "min": (self.min if self.count else 0.0) * scale,
+            "avg": self.mean * scale,
+            "max": self.max * scale,
+        }
+        for key, value in self.percentiles().items():
+            summary[key] = value * scale
+        return summary
+
+
+def _label(q: float) -> str:
+    return f"p{q:g}"
+
+
+def merge_all(histograms: Iterable[Optional[LatencyHistogram]]) -> LatencyHistogram:
+    """Объединяет гистограммы нескольких воркеров в новую."""
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        if histogram is not None:
+            merged.merge(histogram)
+    return merged
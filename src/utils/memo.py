@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Кэш мемоизации для вычислений сценариев.
+Ограниченный LRU в памяти и необязательный постоянный уровень на диске
+(SQLite), который переживает перезапуск программы.
+"""
+
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class MemoCache:
+    """
+    LRU-кэш со счетчиками попаданий, промахов и вытеснений.
+    """
+
+    def __init__(self, maxsize: int = 4096, persist_path: Optional[str] = None,
+                 namespace: str = "default", write_batch: int = 256):
+        """
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное число записей в памяти
+            persist_path: Путь к файлу SQLite для дискового уровня (None - без него)
+            namespace: Пространство имен записей на диске
+            write_batch: Сколько новых записей копить перед записью на диск
+        """
+        self.maxsize = maxsize
+        self.namespace = namespace
+        self.write_batch = write_batch
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._pending: List[Tuple[str, str, bytes]] = []
+        self._db: Optional[sqlite3.Connection] = None
+
+        if persist_path:
+            directory = os.path.dirname(persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(persist_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение по ключу, поднимая его в начало LRU."""
+        value = self._entries.get(key, _MISSING)
+        if value is not _MISSING:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT value FROM memo WHERE namespace = ? AND key = ?",
+                (self.namespace, repr(key))
+            ).fetchone()
+            if row is not None:
+                value = pickle.loads(row[0])
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key, value)
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any):
+        """Сохраняет значение в памяти и ставит его в очередь на запись на диск."""
+        self._store(key, value)
+        if self._db is not None:
+            self._pending.append((self.namespace, repr(key), pickle.dumps(value)))
+            if len(self._pending) >= self.write_batch:
+                self.flush()
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Значение из кэша или результат compute(), который сразу кэшируется."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hit_rate,
+        }
+
+    def postfix(self) -> Dict[str, str]:
+        """Счетчики кэша для tqdm.set_postfix."""
+        return {
+            "кэш": f"{self.hit_rate:.0%}",
+            "попаданий": str(self.hits),
+            "вытеснено": str(self.evictions),
+        }
+
+    def flush(self):
+        """Записывает накопленные записи на диск одной транзакцией."""
+        if self._db is None or not self._pending:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO memo (namespace, key, value) VALUES (?, ?, ?)",
+                self._pending
+            )
+        self._pending.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self._pending.clear()
+        if self._db is not None:
+            with self._db:
+                self._db.execute("DELETE FROM memo WHERE namespace = ?", (self.namespace,))
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Реестр метрик (счетчики, измерители, гистограммы) и их экспорт
+в текстовом формате Prometheus: по HTTP во время работы и в файл при выходе.
+
+Переменные окружения:
+    TQDM_DEMO_METRICS_PORT  Порт HTTP-эндпоинта /metrics (не задан - выключен)
+    TQDM_DEMO_METRICS_HOST  Адрес для HTTP-эндпоинта (127.0.0.1)
+    TQDM_DEMO_METRICS_FILE  Файл, куда метрики записываются при выходе
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Границы по умолчанию для длительностей в секундах
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание, дочерние серии по значениям меток."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any, **kwargs: Any):
+        """Серия метрики для конкретных значений меток."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name}: нужны значения меток {self.labelnames}")
+        return self._children[()]
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _Value:
+    # У каждой серии своя блокировка: += - это чтение и запись, и без нее
+    # одновременные inc из разных потоков теряют приращения
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+    def samples(self):
+        return [("", _format_labels(self.labelnames, key), child.value)
+                for key, child in list(self._children.items())]
+
+
+class _CounterChild(_Value):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1):
+        if amount < 0:
+            raise ValueError("Счетчик не может уменьшаться")
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default().inc(-amount)
+
+    def samples(self):
+        return [("", _format_labels(self.labelnames, key), child.value)
+                for key, child in list(self._children.items())]
+
+
+class _GaugeChild(_Value):
+    __slots__ = ()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными границами корзин (накопительная при экспорте)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        result = []
+        for key, child in list(self._children.items()):
+            # Корзины, сумма и число - из одного снимка серии
+            with child._lock:
+                counts, total, observed = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                result.append(("_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            result.append(("_sum", labels, total))
+            result.append(("_count", labels, observed))
+        return result
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self.observe)
+
+
+class _Timer:
+    """Контекстный менеджер: длительность блока уходит в гистограмму."""
+
+    def __init__(self, observe: Callable[[float], None]):
+        self._observe = observe
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._observe(time.perf_counter() - self._started)
+
+
+class MetricsRegistry:
+    """
+    Набор метрик программы. Повторная регистрация с тем же именем
+    возвращает уже существующую метрику.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._dump_registered = False
+
+    def _register(self, cls, name: str, documentation: str, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Метрика {name} уже зарегистрирована как {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames=labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames=labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation,
+                              labelnames=labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def dump(self, path: str):
+        """Записывает метрики в файл (через временный файл, чтобы не оставить обрывок)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+# Метрики, которые пишут сценарии и менеджер хранилища
+SCENARIO_RUNS = REGISTRY.counter(
+    "tqdm_demo_scenario_runs_total", "Завершенные запуски сценариев", ("scenario", "status"))
+SCENARIO_DURATION = REGISTRY.histogram(
+    "tqdm_demo_scenario_duration_seconds", "Длительность сценария", ("scenario",),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+SCENARIO_ACTIVE = REGISTRY.gauge(
+    "tqdm_demo_scenario_active", "Выполняется ли сценарий сейчас", ("scenario",))
+FILES_PROCESSED = REGISTRY.counter(
+    "tqdm_demo_files_processed_total", "Обработанные файлы", ("status",))
+FILE_LATENCY = REGISTRY.histogram(
+    "tqdm_demo_file_process_seconds", "Время обработки одного файла")
+DOWNLOAD_BYTES = REGISTRY.counter(
+    "tqdm_demo_download_bytes_total", "Загруженные байты")
+DOWNLOAD_CHUNK_LATENCY = REGISTRY.histogram(
+    "tqdm_demo_download_chunk_seconds", "Время загрузки одного чанка")
+DOWNLOAD_FILES = REGISTRY.counter(
+    "tqdm_demo_download_files_total", "Загруженные файлы", ("status",))
+ITEMS_PROCESSED = REGISTRY.counter(
+    "tqdm_demo_items_processed_total", "Обработанные элементы данных", ("mode",))
+STORAGE_OPERATIONS = REGISTRY.counter(
+    "tqdm_demo_storage_operations_total", "Операции с хранилищем", ("operation", "status"))
+STORAGE_LATENCY = REGISTRY.histogram(
+    "tqdm_demo_storage_operation_seconds", "Длительность операций с хранилищем", ("operation",))
+
+
+def flag_status(result: Any) -> bool:
+    """Статус результата (флаг успеха, ...); результат другого вида - успех."""
+    if isinstance(result, tuple) and result and isinstance(result[0], bool):
+        return result[0]
+    return True
+
+
+def message_status(result: Any) -> bool:
+    """Статус результата (число, сообщение): ошибка - сообщение с ❌."""
+    return not result[1].startswith("❌")
+
+
+def batch_status(report: Any) -> bool:
+    """Статус пакета (BatchReport): успех, если ни один файл не завершился ошибкой."""
+    return not report.failed
+
+
+def track_operation(operation: str, status: Callable[[Any], bool] = flag_status):
+    """
+    Декоратор для методов StorageManager: считает вызовы и их длительность.
+
+    Args:
+        operation: Имя операции в метках
+        status: Успех по результату метода (по умолчанию - флаг в первом
+                элементе кортежа; для числа файлов или пакета нужен свой)
+    """
+    def decorator(func: Callable) -> Callable:
+        latency = STORAGE_LATENCY.labels(operation)
+        ok = STORAGE_OPERATIONS.labels(operation, "ok")
+        error = STORAGE_OPERATIONS.labels(operation, "error")
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                error.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+            (ok if status(result) else error).inc()
+            return result
+        return wrapper
+    return decorator
+
+
+def _handler_class(registry: MetricsRegistry):
+    # http.server тянет за собой email, socket и ssl - импортируем его,
+    # только когда эндпоинт действительно включен
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Запросы сборщика не должны ломать прогресс-бары в терминале
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """
+    HTTP-эндпоинт /metrics в фоновом потоке.
+    """
+
+    def __init__(self, port: int = 9108, host: str = "127.0.0.1",
+                 registry: MetricsRegistry = REGISTRY):
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer((host, port), _handler_class(registry))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def close(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_server: Optional[MetricsServer] = None
+
+
+def start_from_env(registry: MetricsRegistry = REGISTRY) -> Optional[MetricsServer]:
+    """
+    Включает экспорт по переменным окружения. Безопасно вызывать повторно.
+
+    Returns:
+        Optional[MetricsServer]: Запущенный сервер или None
+    """
+    global _server
+    dump_path = os.environ.get("TQDM_DEMO_METRICS_FILE")
+    if dump_path and not registry._dump_registered:
+        registry._dump_registered = True
+        atexit.register(registry.dump, dump_path)
+
+    port = os.environ.get("TQDM_DEMO_METRICS_PORT")
+    if port and _server is None:
+        host = os.environ.get("TQDM_DEMO_METRICS_HOST", "127.0.0.1")
+        try:
+            _server = MetricsServer(int(port), host, registry)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Не удалось запустить экспорт метрик на {host}:{port}: {e}")
+    return _server
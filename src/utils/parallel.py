@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Параллельное отображение функции на пул процессов.
+Размер чанков подбирается по измеренной стоимости одной задачи.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils import shared_progress
+
+
+def _run_chunk(func: Callable, chunk: List[Any]) -> Tuple[List[Any], float]:
+    """Выполняется в дочернем процессе: обрабатывает чанк и замеряет время."""
+    started = time.perf_counter()
+    progress = shared_progress.current()
+    if progress is None:
+        results = [func(item) for item in chunk]
+    else:
+        results = []
+        for item in chunk:
+            results.append(func(item))
+            progress.add(1)
+    return results, time.perf_counter() - started
+
+
+class AdaptiveChunker:
+    """
+    Подбирает размер чанка так, чтобы один чанк занимал около target_seconds.
+
+    Слишком мелкие чанки тратят время на межпроцессный обмен,
+    слишком крупные - ухудшают балансировку между воркерами.
+    """
+
+    def __init__(self, target_seconds: float = 0.05, min_size: int = 1,
+                 max_size: int = 10_000, smoothing: float = 0.3):
+        """
+        Инициализация подборщика.
+
+        Args:
+            target_seconds: Желаемая длительность обработки одного чанка
+            min_size: Минимальный размер чанка
+            max_size: Максимальный размер чанка
+            smoothing: Коэффициент экспоненциального сглаживания стоимости
+        """
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.smoothing = smoothing
+        self.cost_per_task: Optional[float] = None
+
+    def observe(self, tasks: int, elapsed: float):
+        """Учитывает время обработки очередного чанка."""
+        if tasks <= 0:
+            return
+        cost = elapsed / tasks
+        if self.cost_per_task is None:
+            self.cost_per_task = cost
+        else:
+            self.cost_per_task += self.smoothing * (cost - self.cost_per_task)
+
+    def next_size(self) -> int:
+        """Размер следующего чанка (до первого замера - минимальный)."""
+        if not self.cost_per_task:
+            return self.min_size
+        size = int(self.target_seconds / self.cost_per_task)
+        return max(self.min_size, min(self.max_size, size))
+
+
+def parallel_map(func: Callable, items: Iterable[Any], workers: Optional[int] = None,
+                 ordered: bool = True, chunker: Optional[AdaptiveChunker] = None,
+                 stats: Optional[Dict[str, Any]] = None,
+                 progress: Optional["shared_progress.SharedProgress"] = None) -> Iterator[List[Any]]:
+    """
+    Применяет func к элементам items в пуле процессов.
+
+    Args:
+        func: Функция уровня модуля (должна сериализоваться pickle)
+        items: Входные элементы (читаются лениво, по мере отправки чанков)
+        workers: Число процессов (по умолчанию os.cpu_count())
+        ordered: True - чанки выдаются в исходном порядке,
+                 False - по мере готовности
+        chunker: Подборщик размера чанков
+        stats: Словарь, куда записываются chunks и последний chunk_size
+        progress: Общий прогресс в разделяемой памяти, который воркеры
+                  обновляют после каждого элемента
+
+    Yields:
+        List[Any]: Результаты очередного чанка
+    """
+    workers = workers or os.cpu_count() or 1
+    chunker = chunker or AdaptiveChunker()
+    if stats is None:
+        stats = {}
+    stats.setdefault("chunks", 0)
+
+    source = iter(items)
+    max_inflight = workers * 2
+    pending = {}
+    ready: Dict[int, List[Any]] = {}
+    next_submit = 0
+    next_yield = 0
+    exhausted = False
+
+    pool_kwargs = {}
+    if progress is not None:
+        pool_kwargs = {"initializer": progress.initializer, "initargs": progress.initargs}
+
+    with ProcessPoolExecutor(max_workers=workers, **pool_kwargs) as executor:
+        while True:
+            # Готовые чанки, ждущие своей очереди, тоже занимают место:
+            # иначе при одном медленном чанке ready растет без предела
+            while not exhausted and len(pending) + len(ready) < max_inflight:
+                size = chunker.next_size()
+                chunk = list(islice(source, size))
+                if not chunk:
+                    exhausted = True
+                    break
+                stats["chunk_size"] = size
+                pending[executor.submit(_run_chunk, func, chunk)] = (next_submit, len(chunk))
+                next_submit += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, size = pending.pop(future)
+                results, elapsed = future.result()
+                chunker.observe(size, elapsed)
+                stats["chunks"] += 1
+                if ordered:
+                    ready[index] = results
+                else:
+                    yield results
+
+            while ordered and next_yield in ready:
+                yield ready.pop(next_yield)
+                next_yield += 1
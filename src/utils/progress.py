@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Легковесная обертка над tqdm для горячих циклов.
+Копит вызовы update() в целочисленном счетчике и форматирует postfix
+только тогда, когда бар действительно перерисовывается (раз в mininterval).
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from src.utils.headless import progress_bar
+
+
+class FastProgress:
+    """
+    Прогресс-бар с отложенными обновлениями.
+
+    Время проверяется не на каждой итерации, а раз в check_every вызовов;
+    check_every растет удвоением, пока интервал не истек, а после каждой
+    перерисовки пересчитывается по скорости (около 4 проверок за mininterval).
+    """
+
+    def __init__(self, total: Optional[int] = None, mininterval: float = 0.1,
+                 **tqdm_kwargs):
+        """
+        Инициализация бара.
+
+        Args:
+            total: Общее количество итераций
+            mininterval: Минимальный интервал между перерисовками в секундах
+            **tqdm_kwargs: Остальные параметры tqdm (desc, unit, colour, ...)
+        """
+        self.mininterval = mininterval
+        self.bar = progress_bar(total=total, mininterval=0, miniters=1, **tqdm_kwargs)
+        self._pending = 0
+        self._check_every = 1
+        self._next_check = 1
+        self._last_flush = time.perf_counter()
+        self._postfix: Dict[str, Any] = {}
+        self._postfix_source: Optional[Callable[[], Dict[str, Any]]] = None
+        self._description: Optional[str] = None
+
+    @property
+    def n(self) -> int:
+        return self.bar.n + self._pending
+
+    @property
+    def total(self) -> Optional[int]:
+        return self.bar.total
+
+    def update(self, n: int = 1):
+        """Учитывает n итераций; перерисовка - не чаще раза в mininterval."""
+        self._pending += n
+        self._next_check -= 1
+        if self._next_check <= 0:
+            self._maybe_flush()
+
+    def tick(self):
+        """Самый дешевый путь для горячего цикла: одна итерация."""
+        self._pending += 1
+        self._next_check -= 1
+        if self._next_check <= 0:
+            self._maybe_flush()
+
+    def iterate(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Оборачивает итератор; счетчик ведется в локальной переменной."""
+        pending = 0
+        countdown = self._check_every
+        for item in iterable:
+            yield item
+            pending += 1
+            countdown -= 1
+            if countdown <= 0:
+                self._pending += pending
+                pending = 0
+                self._maybe_flush()
+                countdown = self._check_every
+        self._pending += pending
+
+    def set_postfix(self, **fields: Any):
+        """
+        Запоминает поля postfix. Значения-функции вызываются только при перерисовке.
+        """
+        self._postfix.update(fields)
+
+    def postfix_from(self, source: Callable[[], Dict[str, Any]]):
+        """Задает функцию, которая строит postfix в момент перерисовки."""
+        self._postfix_source = source
+
+    def set_description(self, desc: str):
+        """Меняет описание; показывается сразу, если интервал перерисовки истек."""
+        self._description = desc
+        now = time.perf_counter()
+        if now - self._last_flush >= self.mininterval:
+            self._flush(now, now - self._last_flush)
+
+    def write(self, message: str):
+        self.bar.write(message)
+
+    def _maybe_flush(self):
+        now = time.perf_counter()
+        elapsed = now - self._last_flush
+        if elapsed >= self.mininterval:
+            self._flush(now, elapsed)
+        else:
+            # Интервал еще не истек - проверяем реже, пока не узнаем скорость
+            self._check_every *= 2
+        self._next_check = self._check_every
+
+    def _flush(self, now: float, elapsed: float):
+        if elapsed > 0 and self._pending > 0:
+            # Проверять время примерно 4 раза за mininterval
+            rate = self._pending / elapsed
+            self._check_every = max(1, int(rate * self.mininterval / 4))
+
+        if self._description is not None:
+            self.bar.set_description(self._description, refresh=False)
+            self._description = None
+        if self._postfix or self._postfix_source:
+            fields = {key: value() if callable(value) else value
+                      for key, value in self._postfix.items()}
+            if self._postfix_source:
+                fields.update(self._postfix_source())
+            self.bar.set_postfix(fields, refresh=False)
+
+        if self._pending:
+            self.bar.update(self._pending)
+            self._pending = 0
+        else:
+            self.bar.refresh()
+        self._last_flush = now
+
+    def flush(self):
+        """Принудительно переносит накопленное состояние в бар."""
+        now = time.perf_counter()
+        self._flush(now, now - self._last_flush)
+
+    def close(self):
+        self.flush()
+        self.bar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Слой устойчивости для сетевых операций.
+Таймауты попыток, экспоненциальная задержка с джиттером, бюджет повторов
+и хеджированные (дублирующие) запросы для борьбы с хвостовыми задержками.
+
+С виртуальными часами попытки выполняются по очереди в вызывающем
+потоке, каждая на своей шкале модельного времени, а гонка основного
+запроса, хеджа и таймаута разыгрывается по этим длительностям: при
+фиксированном зерне результат воспроизводим.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from src.utils.clock import RealClock, get_clock
+
+
+class TransferError(Exception):
+    """Ошибка передачи данных, после которой имеет смысл повторить запрос."""
+
+
+class ServerError(TransferError):
+    """Ответ сервера с кодом 5xx."""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class AttemptTimeout(TransferError):
+    """Попытка не уложилась в отведенное время."""
+
+
+RETRYABLE_ERRORS = (TransferError, ConnectionError, TimeoutError)
+
+
+class RetryBudget:
+    """
+    Бюджет повторов.
+
+    Разрешает не более min_retries + ratio * requests повторов,
+    чтобы при массовом сбое повторы не удваивали нагрузку на сервер.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        """
+        Инициализация бюджета.
+
+        Args:
+            ratio: Доля повторов от числа обычных запросов
+            min_retries: Гарантированный минимум повторов
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Списывает один повтор из бюджета, если он еще не исчерпан."""
+        with self._lock:
+            if self.retries >= self.min_retries + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Параметры повторов: число попыток, таймаут и экспоненциальная задержка.
+    """
+
+    def __init__(self, max_attempts: int = 4, attempt_timeout: Optional[float] = 5.0,
+                 base_delay: float = 0.05, max_delay: float = 2.0,
+                 budget: Optional[RetryBudget] = None):
+        """
+        Инициализация политики.
+
+        Args:
+            max_attempts: Максимальное число попыток на один запрос
+            attempt_timeout: Таймаут одной попытки в секундах (None - без таймаута)
+            base_delay: Базовая задержка перед повтором
+            max_delay: Верхняя граница задержки
+            budget: Общий бюджет повторов (None - без ограничения)
+        """
+        self.max_attempts = max_attempts
+        self.attempt_timeout = attempt_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def backoff(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """Задержка перед повтором: экспонента с полным джиттером."""
+        return (rng or random).uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class PeerLatencyTracker:
+    """
+    Скользящее окно длительностей соседних сегментов для порога хеджирования.
+    """
+
+    def __init__(self, window: int = 100, min_samples: int = 5, quantile: float = 0.95):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self._lock = threading.Lock()
+
+    def record(self, duration: float):
+        with self._lock:
+            self.samples.append(duration)
+
+    def threshold(self) -> Optional[float]:
+        """Возвращает p95 по соседям или None, пока данных недостаточно."""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return ordered[index]
+
+
+class ResilientFetcher:
+    """
+    Выполняет запросы с повторами, таймаутами и хеджированием.
+
+    Функция запроса получает threading.Event, который устанавливается,
+    когда результат попытки больше не нужен (проиграла хеджу или таймаут).
+    Паузы между повторами и задержки попыток идут по часам clock. Длительности
+    соседей, порог хеджирования и таймаут считаются на одной шкале: по
+    реальному времени или, с виртуальными часами, по модельному времени
+    самой попытки.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, hedging: bool = True,
+                 max_workers: int = 8, clock: Optional[RealClock] = None):
+        self.policy = policy or RetryPolicy()
+        self.clock = clock or get_clock()
+        self.hedging = hedging
+        self.peers = PeerLatencyTracker()
+        self.stats = {"requests": 0, "retries": 0, "hedged": 0, "hedge_wins": 0,
+                      "timeouts": 0, "failures": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="fetch")
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def call(self, request: Callable[[threading.Event], Any]) -> Any:
+        """
+        Выполняет запрос с учетом политики повторов.
+
+        Args:
+            request: Функция одной попытки, принимающая событие отмены
+
+        Returns:
+            Any: Результат первой успешной попытки
+
+        Raises:
+            TransferError: Если все попытки или бюджет повторов исчерпаны
+        """
+        policy = self.policy
+        if policy.budget:
+            policy.budget.record_request()
+        self._count("requests")
+
+        last_error: Optional[BaseException] = None
+        for attempt in range(policy.max_attempts):
+            if attempt > 0:
+                if policy.budget and not policy.budget.try_spend():
+                    break
+                self._count("retries")
+                self.clock.sleep(policy.backoff(attempt - 1, self.clock.random))
+
+            try:
+                if self.clock.virtual:
+                    result, elapsed = self._attempt_virtual(request)
+                else:
+                    result, elapsed = self._attempt(request)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                continue
+            self.peers.record(elapsed)
+            return result
+
+        self._count("failures")
+        if isinstance(last_error, TransferError):
+            raise last_error
+        raise TransferError(str(last_error) if last_error else "бюджет повторов исчерпан")
+
+    def _attempt(self, request: Callable[[threading.Event], Any]) -> Tuple[Any, float]:
+        """Попытка по реальному времени: (результат, длительность)."""
+        timeout = self.policy.attempt_timeout
+        started = time.perf_counter()
+        deadline = started + timeout if timeout is not None else None
+
+        cancel = threading.Event()
+        pending = {self._executor.submit(request, cancel): "primary"}
+
+        hedge_after = self.peers.threshold() if self.hedging else None
+        if hedge_after is not None and (deadline is None or hedge_after < timeout):
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                self._count("hedged")
+                pending[self._executor.submit(request, cancel)] = "hedge"
+
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    self._count("timeouts")
+                    raise AttemptTimeout(f"нет ответа за {timeout:.2f}с")
+                for future in done:
+                    kind = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except RETRYABLE_ERRORS as e:
+                        error = e
+                        continue
+                    if kind == "hedge":
+                        self._count("hedge_wins")
+                    return result, time.perf_counter() - started
+            raise error
+        finally:
+            cancel.set()
+
+    def _run_on_timeline(self, request: Callable[[threading.Event], Any]
+                         ) -> Tuple[float, Any, Optional[BaseException]]:
+        """Выполняет запрос на отдельной шкале: (длительность, результат, ошибка)."""
+        with self.clock.timeline() as timeline:
+            try:
+                result, error = request(threading.Event()), None
+            except RETRYABLE_ERRORS as e:
+                result, error = None, e
+        return timeline.elapsed, result, error
+
+    def _attempt_virtual(self, request: Callable[[threading.Event], Any]) -> Tuple[Any, float]:
+        """
+        Попытка по модельному времени: (результат, длительность).
+
+        Запросы выполняются до конца, затем исход определяется так же,
+        как в реальном режиме: хедж уходит, если основной запрос не
+        завершился за порог, побеждает первый успешный ответ, после
+        таймаута ответы не ждутся. Часы сдвигаются на длительность попытки.
+        """
+        timeout = self.policy.attempt_timeout
+        duration, result, error = self._run_on_timeline(request)
+        finishes = [(duration, "primary", result, error)]
+
+        hedge_after = self.peers.threshold() if self.hedging else None
+        if (hedge_after is not None and (timeout is None or hedge_after < timeout)
+                and duration > hedge_after):
+            self._count("hedged")
+            duration, result, error = self._run_on_timeline(request)
+            finishes.append((hedge_after + duration, "hedge", result, error))
+        finishes.sort(key=lambda finish: finish[0])
+
+        last_error: Optional[BaseException] = None
+        for finished, kind, result, error in finishes:
+            if timeout is not None and finished > timeout:
+                self.clock.sleep(timeout)
+                self._count("timeouts")
+                raise AttemptTimeout(f"нет ответа за {timeout:.2f}с")
+            if error is None:
+                self.clock.sleep(finished)
+                if kind == "hedge":
+                    self._count("hedge_wins")
+                return result, finished
+            last_error = error
+        self.clock.sleep(finishes[-1][0])
+        raise last_error
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Постоянная история запусков сценариев в SQLite.
+
+Каждый запуск - строка в runs и числовые метрики в points (только
+добавление). Скользящие агрегаты по каждой метрике (число запусков,
+среднее и сумма квадратов отклонений по Уэлфорду, минимум, максимум,
+последнее значение, EWMA) обновляются в той же транзакции, поэтому
+общая статистика не требует просмотра истории, а тренд за последние
+N запусков читается по индексу.
+
+Запись буферизуется: record() только кладет запуск в очередь, в базу
+очередь уходит одной транзакцией при заполнении пакета, при запросе
+и при закрытии. Если транзакция не удалась, очередь остается в памяти
+до следующей попытки.
+
+Переменные окружения:
+    TQDM_DEMO_HISTORY  Путь к базе (по умолчанию storage/history.db)
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PATH = os.path.join("storage", "history.db")
+EWMA_ALPHA = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    status TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE TABLE IF NOT EXISTS points (
+    run_id INTEGER NOT NULL,
+    scenario TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (scenario, metric, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aggregates (
+    scenario TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    last REAL NOT NULL,
+    ewma REAL NOT NULL,
+    PRIMARY KEY (scenario, metric)
+) WITHOUT ROWID;
+"""
+
+# Шаг Уэлфорда: справа в SET - значения строки до обновления. Сумма
+# квадратов при больших значениях теряет точность (total_sq/n - mean^2
+# вычитает близкие числа), поэтому хранятся среднее и m2
+UPSERT_AGGREGATE = """
+INSERT INTO aggregates (scenario, metric, runs, mean, m2, min, max, last, ewma)
+VALUES (:scenario, :metric, 1, :value, 0, :value, :value, :value, :value)
+ON CONFLICT (scenario, metric) DO UPDATE SET
+    runs = runs + 1,
+    mean = mean + (:value - mean) / (runs + 1),
+    m2 = m2 + (:value - mean) * (:value - (mean + (:value - mean) / (runs + 1))),
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max),
+    last = excluded.last,
+    ewma = ewma + :alpha * (excluded.last - ewma)
+"""
+
+# Агрегаты старого формата (total, total_sq) пересчитываются по points
+MIGRATE_AGGREGATES = """
+ALTER TABLE aggregates RENAME TO aggregates_old;
+CREATE TABLE aggregates (
+    scenario TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    last REAL NOT NULL,
+    ewma REAL NOT NULL,
+    PRIMARY KEY (scenario, metric)
+) WITHOUT ROWID;
+INSERT INTO aggregates (scenario, metric, runs, mean, m2, min, max, last, ewma)
+SELECT scenario, metric, runs, total / runs, 0, min, max, last, ewma FROM aggregates_old;
+UPDATE aggregates SET m2 = (
+    SELECT COALESCE(SUM((p.value - aggregates.mean) * (p.value - aggregates.mean)), 0)
+    FROM points p WHERE p.scenario = aggregates.scenario AND p.metric = aggregates.metric
+);
+DROP TABLE aggregates_old;
+"""
+
+
+def flatten_metrics(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """
+    Числовые значения результата сценария; вложенные словари дают
+    ключи вида "latency_ms.p99". Строки, списки и массивы пропускаются.
+    """
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, bool):
+            continue
+        elif isinstance(value, (int, float)) and math.isfinite(value):
+            flat[name] = float(value)
+    return flat
+
+
+class RunHistory:
+    """
+    История запусков с пакетной записью.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 16):
+        """
+        Инициализация. База открывается при первой записи или запросе.
+
+        Args:
+            path: Путь к файлу базы (":memory:" - без сохранения на диск)
+            batch_size: Сколько запусков копится в очереди до записи
+        """
+        self.path = path or os.environ.get("TQDM_DEMO_HISTORY") or DEFAULT_PATH
+        self.batch_size = max(1, batch_size)
+        self._pending: List[Tuple[str, float, float, str, Dict[str, float], Optional[str]]] = []
+        self._lock = threading.Lock()
+        self._conn = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _connect(self):
+        if self._conn is None:
+            # sqlite3 нужен только при первом обращении к истории
+            import sqlite3
+            if self.path != ":memory:":
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(aggregates)")}
+            if "m2" not in columns:
+                self._conn.executescript(f"BEGIN;\n{MIGRATE_AGGREGATES}COMMIT;")
+        return self._conn
+
+    def record(self, scenario: str, results: Dict[str, Any], duration: float,
+               started_at: Optional[float] = None, status: str = "ok",
+               throughput: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        """
+        Ставит запуск в очередь на запись.
+
+        Args:
+            scenario: Имя сценария
+            results: Результаты run() (сохраняются числовые значения)
+            duration: Длительность запуска в секундах
+            started_at: Время начала (по умолчанию - сейчас минус duration)
+            status: ok или error
+            throughput: Ключ счетчика в results; его отношение к duration
+                        сохраняется как метрика per_sec
+            extra: Нечисловые данные запуска (сохраняются как JSON)
+        """
+        if started_at is None:
+            started_at = time.time() - duration
+        metrics = flatten_metrics(results or {})
+        metrics["duration_s"] = float(duration)
+        if throughput in metrics and duration > 0:
+            metrics["per_sec"] = metrics[throughput] / duration
+        payload = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+        with self._lock:
+            self._pending.append((scenario, started_at, duration, status, metrics, payload))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Записывает очередь одной транзакцией. При ошибке транзакция
+        откатывается, а очередь сохраняется.
+
+        Returns:
+            int: Число записанных запусков
+        """
+        with self._lock:
+            pending = self._pending
+            if not pending:
+                return 0
+            conn = self._connect()
+            with conn:
+                for scenario, started_at, duration, status, metrics, payload in pending:
+                    cursor = conn.execute(
+                        "INSERT INTO runs (scenario, started_at, duration, status, extra) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (scenario, started_at, duration, status, payload)
+                    )
+                    run_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT INTO points (run_id, scenario, metric, value) VALUES (?, ?, ?, ?)",
+                        [(run_id, scenario, metric, value) for metric, value in metrics.items()]
+                    )
+                    conn.executemany(
+                        UPSERT_AGGREGATE,
+                        [{"scenario": scenario, "metric": metric, "value": value,
+                          "alpha": EWMA_ALPHA} for metric, value in metrics.items()]
+                    )
+            self._pending = []
+            return len(pending)
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            atexit.unregister(self.close)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # --- Запросы -----------------------------------------------------------
+
+    def scenarios(self) -> List[str]:
+        self.flush()
+        rows = self._connect().execute("SELECT DISTINCT scenario FROM aggregates ORDER BY scenario")
+        return [row[0] for row in rows]
+
+    def metrics(self, scenario: str) -> List[str]:
+        self.flush()
+        rows = self._connect().execute(
+            "SELECT metric FROM aggregates WHERE scenario = ? ORDER BY metric", (scenario,))
+        return [row[0] for row in rows]
+
+    def aggregate(self, scenario: str, metric: str) -> Optional[Dict[str, float]]:
+        """
+        Агрегат метрики за всю историю: count, mean, stdev, min, max, last, ewma.
+        Читается из таблицы агрегатов, без просмотра запусков.
+        """
+        self.flush()
+        row = self._connect().execute(
+            "SELECT runs, mean, m2, min, max, last, ewma FROM aggregates "
+            "WHERE scenario = ? AND metric = ?", (scenario, metric)
+        ).fetchone()
+        if row is None:
+            return None
+        runs, mean, m2, low, high, last, ewma = row
+        variance = max(0.0, m2 / runs)
+        return {"count": runs, "mean": mean, "stdev": math.sqrt(variance),
+                "min": low, "max": high, "last": last, "ewma": ewma}
+
+    def trend(self, scenario: str, metric: str, last: int = 30) -> Optional[Dict[str, Any]]:
+        """
+        Тренд метрики за последние last запусков (чтение по индексу).
+
+        Returns:
+            Optional[Dict[str, Any]]: values (от старых к новым), count, mean,
+            min, max и slope - изменение за один запуск по МНК
+        """
+        self.flush()
+        rows = self._connect().execute(
+            "SELECT value FROM points WHERE scenario = ? AND metric = ? "
+            "ORDER BY run_id DESC LIMIT ?", (scenario, metric, last)
+        ).fetchall()
+        if not rows:
+            return None
+        values = [row[0] for row in reversed(rows)]
+        count = len(values)
+        mean = sum(values) / count
+        x_mean = (count - 1) / 2
+        denominator = sum((x - x_mean) ** 2 for x in range(count))
+        slope = (sum((x - x_mean) * (v - mean) for x, v in enumerate(values)) / denominator
+                 if denominator else 0.0)
+        return {"values": values, "count": count, "mean": mean,
+                "min": min(values), "max": max(values), "slope": slope}
+
+    def count_since(self, started_at: float) -> Dict[str, int]:
+        """Число запусков по сценариям, начатых не раньше started_at."""
+        self.flush()
+        rows = self._connect().execute(
+            "SELECT scenario, COUNT(*) FROM runs WHERE started_at >= ? GROUP BY scenario",
+            (started_at,)
+        )
+        return dict(rows.fetchall())
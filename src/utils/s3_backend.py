@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Бэкенд S3-совместимого объектного хранилища без сторонних пакетов.
+
+Запросы подписываются AWS Signature V4 и идут через пул постоянных
+HTTP-соединений. Большие файлы загружаются по частям (multipart upload)
+параллельно, а скачиваются параллельными запросами диапазонов: первый
+запрос сразу просит первый диапазон, и если объект в него поместился,
+лишних обращений нет.
+
+Путь файла хранилища "storage/temp/a.txt" становится ключом объекта
+"<prefix>storage/temp/a.txt"; каталогов в бакете нет.
+"""
+
+import datetime
+import errno
+import hashlib
+import hmac
+import http.client
+import os
+import posixpath
+import queue
+import threading
+import urllib.parse
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.sharding import FlatLayout
+from src.utils.storage_backends import FileRecord, StorageBackend
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+# Минимальный размер части multipart upload (кроме последней) в S3
+MIN_PART_SIZE = 5 * 1024 * 1024
+# Методы, повтор которых после отправки не меняет результат
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE"))
+
+
+class S3Error(OSError):
+    """
+    Ответ S3 с ошибкой.
+    """
+
+    def __init__(self, status: int, code: str, message: str = ""):
+        super().__init__(errno.EIO, f"S3 {status} {code}: {message}".rstrip(": "))
+        self.status = status
+        self.code = code
+
+
+def _quote(value: str, safe: str = "-_.~") -> str:
+    return urllib.parse.quote(value, safe=safe)
+
+
+def canonical_query(query: Dict[str, str]) -> str:
+    return "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(query.items()))
+
+
+def sign(method: str, uri: str, query: Dict[str, str], headers: Dict[str, str],
+         payload_hash: str, secret_key: str, region: str, amz_date: str,
+         service: str = "s3") -> Tuple[str, str, str]:
+    """
+    Подпись запроса по AWS Signature V4.
+
+    Args:
+        uri: Путь запроса, уже закодированный (как он уйдет в запросе)
+        headers: Подписываемые заголовки (имена в нижнем регистре)
+        amz_date: Время в формате YYYYMMDDTHHMMSSZ
+
+    Returns:
+        Tuple[str, str, str]: (signed headers, область ключа, подпись)
+    """
+    names = sorted(headers)
+    canonical_headers = "".join(f"{name}:{' '.join(str(headers[name]).split())}\n"
+                                for name in names)
+    signed_headers = ";".join(names)
+    canonical_request = "\n".join([method, uri, canonical_query(query), canonical_headers,
+                                   signed_headers, payload_hash])
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([ALGORITHM, amz_date, scope,
+                                hashlib.sha256(canonical_request.encode()).hexdigest()])
+    key = f"AWS4{secret_key}".encode()
+    for part in (amz_date[:8], region, service, "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return signed_headers, scope, signature
+
+
+def _strip_namespace(root: ElementTree.Element):
+    for element in root.iter():
+        if "}" in element.tag:
+            element.tag = element.tag.split("}", 1)[1]
+    return root
+
+
+def _parse_xml(data: bytes) -> ElementTree.Element:
+    return _strip_namespace(ElementTree.fromstring(data))
+
+
+def _parse_iso(value: str) -> float:
+    moment = datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+    return moment.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+class S3Backend(StorageBackend):
+    """
+    Объектное хранилище S3 (AWS, MinIO, Ceph RGW, локальная заглушка).
+    """
+
+    name = "s3"
+
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", prefix: str = "",
+                 part_size: int = 8 * 1024 * 1024, multipart_threshold: int = 16 * 1024 * 1024,
+                 max_workers: int = 8, timeout: float = 30.0):
+        """
+        Args:
+            endpoint: Адрес сервиса (http://host:port или https://...)
+            bucket: Бакет (адресация по пути: /bucket/key)
+            access_key: Идентификатор ключа доступа
+            secret_key: Секретный ключ
+            region: Регион для подписи
+            prefix: Префикс ключей всех файлов хранилища
+            part_size: Размер части при загрузке и диапазона при скачивании
+            multipart_threshold: С какого размера файл передается по частям
+            max_workers: Параллельных запросов на одну передачу (и размер пула соединений)
+            timeout: Таймаут сокета, секунды
+        """
+        parsed = urllib.parse.urlsplit(endpoint)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Некорректный адрес S3: {endpoint}")
+        self.endpoint = endpoint
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.part_size = max(MIN_PART_SIZE, part_size)
+        self.multipart_threshold = max(self.part_size, multipart_threshold)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.server = None
+        self.requests = 0
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._host_header = parsed.netloc
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "S3Backend":
+        endpoint = os.environ.get("TQDM_DEMO_S3_ENDPOINT")
+        if not endpoint:
+            raise ValueError("Не задан TQDM_DEMO_S3_ENDPOINT")
+        return cls(endpoint,
+                   os.environ.get("TQDM_DEMO_S3_BUCKET", "tqdm-demo"),
+                   os.environ.get("AWS_ACCESS_KEY_ID", ""),
+                   os.environ.get("AWS_SECRET_ACCESS_KEY", ""),
+                   os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or "us-east-1")
+
+    def __repr__(self):
+        return f"S3Backend({self.endpoint!r}, {self.bucket!r})"
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def _key(self, path: str) -> str:
+        path = posixpath.normpath(path.replace(os.sep, "/")).lstrip("/")
+        return self.prefix + ("" if path == "." else path)
+
+    def _uri(self, key: str = "") -> str:
+        uri = f"/{_quote(self.bucket)}"
+        return f"{uri}/{_quote(key, safe='/-_.~')}" if key else uri
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            return cls(self._host, self._port, timeout=self.timeout)
+
+    def _release(self, connection: http.client.HTTPConnection):
+        if self._pool.qsize() < self.max_workers:
+            self._pool.put(connection)
+        else:
+            connection.close()
+
+    def _request(self, method: str, key: str = "", query: Optional[Dict[str, str]] = None,
+                 headers: Optional[Dict[str, str]] = None, body=b"",
+                 expect: Tuple[int, ...] = (200,)) -> Tuple[int, Dict[str, str], bytes]:
+        query = query or {}
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        payload_hash = hashlib.sha256(body).hexdigest()
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        headers.update({"host": self._host_header, "x-amz-content-sha256": payload_hash,
+                        "x-amz-date": amz_date})
+        uri = self._uri(key)
+        signed = {name: value for name, value in headers.items()
+                  if name in ("host", "range") or name.startswith("x-amz-")}
+        signed_headers, scope, signature = sign(method, uri, query, signed, payload_hash,
+                                                self.secret_key, self.region, amz_date)
+        headers["authorization"] = (f"{ALGORITHM} Credential={self.access_key}/{scope}, "
+                                    f"SignedHeaders={signed_headers}, Signature={signature}")
+        headers["content-length"] = str(len(body))
+        target = f"{uri}?{canonical_query(query)}" if query else uri
+
+        for attempt in (1, 2):
+            connection = self._connection()
+            sent = False
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                sent = True
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                # Соединение из пула могло быть закрыто сервером - одна повторная
+                # попытка. Отправленный POST (начало и завершение multipart) не
+                # повторяется: сервер мог его уже выполнить
+                if attempt == 2 or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                continue
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            break
+        with self._lock:
+            self.requests += 1
+
+        status = response.status
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if status not in expect:
+            raise self._error(status, data, key)
+        return status, response_headers, data
+
+    def _error(self, status: int, data: bytes, key: str) -> OSError:
+        code, message = str(status), ""
+        if data:
+            try:
+                root = _parse_xml(data)
+                code = root.findtext("Code") or code
+                message = root.findtext("Message") or ""
+            except ElementTree.ParseError:
+                pass
+        if status == 404 and code in ("404", "NoSuchKey"):
+            return FileNotFoundError(errno.ENOENT, f"Объект не найден: {key}", key)
+        return S3Error(status, code, message)
+
+    # --- Операции хранилища --------------------------------------------------
+
+    def list(self, dir_path: str, layout: Optional[FlatLayout] = None) -> Iterator[FileRecord]:
+        prefix = self._key(dir_path).rstrip("/")
+        prefix = f"{prefix}/" if prefix else ""
+        query = {"list-type": "2", "prefix": prefix, "delimiter": "/"}
+        while True:
+            _, _, data = self._request("GET", query=query)
+            root = _parse_xml(data)
+            for item in root.findall("Contents"):
+                key = item.findtext("Key")
+                yield (key[len(prefix):], dir_path, int(item.findtext("Size") or 0),
+                       _parse_iso(item.findtext("LastModified")))
+            token = root.findtext("NextContinuationToken")
+            if root.findtext("IsTruncated") != "true" or not token:
+                return
+            query = dict(query, **{"continuation-token": token})
+
+    def stat(self, path: str) -> Optional[Tuple[int, float]]:
+        try:
+            _, headers, _ = self._request("HEAD", self._key(path))
+        except FileNotFoundError:
+            return None
+        except S3Error as e:
+            # HEAD приходит без тела: код ошибки известен только по статусу
+            if e.status == 404:
+                return None
+            raise
+        mtime = parsedate_to_datetime(headers["last-modified"]).timestamp()
+        return int(headers.get("content-length", 0)), mtime
+
+    def _ranges(self, start: int, total: int) -> List[Tuple[int, int]]:
+        return [(offset, min(offset + self.part_size, total) - 1)
+                for offset in range(start, total, self.part_size)]
+
+    def _get_range(self, key: str, first: int, last: int) -> bytes:
+        _, _, data = self._request("GET", key, headers={"range": f"bytes={first}-{last}"},
+                                   expect=(200, 206))
+        return data
+
+    def _get_first(self, key: str) -> Tuple[bytes, int]:
+        """Первый диапазон объекта и полный размер."""
+        status, headers, data = self._request(
+            "GET", key, headers={"range": f"bytes=0-{self.part_size - 1}"}, expect=(200, 206, 416))
+        if status == 416:
+            # Пустой объект: диапазон не удовлетворить
+            return b"", 0
+        if status == 206:
+            return data, int(headers["content-range"].rsplit("/", 1)[1])
+        return data, len(data)
+
+    def read(self, path: str) -> bytes:
+        key = self._key(path)
+        first, total = self._get_first(key)
+        if total <= len(first):
+            return first
+        buffer = bytearray(total)
+        buffer[:len(first)] = first
+
+        def fetch(bounds):
+            start, end = bounds
+            buffer[start:end + 1] = self._get_range(key, start, end)
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            list(executor.map(fetch, self._ranges(len(first), total)))
+        return bytes(buffer)
+
+    def download(self, path: str, local_path: str):
+        key = self._key(path)
+        first, total = self._get_first(key)
+        temp = f"{local_path}.{os.getpid()}.part"
+        with open(temp, "wb") as f:
+            f.write(first)
+            if total > len(first):
+                f.truncate(total)
+                lock = threading.Lock()
+
+                def fetch(bounds):
+                    start, end = bounds
+                    data = self._get_range(key, start, end)
+                    with lock:
+                        f.seek(start)
+                        f.write(data)
+
+                with ThreadPoolExecutor(self.max_workers) as executor:
+                    list(executor.map(fetch, self._ranges(len(first), total)))
+        os.replace(temp, local_path)
+
+    def _multipart(self, key: str, size: int, read_part: Callable[[int, int], bytes]):
+        _, _, data = self._request("POST", key, {"uploads": ""})
+        upload_id = _parse_xml(data).findtext("UploadId")
+        ranges = self._ranges(0, size)
+
+        def upload_part(number: int) -> str:
+            start, end = ranges[number - 1]
+            _, headers, _ = self._request("PUT", key, {"partNumber": str(number), "uploadId": upload_id},
+                                          body=read_part(start, end - start + 1))
+            return headers["etag"]
+
+        try:
+            with ThreadPoolExecutor(self.max_workers) as executor:
+                etags = list(executor.map(upload_part, range(1, len(ranges) + 1)))
+            body = "".join(f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                           for number, etag in enumerate(etags, 1))
+            body = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode()
+            _, _, data = self._request("POST", key, {"uploadId": upload_id}, body=body)
+            # Ошибка сборки может прийти с кодом 200 в теле ответа
+            if b"<Error>" in data:
+                root = _parse_xml(data)
+                raise S3Error(200, root.findtext("Code") or "", root.findtext("Message") or "")
+        except BaseException:
+            try:
+                self._request("DELETE", key, {"uploadId": upload_id}, expect=(200, 204, 404))
+            except OSError:
+                pass
+            raise
+
+    def write(self, path: str, data: bytes):
+        key = self._key(path)
+        if len(data) <= self.multipart_threshold:
+            self._request("PUT", key, body=bytes(data))
+            return
+        view = memoryview(data)
+        self._multipart(key, len(data), lambda start, length: view[start:start + length])
+
+    def upload(self, local_path: str, path: str):
+        key = self._key(path)
+        size = os.path.getsize(local_path)
+        if size <= self.multipart_threshold:
+            with open(local_path, "rb") as f:
+                self._request("PUT", key, body=f.read())
+            return
+
+        def read_part(start: int, length: int) -> bytes:
+            with open(local_path, "rb") as f:
+                f.seek(start)
+                return f.read(length)
+
+        self._multipart(key, size, read_part)
+
+    def copy(self, src: str, dst: str):
+        source = f"/{self.bucket}/{self._key(src)}"
+        _, _, data = self._request("PUT", self._key(dst),
+                                   headers={"x-amz-copy-source": _quote(source, safe="/-_.~")})
+        if b"<Error>" in data:
+            root = _parse_xml(data)
+            raise S3Error(200, root.findtext("Code") or "", root.findtext("Message") or "")
+
+    def delete(self, path: str):
+        # S3 отвечает 204 и для несуществующего ключа, а Local и Memory
+        # в этом случае бросают FileNotFoundError
+        if self.stat(path) is None:
+            key = self._key(path)
+            raise FileNotFoundError(errno.ENOENT, f"Объект не найден: {key}", key)
+        self._request("DELETE", self._key(path), expect=(200, 204))
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Локальный сервер-заглушка S3 для проверки S3Backend без сети.
+
+Поддерживает то, чем пользуется бэкенд: ListObjectsV2, HEAD/GET (с
+Range), PUT (в том числе копирование через x-amz-copy-source), DELETE
+и multipart upload (создание, части, сборка, отмена). Подпись
+Signature V4 и хеш тела проверяются на каждом запросе. Объекты живут в
+памяти процесса; задержка ответа и пропускная способность одного
+соединения задаются, чтобы параллельные передачи было на чем мерить.
+"""
+
+import hashlib
+import threading
+import time
+import urllib.parse
+import uuid
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from src.utils.s3_backend import ALGORITHM, MIN_PART_SIZE, _parse_xml, sign
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class S3StandIn:
+    """
+    Сервер-заглушка S3 в фоновом потоке.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 access_key: str = "standin", secret_key: str = "standin-secret",
+                 region: str = "us-east-1", latency: float = 0.0,
+                 bandwidth: Optional[float] = None, min_part_size: int = MIN_PART_SIZE):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 - любой свободный)
+            access_key: Ключ доступа, который принимает сервер
+            secret_key: Секретный ключ для проверки подписи
+            region: Регион подписи
+            latency: Задержка перед каждым ответом, секунды
+            bandwidth: Скорость отдачи и приема одного запроса, байт/с (None - без ограничения)
+            min_part_size: Минимальный размер части multipart (кроме последней)
+        """
+        self.host = host
+        self.port = port
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.min_part_size = min_part_size
+        # (бакет, ключ) -> (данные, mtime, etag)
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, float, str]] = {}
+        self.uploads: Dict[str, Tuple[str, str, Dict[int, bytes]]] = {}
+        self.requests: Dict[str, int] = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "S3StandIn":
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="s3-standin",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # --- Обработка запросов --------------------------------------------------
+
+    def _count(self, operation: str):
+        with self._lock:
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+
+    def _throttle(self, size: int):
+        delay = self.latency
+        if self.bandwidth:
+            delay += size / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+    def _check_signature(self, handler, uri: str, query: Dict[str, str], body: bytes) -> Optional[str]:
+        """Код ошибки или None, если подпись верна."""
+        authorization = handler.headers.get("Authorization", "")
+        if not authorization.startswith(ALGORITHM + " "):
+            return "AccessDenied"
+        fields = dict(part.strip().split("=", 1)
+                      for part in authorization[len(ALGORITHM) + 1:].split(","))
+        access_key = fields.get("Credential", "").split("/", 1)[0]
+        if access_key != self.access_key:
+            return "InvalidAccessKeyId"
+        payload_hash = handler.headers.get("x-amz-content-sha256", "")
+        if payload_hash != "UNSIGNED-PAYLOAD" and payload_hash != hashlib.sha256(body).hexdigest():
+            return "XAmzContentSHA256Mismatch"
+        names = fields.get("SignedHeaders", "").split(";")
+        headers = {name: handler.headers.get(name, "") for name in names}
+        _, _, signature = sign(handler.command, uri, query, headers, payload_hash,
+                               self.secret_key, self.region, handler.headers.get("x-amz-date", ""))
+        if signature != fields.get("Signature"):
+            return "SignatureDoesNotMatch"
+        return None
+
+    def _handler_class(self):
+        from http.server import BaseHTTPRequestHandler
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело уходят отдельными записями: без TCP_NODELAY
+            # второй пакет ждет ACK, а клиент задерживает ACK до 40 мс
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                stand_in._throttle(len(body) if self.command != "HEAD" else 0)
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if "Content-Length" not in (headers or {}):
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _error(self, status: int, code: str, message: str = ""):
+                body = (f"{XML_HEADER}<Error><Code>{code}</Code>"
+                        f"<Message>{escape(message)}</Message></Error>").encode()
+                self._send(status, body if self.command != "HEAD" else b"",
+                           {"Content-Type": "application/xml"})
+
+            def _handle(self):
+                with stand_in._lock:
+                    stand_in.active += 1
+                    stand_in.max_active = max(stand_in.max_active, stand_in.active)
+                try:
+                    split = urllib.parse.urlsplit(self.path)
+                    query = dict(urllib.parse.parse_qsl(split.query, keep_blank_values=True))
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length) if length else b""
+                    stand_in._throttle(len(body))
+                    error = stand_in._check_signature(self, split.path, query, body)
+                    if error:
+                        self._error(403, error)
+                        return
+                    bucket, _, key = split.path.lstrip("/").partition("/")
+                    stand_in._dispatch(self, urllib.parse.unquote(bucket),
+                                       urllib.parse.unquote(key), query, body)
+                finally:
+                    with stand_in._lock:
+                        stand_in.active -= 1
+
+            do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = _handle
+
+        return Handler
+
+    def _dispatch(self, handler, bucket: str, key: str, query: Dict[str, str], body: bytes):
+        method = handler.command
+        if not key:
+            if method == "GET":
+                self._count("list")
+                return self._list(handler, bucket, query)
+            return handler._error(405, "MethodNotAllowed")
+        if method == "POST" and "uploads" in query:
+            self._count("create_multipart")
+            upload_id = uuid.uuid4().hex
+            with self._lock:
+                self.uploads[upload_id] = (bucket, key, {})
+            return handler._send(200, (
+                f"{XML_HEADER}<InitiateMultipartUploadResult xmlns=\"{NAMESPACE}\">"
+                f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+                f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>").encode())
+        if "uploadId" in query:
+            return self._multipart(handler, bucket, key, query, body)
+        if method in ("GET", "HEAD"):
+            self._count("get" if method == "GET" else "head")
+            return self._get(handler, bucket, key)
+        if method == "PUT":
+            source = handler.headers.get("x-amz-copy-source")
+            if source:
+                self._count("copy")
+                source_bucket, _, source_key = urllib.parse.unquote(source).lstrip("/").partition("/")
+                with self._lock:
+                    item = self.objects.get((source_bucket, source_key))
+                    if item is not None:
+                        self.objects[(bucket, key)] = (item[0], time.time(), item[2])
+                if item is None:
+                    return handler._error(404, "NoSuchKey", source_key)
+                return handler._send(200, (
+                    f"{XML_HEADER}<CopyObjectResult><ETag>{item[2]}</ETag>"
+                    f"</CopyObjectResult>").encode())
+            self._count("put")
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            with self._lock:
+                self.objects[(bucket, key)] = (body, time.time(), etag)
+            return handler._send(200, headers={"ETag": etag})
+        if method == "DELETE":
+            self._count("delete")
+            with self._lock:
+                self.objects.pop((bucket, key), None)
+            return handler._send(204)
+        return handler._error(405, "MethodNotAllowed")
+
+    def _list(self, handler, bucket: str, query: Dict[str, str]):
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        start_after = query.get("continuation-token", "")
+        max_keys = int(query.get("max-keys", 1000))
+        with self._lock:
+            keys = sorted((key, item) for (name, key), item in self.objects.items()
+                          if name == bucket and key.startswith(prefix) and key > start_after)
+        contents, prefixes = [], set()
+        last = ""
+        for key, (data, mtime, etag) in keys:
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                prefixes.add(prefix + rest.split(delimiter, 1)[0] + delimiter)
+                continue
+            if len(contents) >= max_keys:
+                break
+            modified = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(mtime))
+            contents.append(f"<Contents><Key>{escape(key)}</Key><LastModified>{modified}"
+                            f"</LastModified><ETag>{escape(etag)}</ETag><Size>{len(data)}</Size>"
+                            f"</Contents>")
+            last = key
+        truncated = len(contents) >= max_keys and keys and keys[-1][0] > last
+        token = f"<NextContinuationToken>{escape(last)}</NextContinuationToken>" if truncated else ""
+        body = (f"{XML_HEADER}<ListBucketResult xmlns=\"{NAMESPACE}\"><Name>{escape(bucket)}</Name>"
+                f"<Prefix>{escape(prefix)}</Prefix><KeyCount>{len(contents)}</KeyCount>"
+                f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}"
+                + "".join(contents)
+                + "".join(f"<CommonPrefixes><Prefix>{escape(p)}</Prefix></CommonPrefixes>"
+                          for p in sorted(prefixes))
+                + "</ListBucketResult>")
+        handler._send(200, body.encode(), {"Content-Type": "application/xml"})
+
+    def _get(self, handler, bucket: str, key: str):
+        with self._lock:
+            item = self.objects.get((bucket, key))
+        if item is None:
+            return handler._error(404, "NoSuchKey", key)
+        data, mtime, etag = item
+        headers = {"ETag": etag, "Last-Modified": formatdate(mtime, usegmt=True)}
+        requested = handler.headers.get("Range")
+        if requested and requested.startswith("bytes="):
+            first, _, last = requested[6:].partition("-")
+            first = int(first)
+            last = min(int(last) if last else len(data) - 1, len(data) - 1)
+            if first >= len(data):
+                return handler._error(416, "InvalidRange")
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+            part = data[first:last + 1]
+            if handler.command == "HEAD":
+                headers["Content-Length"] = str(len(part))
+            return handler._send(206, part, headers)
+        if handler.command == "HEAD":
+            headers["Content-Length"] = str(len(data))
+        return handler._send(200, data, headers)
+
+    def _multipart(self, handler, bucket: str, key: str, query: Dict[str, str], body: bytes):
+        upload_id = query["uploadId"]
+        with self._lock:
+            upload = self.uploads.get(upload_id)
+        if upload is None or upload[:2] != (bucket, key):
+            return handler._error(404, "NoSuchUpload", upload_id)
+        parts = upload[2]
+        method = handler.command
+        if method == "PUT":
+            self._count("upload_part")
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            with self._lock:
+                parts[int(query["partNumber"])] = body
+            return handler._send(200, headers={"ETag": etag})
+        if method == "DELETE":
+            self._count("abort_multipart")
+            with self._lock:
+                self.uploads.pop(upload_id, None)
+            return handler._send(204)
+        if method == "POST":
+            self._count("complete_multipart")
+            numbers = [int(part.findtext("PartNumber")) for part in _parse_xml(body).findall("Part")]
+            if numbers != sorted(numbers) or any(number not in parts for number in numbers):
+                return handler._error(400, "InvalidPart")
+            if any(len(parts[number]) < self.min_part_size for number in numbers[:-1]):
+                return handler._error(400, "EntityTooSmall")
+            data = b"".join(parts[number] for number in numbers)
+            etag = f'"{hashlib.md5(data).hexdigest()}-{len(numbers)}"'
+            with self._lock:
+                self.objects[(bucket, key)] = (data, time.time(), etag)
+                self.uploads.pop(upload_id, None)
+            return handler._send(200, (
+                f"{XML_HEADER}<CompleteMultipartUploadResult><Key>{escape(key)}</Key>"
+                f"<ETag>{escape(etag)}</ETag></CompleteMultipartUploadResult>").encode())
+        return handler._error(405, "MethodNotAllowed")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Раскладка файлов директории хранилища: плоская или по хеш-подкаталогам.
+
+В шардированной директории файл name лежит в подкаталоге, который
+определяется хешем имени (например, processed/3f/a9/name), поэтому
+в каждом каталоге остается немного записей, а проверка существования
+и поиск файла по имени не зависят от общего числа файлов.
+
+Раскладка директории записана в файле-маркере .layout. Файлы, которые
+еще лежат в корне (директория мигрирует или файл положен в обход
+менеджера), тоже считаются содержимым директории.
+
+Миграция плоской директории:
+    python -m src.utils.sharding storage/processed [--depth 2] [--width 2]
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from src.utils.storage_journal import place
+
+MARKER = ".layout"
+# Служебные файлы в корне шардированной директории
+RESERVED = (MARKER, MARKER + ".tmp")
+DEFAULT_DEPTH = 2
+DEFAULT_WIDTH = 2
+
+
+class FlatLayout:
+    """
+    Все файлы в корне директории.
+    """
+
+    sharded = False
+
+    def path(self, dir_path: str, name: str) -> str:
+        return os.path.join(dir_path, name)
+
+    def locate(self, dir_path: str, name: str) -> str:
+        return os.path.join(dir_path, name)
+
+    def find(self, dir_path: str, name: str) -> Optional[str]:
+        """Путь существующего файла или None."""
+        path = os.path.join(dir_path, name)
+        return path if os.path.isfile(path) else None
+
+    def reserved(self, name: str) -> bool:
+        return False
+
+    def iter_files(self, dir_path: str) -> Iterator[os.DirEntry]:
+        """Файлы директории (os.DirEntry: имя, путь и закэшированный stat)."""
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"layout": "flat"}
+
+
+class ShardedLayout(FlatLayout):
+    """
+    Файлы в подкаталогах depth уровней по width шестнадцатеричных символов хеша имени.
+    """
+
+    sharded = True
+
+    def __init__(self, depth: int = DEFAULT_DEPTH, width: int = DEFAULT_WIDTH):
+        if depth < 1 or width < 1 or depth * width > 32:
+            raise ValueError("depth и width должны быть положительными, depth*width <= 32")
+        self.depth = depth
+        self.width = width
+        self._digest_size = (depth * width + 1) // 2
+
+    def shard(self, name: str) -> str:
+        digest = hashlib.blake2b(name.encode("utf-8", "surrogateescape"),
+                                 digest_size=self._digest_size).hexdigest()
+        width = self.width
+        return os.path.join(*[digest[i:i + width] for i in range(0, self.depth * width, width)])
+
+    def path(self, dir_path: str, name: str) -> str:
+        """Место файла в шардированной раскладке (каталоги не создаются)."""
+        return os.path.join(dir_path, self.shard(name), name)
+
+    def locate(self, dir_path: str, name: str) -> str:
+        """Фактический путь: шард, а если файла там нет и он лежит в корне - корень."""
+        return self.find(dir_path, name) or self.path(dir_path, name)
+
+    def find(self, dir_path: str, name: str) -> Optional[str]:
+        sharded = self.path(dir_path, name)
+        if os.path.isfile(sharded):
+            return sharded
+        flat = os.path.join(dir_path, name)
+        return flat if os.path.isfile(flat) else None
+
+    def reserved(self, name: str) -> bool:
+        return name in RESERVED
+
+    def iter_files(self, dir_path: str) -> Iterator[os.DirEntry]:
+        stack = [(dir_path, 0)]
+        while stack:
+            path, level = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if level < self.depth and entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, level + 1))
+                        elif entry.is_file() and not (level == 0 and entry.name in RESERVED):
+                            yield entry
+            except FileNotFoundError:
+                # Пустой шард удалили параллельно
+                continue
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"layout": "sharded", "depth": self.depth, "width": self.width}
+
+
+def read_layout(dir_path: str) -> Optional[FlatLayout]:
+    """Раскладка из маркера директории (None - маркера нет)."""
+    try:
+        with open(os.path.join(dir_path, MARKER), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("layout") == "sharded":
+        return ShardedLayout(int(data.get("depth", DEFAULT_DEPTH)),
+                             int(data.get("width", DEFAULT_WIDTH)))
+    return FlatLayout()
+
+
+def write_layout(dir_path: str, layout: FlatLayout):
+    marker = os.path.join(dir_path, MARKER)
+    if not layout.sharded:
+        if os.path.exists(marker):
+            os.remove(marker)
+        return
+    temp = marker + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(layout.to_dict(), f)
+    os.replace(temp, marker)
+
+
+def layout_from_name(name: Optional[str]) -> FlatLayout:
+    """flat, sharded или sharded:depth:width."""
+    name = (name or "flat").strip().lower()
+    if name == "flat":
+        return FlatLayout()
+    if name.startswith("sharded"):
+        parts = name.split(":")
+        depth = int(parts[1]) if len(parts) > 1 else DEFAULT_DEPTH
+        width = int(parts[2]) if len(parts) > 2 else DEFAULT_WIDTH
+        return ShardedLayout(depth, width)
+    raise ValueError(f"Неизвестная раскладка: {name}")
+
+
+def _numbered_shard(layout: ShardedLayout, dir_path: str, name: str) -> Callable[[str, int], str]:
+    """Кандидаты имени, если name в шарде занято: name_1 в своем шарде, name_2, ..."""
+    stem, ext = os.path.splitext(name)
+
+    def rename(target: str, counter: int) -> str:
+        return layout.path(dir_path, f"{stem}_{counter}{ext}")
+    return rename
+
+
+class ShardMigration:
+    """
+    Перенос файлов плоской директории в шарды.
+
+    Маркер пишется до переноса, поэтому во время миграции директория
+    уже читается как шардированная, а файлы, оставшиеся в корне, видны
+    как обычно. Файл ставится в шард жесткой ссылкой, которая не
+    заменяет существующий файл (см. storage_journal.place), и только
+    потом убирается из корня; прерванную миграцию можно просто
+    запустить снова - уже поставленный файл узнается по ссылке.
+    """
+
+    def __init__(self, dir_path: str, layout: Optional[ShardedLayout] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            dir_path: Директория
+            layout: Целевая раскладка (по умолчанию depth=2, width=2)
+            on_progress: Вызывается с (перенесено, всего)
+        """
+        self.dir_path = dir_path
+        self.layout = layout or ShardedLayout()
+        self.on_progress = on_progress
+        self.moved = 0
+        self.renamed = 0
+        self.total = 0
+        self.error: Optional[BaseException] = None
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> Tuple[bool, str]:
+        current = read_layout(self.dir_path)
+        if current is not None and current.sharded and current.to_dict() != self.layout.to_dict():
+            return False, "❌ Директория уже шардирована с другими параметрами"
+        write_layout(self.dir_path, self.layout)
+
+        with os.scandir(self.dir_path) as entries:
+            names = [entry.name for entry in entries
+                     if entry.is_file() and entry.name not in RESERVED]
+        self.total = len(names)
+        created = set()
+        for name in names:
+            if self._cancel.is_set():
+                return False, f"⚠️ Миграция остановлена: перенесено {self.moved} из {self.total}"
+            source = os.path.join(self.dir_path, name)
+            target = self.layout.path(self.dir_path, name)
+            shard_dir = os.path.dirname(target)
+            if shard_dir not in created:
+                os.makedirs(shard_dir, exist_ok=True)
+                created.add(shard_dir)
+            try:
+                # В шарде уже есть файл с таким именем - старый сохраняется под новым
+                placed = place(source, target,
+                               _numbered_shard(self.layout, self.dir_path, name))
+            except FileNotFoundError:
+                # Файл удалили во время миграции
+                continue
+            if placed != target:
+                self.renamed += 1
+            self.moved += 1
+            if self.on_progress is not None:
+                self.on_progress(self.moved, self.total)
+        return True, f"✅ Перенесено {self.moved} файлов"
+
+    def start(self) -> "ShardMigration":
+        """Запускает миграцию в фоновом потоке."""
+        def target():
+            try:
+                self.result = self.run()
+            except BaseException as e:
+                self.error = e
+                self.result = (False, f"❌ Ошибка: {e}")
+
+        self.result: Tuple[bool, str] = (False, "⚠️ Миграция не завершена")
+        self._thread = threading.Thread(target=target, name="shard-migration", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> Tuple[bool, str]:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.result
+
+    def cancel(self):
+        self._cancel.set()
+
+
+def main() -> int:
+    import argparse
+    from src.utils.headless import progress_bar
+
+    parser = argparse.ArgumentParser(description="Перенос плоской директории в хеш-шарды")
+    parser.add_argument("directory")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    args = parser.parse_args()
+
+    with progress_bar(desc="Миграция", unit="файл") as bar:
+        def on_progress(moved: int, total: int):
+            bar.total = total
+            bar.update(moved - bar.n)
+
+        migration = ShardMigration(args.directory, ShardedLayout(args.depth, args.width),
+                                   on_progress=on_progress)
+        success, message = migration.run()
+    print(message)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Агрегация прогресса между процессами через разделяемую память.
+Каждый воркер пишет только в свой слот блока multiprocessing.shared_memory,
+поэтому обновление - это запись нескольких байт без блокировок и IPC.
+Родительский процесс с фиксированной частотой читает слоты и рисует
+общий бар и бары по воркерам, отмечая воркеров, которые умерли.
+"""
+
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.util import Finalize
+from typing import Any, Dict, List, Optional
+
+from tqdm import tqdm
+
+from src.utils.headless import is_headless, progress_bar
+
+# pid, счетчик, состояние, время последнего сигнала жизни
+SLOT_FORMAT = "<qqqd"
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+COUNT_OFFSET = 8
+STATUS_OFFSET = 16
+_COUNT = struct.Struct("<q")
+_STATUS = struct.Struct("<qd")
+
+STATE_EMPTY = 0
+STATE_RUNNING = 1
+STATE_DONE = 2
+STATE_DEAD = 3
+
+HEARTBEAT_INTERVAL = 0.5
+
+_worker: Optional["WorkerProgress"] = None
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # На Windows os.kill завершает процесс, полагаемся на сигнал жизни
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorkerProgress:
+    """
+    Сторона воркера: счетчик в собственном слоте разделяемой памяти.
+    """
+
+    def __init__(self, shm_name: str, slot: int):
+        self._shm = shared_memory.SharedMemory(name=shm_name)
+        self._offset = slot * SLOT_SIZE
+        self._count_offset = self._offset + COUNT_OFFSET
+        self._buf = self._shm.buf
+        self.slot = slot
+        self.count = 0
+        struct.pack_into(SLOT_FORMAT, self._buf, self._offset,
+                         os.getpid(), 0, STATE_RUNNING, time.time())
+
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+        Finalize(self, self.close, exitpriority=10)
+
+    def _write_status(self, state: int):
+        # Поток сигнала жизни пишет только свои поля, счетчик пишет только add()
+        _STATUS.pack_into(self._buf, self._offset + STATUS_OFFSET, state, time.time())
+
+    def _beat(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            self._write_status(STATE_RUNNING)
+
+    def add(self, n: int = 1):
+        """Увеличивает счетчик воркера (без блокировок и обмена с родителем)."""
+        self.count += n
+        _COUNT.pack_into(self._buf, self._count_offset, self.count)
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._stop.set()
+        self._heartbeat.join()
+        self._write_status(STATE_DONE)
+        self._buf = None
+        self._shm.close()
+        self._shm = None
+
+
+def _init_worker(shm_name: str, slot_counter):
+    """Инициализатор пула: воркер один раз занимает свободный слот."""
+    global _worker
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    _worker = WorkerProgress(shm_name, slot)
+
+
+def current() -> Optional[WorkerProgress]:
+    """Прогресс текущего воркера или None вне пула с SharedProgress."""
+    return _worker
+
+
+class SharedProgress:
+    """
+    Родительская сторона: блок разделяемой памяти и отрисовка баров.
+    """
+
+    def __init__(self, total: int, workers: int, desc: str = "Всего",
+                 refresh_interval: float = 0.2, stale_after: float = 5.0,
+                 per_worker_bars: bool = True, **tqdm_kwargs):
+        """
+        Инициализация сервиса.
+
+        Args:
+            total: Общее количество единиц работы
+            workers: Число воркеров (слотов)
+            desc: Описание общего бара
+            refresh_interval: Период отрисовки в секундах
+            stale_after: Через сколько секунд без сигнала жизни воркер считается мертвым
+            per_worker_bars: Рисовать ли отдельный бар на каждого воркера
+            **tqdm_kwargs: Параметры общего бара (unit, colour, ...)
+        """
+        self.total = total
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self.stale_after = stale_after
+        self._shm = shared_memory.SharedMemory(create=True, size=SLOT_SIZE * workers)
+        self._shm.buf[:SLOT_SIZE * workers] = bytes(SLOT_SIZE * workers)
+        self._slot_counter = multiprocessing.Value("i", 0)
+        self._postfix: Dict[str, Any] = {}
+        self._dead: set = set()
+
+        self.bar = progress_bar(total=total, desc=desc, position=0, **tqdm_kwargs)
+        self.worker_bars: List[tqdm] = []
+        if per_worker_bars and not is_headless():
+            for slot in range(workers):
+                self.worker_bars.append(tqdm(
+                    total=None, desc=f"  воркер {slot}", position=slot + 1,
+                    leave=False, unit=tqdm_kwargs.get("unit", "it"), colour="blue"
+                ))
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def initializer(self):
+        return _init_worker
+
+    @property
+    def initargs(self):
+        return (self._shm.name, self._slot_counter)
+
+    def read_slots(self) -> List[Dict[str, Any]]:
+        """Снимок всех слотов."""
+        slots = []
+        for slot in range(self.workers):
+            pid, count, state, heartbeat = struct.unpack_from(
+                SLOT_FORMAT, self._shm.buf, slot * SLOT_SIZE
+            )
+            slots.append({"slot": slot, "pid": pid, "count": count,
+                          "state": state, "heartbeat": heartbeat})
+        return slots
+
+    def set_postfix(self, **fields: Any):
+        """Поля postfix общего бара (применяются при следующей отрисовке)."""
+        self._postfix = fields
+
+    def _check_alive(self, slot: Dict[str, Any], now: float) -> bool:
+        if slot["state"] != STATE_RUNNING:
+            return slot["state"] != STATE_DEAD
+        if slot["slot"] in self._dead:
+            return False
+        if not _pid_alive(slot["pid"]) or now - slot["heartbeat"] > self.stale_after:
+            self._dead.add(slot["slot"])
+            return False
+        return True
+
+    def render(self):
+        """Читает слоты и обновляет бары."""
+        now = time.time()
+        slots = self.read_slots()
+        done = sum(slot["count"] for slot in slots)
+        # Проверка всех слотов, даже без баров воркеров (headless,
+        # per_worker_bars=False)
+        alive = [self._check_alive(slot, now) for slot in slots]
+
+        if done != self.bar.n:
+            self.bar.n = done
+        postfix = dict(self._postfix)
+        if self._dead:
+            postfix["потеряно"] = len(self._dead)
+        self.bar.set_postfix(postfix, refresh=False)
+        self.bar.refresh()
+
+        for slot, slot_alive, bar in zip(slots, alive, self.worker_bars):
+            bar.n = slot["count"]
+            if not slot_alive:
+                bar.desc = f"  воркер {slot['slot']} ✗ pid {slot['pid']}"
+            elif slot["state"] == STATE_DONE:
+                bar.desc = f"  воркер {slot['slot']} ✓"
+            bar.refresh()
+
+    def _render_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.render()
+
+    @property
+    def lost_workers(self) -> int:
+        return len(self._dead)
+
+    @property
+    def completed(self) -> int:
+        return sum(slot["count"] for slot in self.read_slots())
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.render()
+        for bar in self.worker_bars:
+            bar.close()
+        self.bar.close()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
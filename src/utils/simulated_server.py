@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Локальная имитация файлового сервера с внедрением сбоев.
+Отдает диапазоны байт с заданной скоростью и умеет тормозить,
+обрывать соединение и отвечать ошибками 5xx.
+"""
+
+import random
+import threading
+
+from src.utils.clock import RealClock, get_clock
+from src.utils.resilience import ServerError
+
+
+class SimulatedServer:
+    """
+    Сервер-заглушка для сценария сетевых загрузок.
+    """
+
+    def __init__(self, speed_range=(50, 200), slow_rate: float = 0.0,
+                 slow_factor: float = 10.0, reset_rate: float = 0.0,
+                 error_rate: float = 0.0, time_scale: float = 1.0, seed=None,
+                 clock: RealClock = None):
+        """
+        Инициализация сервера.
+
+        Args:
+            speed_range: Диапазон скорости отдачи в KB/s
+            slow_rate: Вероятность "медленного" ответа
+            slow_factor: Во сколько раз медленный ответ медленнее обычного
+            reset_rate: Вероятность обрыва соединения посреди передачи
+            error_rate: Вероятность ответа 5xx
+            time_scale: Множитель реального времени (0.01 - в 100 раз быстрее)
+            seed: Зерно генератора случайных чисел
+            clock: Часы, по которым идут задержки (по умолчанию get_clock())
+        """
+        self.speed_range = speed_range
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.reset_rate = reset_rate
+        self.error_rate = error_rate
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self.clock = clock or get_clock()
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        with self._lock:
+            return (self._random.uniform(*self.speed_range),
+                    self._random.random(), self._random.random(), self._random.random())
+
+    def _sleep(self, seconds: float, cancel: threading.Event) -> bool:
+        """Спит, пока не истечет время или не придет отмена. True - если отменено."""
+        return self.clock.wait(cancel, seconds * self.time_scale)
+
+    def fetch_range(self, name: str, start: int, end: int,
+                    cancel: threading.Event = None) -> float:
+        """
+        Отдает диапазон [start, end) файла.
+
+        Args:
+            name: Имя файла
+            start: Начало диапазона в KB
+            end: Конец диапазона в KB
+            cancel: Событие отмены запроса
+
+        Returns:
+            float: Скорость передачи в KB/s
+
+        Raises:
+            ServerError: Ответ 5xx
+            ConnectionResetError: Обрыв соединения
+        """
+        cancel = cancel or threading.Event()
+        speed, slow_roll, reset_roll, error_roll = self._roll()
+
+        if error_roll < self.error_rate:
+            self._sleep(0.02, cancel)
+            raise ServerError(503)
+
+        if slow_roll < self.slow_rate:
+            speed /= self.slow_factor
+
+        duration = (end - start) / speed
+        if reset_roll < self.reset_rate:
+            self._sleep(duration / 2, cancel)
+            raise ConnectionResetError(f"соединение сброшено при загрузке {name}")
+
+        if self._sleep(duration, cancel):
+            return 0.0
+        return speed
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Аналитика хранилища за один проход по файлам.
+
+Гистограмма размеров (логарифмические корзины по степеням двойки),
+распределение по возрасту, итоги по расширениям и директориям, самые
+большие и самые старые файлы. Корзины - массивы фиксированной длины,
+топы - кучи из N элементов, число расширений ограничено, поэтому
+память не зависит от числа файлов.
+
+Запуск: python -m src.utils.storage_analytics [--dir storage] [--top N] [--json FILE]
+"""
+
+import bisect
+import datetime
+import heapq
+import json
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.storage_manager import FileEntry, human_readable_size
+from src.utils.storage_backends import FileRecord
+
+# Корзина 0 - пустые файлы, корзина i - размеры [2^(i-1), 2^i),
+# последняя - все от 2^46 (64 TB)
+SIZE_BUCKETS = 48
+# Верхние границы возрастных корзин, с; последняя корзина - старше
+AGE_BOUNDS = (3600, 86400, 7 * 86400, 30 * 86400, 90 * 86400, 365 * 86400)
+AGE_LABELS = ("< 1 часа", "< 1 дня", "< 1 недели", "< 30 дней", "< 90 дней", "< 1 года", ">= 1 года")
+# Различных расширений в итогах, остальные - в OTHER_EXTENSIONS
+MAX_EXTENSIONS = 64
+NO_EXTENSION = "(без расширения)"
+OTHER_EXTENSIONS = "(прочие)"
+BAR_WIDTH = 30
+
+
+def _extension(name: str) -> str:
+    # Как os.path.splitext: точка в начале имени расширением не считается
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else NO_EXTENSION
+
+
+def _size_bounds(index: int) -> Tuple[int, Optional[int]]:
+    if index == 0:
+        return 0, 0
+    return 1 << (index - 1), None if index == SIZE_BUCKETS - 1 else (1 << index) - 1
+
+
+class StorageAnalytics:
+    """
+    Накопитель статистики: файлы добавляются по одному через scan().
+    """
+
+    def __init__(self, top_n: int = 10, now: Optional[float] = None):
+        """
+        Инициализация.
+
+        Args:
+            top_n: Сколько самых больших и самых старых файлов хранить
+            now: Момент, от которого считается возраст (по умолчанию - сейчас)
+        """
+        self.top_n = max(0, top_n)
+        self.now = time.time() if now is None else now
+        self.count = 0
+        self.size = 0
+        self.oldest_mtime: Optional[float] = None
+        self.newest_mtime: Optional[float] = None
+        self.size_counts = array("Q", bytes(8 * SIZE_BUCKETS))
+        self.size_bytes = array("Q", bytes(8 * SIZE_BUCKETS))
+        self.age_counts = array("Q", bytes(8 * (len(AGE_BOUNDS) + 1)))
+        self.age_bytes = array("Q", bytes(8 * (len(AGE_BOUNDS) + 1)))
+        # Расширение или ключ директории -> [файлов, байт]
+        self.extensions: Dict[str, List[int]] = {}
+        self.directories: Dict[str, List[int]] = {}
+        # Кучи по N элементов: в корне - первый кандидат на вытеснение
+        self._largest: List[Tuple] = []
+        self._oldest: List[Tuple] = []
+        self._seq = 0
+
+    def scan(self, directory: str, records: Iterable[FileRecord]):
+        """
+        Учитывает файлы одной директории хранилища.
+
+        Args:
+            directory: Ключ директории (temp, processed, ...)
+            records: (имя, каталог, размер, mtime), например backend.list()
+        """
+        totals = self.directories.setdefault(directory, [0, 0])
+        extensions = self.extensions
+        size_counts, size_bytes = self.size_counts, self.size_bytes
+        age_counts, age_bytes = self.age_counts, self.age_bytes
+        largest, oldest = self._largest, self._oldest
+        top_n, now = self.top_n, self.now
+        last_bucket = SIZE_BUCKETS - 1
+        age_bucket = bisect.bisect_right
+        # Пороги входа в топы: пока куча не заполнена, входит любой файл
+        min_largest = largest[0][0] if len(largest) >= top_n > 0 else -1
+        min_oldest = oldest[0][0] if len(oldest) >= top_n > 0 else float("-inf")
+        count = size_total = 0
+        oldest_mtime = self.oldest_mtime if self.oldest_mtime is not None else float("inf")
+        newest_mtime = self.newest_mtime if self.newest_mtime is not None else float("-inf")
+
+        for name, parent, size, mtime in records:
+            count += 1
+            size_total += size
+
+            bucket = min(size.bit_length(), last_bucket)
+            size_counts[bucket] += 1
+            size_bytes[bucket] += size
+
+            bucket = age_bucket(AGE_BOUNDS, now - mtime)
+            age_counts[bucket] += 1
+            age_bytes[bucket] += size
+
+            if mtime < oldest_mtime:
+                oldest_mtime = mtime
+            if mtime > newest_mtime:
+                newest_mtime = mtime
+
+            ext = _extension(name)
+            item = extensions.get(ext)
+            if item is None:
+                if len(extensions) >= MAX_EXTENSIONS:
+                    ext = OTHER_EXTENSIONS
+                item = extensions.setdefault(ext, [0, 0])
+            item[0] += 1
+            item[1] += size
+
+            # Кортеж создается, только если файл попадает в топ
+            if size > min_largest and top_n:
+                self._seq += 1
+                if len(largest) < top_n:
+                    heapq.heappush(largest, (size, self._seq, name, parent, directory, mtime))
+                else:
+                    heapq.heapreplace(largest, (size, self._seq, name, parent, directory, mtime))
+                if len(largest) >= top_n:
+                    min_largest = largest[0][0]
+            if -mtime > min_oldest and top_n:
+                self._seq += 1
+                if len(oldest) < top_n:
+                    heapq.heappush(oldest, (-mtime, self._seq, name, parent, directory, size))
+                else:
+                    heapq.heapreplace(oldest, (-mtime, self._seq, name, parent, directory, size))
+                if len(oldest) >= top_n:
+                    min_oldest = oldest[0][0]
+
+        totals[0] += count
+        totals[1] += size_total
+        self.count += count
+        self.size += size_total
+        if count:
+            self.oldest_mtime = oldest_mtime
+            self.newest_mtime = newest_mtime
+
+    @property
+    def largest(self) -> List[FileEntry]:
+        """Самые большие файлы, по убыванию размера."""
+        return [FileEntry(name, parent, size, mtime, directory)
+                for size, _, name, parent, directory, mtime in sorted(self._largest, reverse=True)]
+
+    @property
+    def oldest(self) -> List[FileEntry]:
+        """Самые старые файлы, от самого старого."""
+        return [FileEntry(name, parent, size, -key, directory)
+                for key, _, name, parent, directory, size in sorted(self._oldest, reverse=True)]
+
+    def size_histogram(self) -> List[Dict]:
+        """Непустые корзины размеров."""
+        rows = []
+        for index, count in enumerate(self.size_counts):
+            if count:
+                low, high = _size_bounds(index)
+                rows.append({"min": low, "max": high, "count": count, "size": self.size_bytes[index]})
+        return rows
+
+    def age_histogram(self) -> List[Dict]:
+        """Все возрастные корзины (max_age - верхняя граница, с)."""
+        bounds = AGE_BOUNDS + (None,)
+        return [{"label": label, "max_age": bound, "count": self.age_counts[index],
+                 "size": self.age_bytes[index]}
+                for index, (label, bound) in enumerate(zip(AGE_LABELS, bounds))]
+
+    def to_dict(self) -> Dict:
+        def timestamp(value: Optional[float]) -> Optional[str]:
+            return None if value is None else datetime.datetime.fromtimestamp(value).isoformat(timespec="seconds")
+
+        def files(entries: List[FileEntry]) -> List[Dict]:
+            return [{"name": entry.name, "directory": entry.directory, "path": entry.path,
+                     "size": entry.size, "modified": timestamp(entry.mtime)} for entry in entries]
+
+        return {
+            "generated_at": timestamp(self.now),
+            "total": {"count": self.count, "size": self.size},
+            "oldest_modified": timestamp(self.oldest_mtime),
+            "newest_modified": timestamp(self.newest_mtime),
+            "directories": {key: {"count": count, "size": size}
+                            for key, (count, size) in self.directories.items()},
+            "size_histogram": self.size_histogram(),
+            "age_histogram": self.age_histogram(),
+            "extensions": {ext: {"count": count, "size": size} for ext, (count, size)
+                           in sorted(self.extensions.items(), key=lambda item: -item[1][1])},
+            "largest": files(self.largest),
+            "oldest": files(self.oldest),
+        }
+
+    def save(self, path: str):
+        """Сохраняет отчет в JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary_lines(self) -> List[str]:
+        """Текстовый отчет (без цветов)."""
+        if not self.count:
+            return ["Файлов нет"]
+
+        def bar(value: int, peak: int) -> str:
+            return "█" * max(1, round(value / peak * BAR_WIDTH)) if value else ""
+
+        def date(value: float) -> str:
+            return datetime.datetime.fromtimestamp(value).isoformat(" ", "minutes")
+
+        lines = [f"Файлов: {self.count}, объем: {human_readable_size(self.size)}",
+                 f"Изменены: с {date(self.oldest_mtime)} по {date(self.newest_mtime)}",
+                 "", "РАЗМЕРЫ:"]
+        histogram = self.size_histogram()
+        peak = max(row["count"] for row in histogram)
+        for row in histogram:
+            if row["max"] is None:
+                label = f">= {human_readable_size(row['min'])}"
+            elif row["max"] == 0:
+                label = "0 B"
+            else:
+                label = f"{human_readable_size(row['min'])} - {human_readable_size(row['max'] + 1)}"
+            lines.append(f"  {label:<22} {row['count']:>8} {human_readable_size(row['size']):>10}  "
+                         f"{bar(row['count'], peak)}")
+
+        lines += ["", "ВОЗРАСТ:"]
+        histogram = self.age_histogram()
+        peak = max(row["count"] for row in histogram)
+        for row in histogram:
+            lines.append(f"  {row['label']:<22} {row['count']:>8} {human_readable_size(row['size']):>10}  "
+                         f"{bar(row['count'], peak)}")
+
+        lines += ["", "РАСШИРЕНИЯ:"]
+        for ext, (count, size) in sorted(self.extensions.items(), key=lambda item: -item[1][1])[:10]:
+            share = size / self.size * 100 if self.size else 0.0
+            lines.append(f"  {ext:<22} {count:>8} {human_readable_size(size):>10}  {share:5.1f}%")
+
+        for title, entries in (("САМЫЕ БОЛЬШИЕ:", self.largest), ("САМЫЕ СТАРЫЕ:", self.oldest)):
+            lines += ["", title]
+            for entry in entries:
+                name = entry.name if len(entry.name) <= 40 else entry.name[:37] + "..."
+                lines.append(f"  {name:<40} {entry.directory:<11} {entry.size_hr:>10}  {date(entry.mtime)}")
+        return lines
+
+
+def main() -> int:
+    import argparse
+    from src.utils.storage_manager import StorageManager
+
+    parser = argparse.ArgumentParser(description="Аналитика хранилища за один проход")
+    parser.add_argument("--dir", default="storage", help="Каталог хранилища")
+    parser.add_argument("--top", type=int, default=10, help="Размер топов больших и старых файлов")
+    parser.add_argument("--json", help="Сохранить отчет в JSON")
+    args = parser.parse_args()
+
+    manager = StorageManager(args.dir)
+    started = time.perf_counter()
+    analytics = manager.get_storage_analytics(args.top)
+    elapsed = time.perf_counter() - started
+    for line in analytics.summary_lines():
+        print(line)
+    print(f"\nПроход: {elapsed:.2f} с")
+    if args.json:
+        analytics.save(args.json)
+        print(f"Отчет сохранен: {args.json}")
+    manager.backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Бэкенды хранилища: где физически лежат файлы StorageManager.
+
+Бэкенд работает с путями вида "storage/temp/file.txt" и умеет
+перечислять, читать, записывать, перемещать, копировать и удалять
+файлы. LocalBackend - локальная ФС, MemoryBackend - словарь в памяти
+(быстрые прогоны без диска), S3Backend (модуль s3_backend) -
+S3-совместимое объектное хранилище.
+
+Переменные окружения:
+    TQDM_DEMO_STORAGE      local (по умолчанию), memory, s3 или s3-local
+                           (S3 через локальный сервер-заглушку)
+    TQDM_DEMO_S3_ENDPOINT  Адрес S3 (например, http://127.0.0.1:9000)
+    TQDM_DEMO_S3_BUCKET    Бакет (по умолчанию tqdm-demo)
+    AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION
+"""
+
+from abc import ABC, abstractmethod
+import os
+import posixpath
+import stat as stat_module
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.utils.sharding import FlatLayout
+
+# (имя, каталог, размер, mtime)
+FileRecord = Tuple[str, str, int, float]
+
+
+class StorageBackend(ABC):
+    """
+    Интерфейс бэкенда. Ошибки - OSError (FileNotFoundError, если файла нет).
+    """
+
+    name = ""
+    # Настоящая ФС: доступны журнал, наблюдение и шардирование
+    local = False
+
+    def join(self, *parts: str) -> str:
+        return posixpath.join(*parts)
+
+    def makedirs(self, path: str):
+        """Создает каталог (в объектных хранилищах каталогов нет)."""
+
+    def isdir(self, path: str) -> bool:
+        return True
+
+    @abstractmethod
+    def list(self, dir_path: str, layout: Optional[FlatLayout] = None) -> Iterator[FileRecord]:
+        """Файлы директории (для локальной ФС - с учетом раскладки)."""
+
+    @abstractmethod
+    def stat(self, path: str) -> Optional[Tuple[int, float]]:
+        """(размер, mtime) или None, если файла нет."""
+
+    @abstractmethod
+    def read(self, path: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def write(self, path: str, data: bytes):
+        pass
+
+    def upload(self, local_path: str, path: str):
+        """Записывает в бэкенд локальный файл."""
+        with open(local_path, "rb") as f:
+            self.write(path, f.read())
+
+    def download(self, path: str, local_path: str):
+        """Сохраняет файл бэкенда в локальный файл."""
+        with open(local_path, "wb") as f:
+            f.write(self.read(path))
+
+    def move(self, src: str, dst: str):
+        self.copy(src, dst)
+        self.delete(src)
+
+    def copy(self, src: str, dst: str):
+        self.write(dst, self.read(src))
+
+    @abstractmethod
+    def delete(self, path: str):
+        pass
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class LocalBackend(StorageBackend):
+    """
+    Локальная файловая система.
+    """
+
+    name = "local"
+    local = True
+
+    def join(self, *parts: str) -> str:
+        return os.path.join(*parts)
+
+    def makedirs(self, path: str):
+        os.makedirs(path, exist_ok=True)
+
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+
+    def list(self, dir_path: str, layout: Optional[FlatLayout] = None) -> Iterator[FileRecord]:
+        for entry in (layout or FlatLayout()).iter_files(dir_path):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            name = entry.name
+            yield name, entry.path[:-len(name) - 1], stat.st_size, stat.st_mtime
+
+    def stat(self, path: str) -> Optional[Tuple[int, float]]:
+        try:
+            stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat_module.S_ISREG(stat.st_mode):
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def write(self, path: str, data: bytes):
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    def upload(self, local_path: str, path: str):
+        import shutil
+        shutil.copyfile(local_path, path)
+
+    def download(self, path: str, local_path: str):
+        import shutil
+        shutil.copyfile(path, local_path)
+
+    def move(self, src: str, dst: str):
+        import shutil
+        shutil.move(src, dst)
+
+    def copy(self, src: str, dst: str):
+        import shutil
+        shutil.copy2(src, dst)
+
+    def delete(self, path: str):
+        os.remove(path)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Файлы в памяти процесса: каталог -> имя -> (данные, mtime).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._dirs: Dict[str, Dict[str, Tuple[bytes, float]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _split(path: str) -> Tuple[str, str]:
+        path = posixpath.normpath(path.replace(os.sep, "/"))
+        return posixpath.dirname(path), posixpath.basename(path)
+
+    def join(self, *parts: str) -> str:
+        return posixpath.join(*parts)
+
+    def makedirs(self, path: str):
+        with self._lock:
+            self._dirs.setdefault(posixpath.normpath(path), {})
+
+    def list(self, dir_path: str, layout: Optional[FlatLayout] = None) -> Iterator[FileRecord]:
+        parent = posixpath.normpath(dir_path)
+        with self._lock:
+            files = list(self._dirs.get(parent, {}).items())
+        for name, (data, mtime) in files:
+            yield name, dir_path, len(data), mtime
+
+    def stat(self, path: str) -> Optional[Tuple[int, float]]:
+        parent, name = self._split(path)
+        with self._lock:
+            item = self._dirs.get(parent, {}).get(name)
+        return None if item is None else (len(item[0]), item[1])
+
+    def read(self, path: str) -> bytes:
+        parent, name = self._split(path)
+        with self._lock:
+            item = self._dirs.get(parent, {}).get(name)
+        if item is None:
+            raise FileNotFoundError(2, "Файл не найден", path)
+        return item[0]
+
+    def write(self, path: str, data: bytes):
+        parent, name = self._split(path)
+        with self._lock:
+            self._dirs.setdefault(parent, {})[name] = (bytes(data), time.time())
+
+    def move(self, src: str, dst: str):
+        src_parent, src_name = self._split(src)
+        dst_parent, dst_name = self._split(dst)
+        with self._lock:
+            item = self._dirs.get(src_parent, {}).pop(src_name, None)
+            if item is None:
+                raise FileNotFoundError(2, "Файл не найден", src)
+            self._dirs.setdefault(dst_parent, {})[dst_name] = item
+
+    def copy(self, src: str, dst: str):
+        src_parent, src_name = self._split(src)
+        dst_parent, dst_name = self._split(dst)
+        with self._lock:
+            # Как copy2: данные и время изменения исходника
+            item = self._dirs.get(src_parent, {}).get(src_name)
+            if item is None:
+                raise FileNotFoundError(2, "Файл не найден", src)
+            self._dirs.setdefault(dst_parent, {})[dst_name] = item
+
+    def delete(self, path: str):
+        parent, name = self._split(path)
+        with self._lock:
+            if self._dirs.get(parent, {}).pop(name, None) is None:
+                raise FileNotFoundError(2, "Файл не найден", path)
+
+
+def create_backend(spec: Optional[str] = None) -> StorageBackend:
+    """
+    Бэкенд по имени (по умолчанию из TQDM_DEMO_STORAGE).
+
+    Args:
+        spec: local, memory, s3 или s3-local
+    """
+    spec = (spec or os.environ.get("TQDM_DEMO_STORAGE") or "local").strip().lower()
+    if spec == "local":
+        return LocalBackend()
+    if spec == "memory":
+        return MemoryBackend()
+    if spec in ("s3", "s3-local"):
+        # http.client и xml нужны только объектному хранилищу
+        from src.utils.s3_backend import S3Backend
+        if spec == "s3-local":
+            from src.utils.s3_server import S3StandIn
+            server = S3StandIn().start()
+            backend = S3Backend(server.endpoint, "tqdm-demo", server.access_key,
+                                server.secret_key, server.region)
+            # Сервер живет, пока жив бэкенд
+            backend.server = server
+            return backend
+        return S3Backend.from_env()
+    raise ValueError(f"Неизвестный бэкенд хранилища: {spec}")
@@ -3,69 +3,114 @@
 Консольный интерфейс для управления хранилищем.
 """
 
+import datetime
 import os
-from src.utils.console import Colors, clear_screen, print_header
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.console import Colors, header_lines, screen
 from src.utils.storage_manager import StorageManager
 
+ACTION_LINES = [
+    "   1. Просмотреть temp",
+    "   2. Просмотреть processed",
+    "   3. Просмотреть downloads",
+    "   4. Просмотреть archive",
+    "   5. Просмотреть quarantine",
+    "   " + "─" * 40,
+    "   6. Удалить файл",
+    "   7. Переместить файл",
+    "   8. Копировать файл",
+    "   9. Архивировать директорию",
+    "   10. Поиск файлов",
+    "   11. Аналитика хранилища",
+    "   " + "─" * 40,
+    "   0. Очистить temp",
+    "   q. Выход",
+]
+
 class StorageConsole:
     
     def __init__(self, storage_manager: StorageManager):
         self.storage = storage_manager
         self.current_dir = None
         self.current_files = []
+        # Кадр, который сейчас на экране и обновляется по событиям ФС
+        self._live_view: Optional[Callable[[], List[str]]] = None
+        # Список файлов собираемого кадра: становится current_files, только
+        # когда кадр действительно выведен, - номера в командах относятся
+        # к тому, что видно на экране
+        self._frame_files = None
+        self._view_lock = threading.Lock()
     
-    def print_storage_summary(self):
+    def summary_lines(self) -> List[str]:
         summary = self.storage.get_storage_summary()
         
-        print(f"\n{Colors.BOLD}СВОДКА ПО ХРАНИЛИЩУ:{Colors.END}")
-        print(f"{'─' * 60}")
+        rows = ["", f"{Colors.BOLD}СВОДКА ПО ХРАНИЛИЩУ:{Colors.END}", f"{'─' * 60}"]
         
         for key, data in summary.items():
             if key == "total":
                 continue
-            print(f"{Colors.CYAN}{key.upper():12}{Colors.END} "
-                  f"📄 {data['count']:4} файлов  "
-                  f"💾 {data['size_hr']:>8}")
+            rows.append(f"{Colors.CYAN}{key.upper():12}{Colors.END} "
+                        f"📄 {data['count']:4} файлов  "
+                        f"💾 {data['size_hr']:>8}")
         
-        print(f"{'─' * 60}")
-        print(f"{Colors.GREEN}ВСЕГО:{Colors.END}         "
-              f"📄 {summary['total']['count']:4} файлов  "
-              f"💾 {summary['total']['size_hr']:>8}")
+        rows.append(f"{'─' * 60}")
+        rows.append(f"{Colors.GREEN}ВСЕГО:{Colors.END}         "
+                    f"📄 {summary['total']['count']:4} файлов  "
+                    f"💾 {summary['total']['size_hr']:>8}")
+        return rows
+    
+    def print_storage_summary(self):
+        screen.lines(self.summary_lines())
+        screen.flush()
+    
+    @staticmethod
+    def listing_lines(dir_key: str, info: Dict[str, Any]) -> List[str]:
+        """Таблица содержимого директории (строки без переводов строки)."""
+        rows = [
+            "",
+            f"{Colors.BOLD}СОДЕРЖИМОЕ {dir_key.upper()}:{Colors.END}",
+            f"{'─' * 90}",
+            f"{'#':<4} {'Имя файла':<50} {'Размер':<10} {'Дата изменения':<20}",
+            f"{'─' * 90}",
+        ]
+        
+        for i, file in enumerate(info["files"], 1):
+            name = file.name
+            if len(name) > 48:
+                name = name[:45] + "..."
+            # То же, что strftime("%Y-%m-%d %H:%M"), но в несколько раз быстрее
+            date = file.modified.isoformat(" ", "minutes")
+            rows.append(f"{i:<4} {name:<50} {file.size_hr:<10} {date:<20}")
+        
+        rows.append(f"{'─' * 90}")
+        rows.append(f"Всего: {info['count']} файлов, {info['size_hr']}")
+        return rows
     
     def list_directory(self, dir_key: str):
         info = self.storage.get_directory_info(dir_key)
         
         if info["count"] == 0:
-            print(f"\n{Colors.YELLOW}Директория {dir_key} пуста{Colors.END}")
+            screen.print(f"\n{Colors.YELLOW}Директория {dir_key} пуста{Colors.END}")
             self.current_dir = dir_key
             self.current_files = []
             return
         
-        print(f"\n{Colors.BOLD}СОДЕРЖИМОЕ {dir_key.upper()}:{Colors.END}")
-        print(f"{'─' * 90}")
-        print(f"{'#':<4} {'Имя файла':<50} {'Размер':<10} {'Дата изменения':<20}")
-        print(f"{'─' * 90}")
-        
-        for i, file in enumerate(info["files"], 1):
-            name = file["name"]
-            if len(name) > 48:
-                name = name[:45] + "..."
-            date = file["modified"].strftime("%Y-%m-%d %H:%M")
-            print(f"{i:<4} {name:<50} {file['size_hr']:<10} {date:<20}")
-        
-        print(f"{'─' * 90}")
-        print(f"Всего: {info['count']} файлов, {info['size_hr']}")
+        # Вся таблица уходит в терминал одним вызовом write
+        screen.lines(self.listing_lines(dir_key, info))
+        screen.flush()
         
         self.current_dir = dir_key
         self.current_files = info["files"]
     
     def delete_file_interactive(self):
         if not self.current_files:
-            print(f"\n{Colors.RED}Нет файлов для удаления{Colors.END}")
+            screen.print(f"\n{Colors.RED}Нет файлов для удаления{Colors.END}")
             return
         
         try:
-            choice = input(f"\n{Colors.YELLOW}Введите номер файла (0 - отмена): {Colors.END}")
+            choice = screen.input(f"\n{Colors.YELLOW}Введите номер файла (0 - отмена): {Colors.END}")
             if not choice.isdigit():
                 return
             
@@ -75,10 +120,10 @@ class StorageConsole:
             
             if 1 <= idx <= len(self.current_files):
                 file = self.current_files[idx-1]
-                confirm = input(f"Удалить {file['name']}? (y/n): ").lower()
+                confirm = screen.input(f"Удалить {file.name}? (y/n): ").lower()
                 if confirm == 'y':
-                    success, msg = self.storage.delete_file(file['path'])
-                    print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
+                    success, msg = self.storage.delete_file(file.path)
+                    screen.print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
                     if success:
                         self.list_directory(self.current_dir)
         except ValueError:
@@ -86,11 +131,11 @@ class StorageConsole:
     
     def move_file_interactive(self):
         if not self.current_files:
-            print(f"\n{Colors.RED}Нет файлов для перемещения{Colors.END}")
+            screen.print(f"\n{Colors.RED}Нет файлов для перемещения{Colors.END}")
             return
         
         try:
-            choice = input(f"\n{Colors.YELLOW}Введите номер файла: {Colors.END}")
+            choice = screen.input(f"\n{Colors.YELLOW}Введите номер файла: {Colors.END}")
             if not choice.isdigit():
                 return
             
@@ -98,16 +143,16 @@ class StorageConsole:
             if 1 <= idx <= len(self.current_files):
                 file = self.current_files[idx-1]
                 
-                print(f"\n{Colors.CYAN}Куда переместить?{Colors.END}")
+                screen.print(f"\n{Colors.CYAN}Куда переместить?{Colors.END}")
                 targets = ["processed", "temp", "downloads", "archive", "quarantine"]
                 for i, name in enumerate(targets, 1):
-                    print(f"   {i}. {name}")
+                    screen.print(f"   {i}. {name}")
                 
-                target = input(f"{Colors.YELLOW}Выберите (1-5): {Colors.END}")
+                target = screen.input(f"{Colors.YELLOW}Выберите (1-5): {Colors.END}")
                 if target.isdigit() and 1 <= int(target) <= 5:
                     target_key = targets[int(target)-1]
-                    success, msg = self.storage.move_file(file['path'], target_key)
-                    print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
+                    success, msg = self.storage.move_file(file.path, target_key)
+                    screen.print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
                     if success:
                         self.list_directory(self.current_dir)
         except ValueError:
@@ -115,11 +160,11 @@ class StorageConsole:
     
     def copy_file_interactive(self):
         if not self.current_files:
-            print(f"\n{Colors.RED}Нет файлов для копирования{Colors.END}")
+            screen.print(f"\n{Colors.RED}Нет файлов для копирования{Colors.END}")
             return
         
         try:
-            choice = input(f"\n{Colors.YELLOW}Введите номер файла: {Colors.END}")
+            choice = screen.input(f"\n{Colors.YELLOW}Введите номер файла: {Colors.END}")
             if not choice.isdigit():
                 return
             
@@ -127,107 +172,168 @@ class StorageConsole:
             if 1 <= idx <= len(self.current_files):
                 file = self.current_files[idx-1]
                 
-                print(f"\n{Colors.CYAN}Куда скопировать?{Colors.END}")
+                screen.print(f"\n{Colors.CYAN}Куда скопировать?{Colors.END}")
                 targets = ["processed", "temp", "downloads", "archive", "quarantine"]
                 for i, name in enumerate(targets, 1):
-                    print(f"   {i}. {name}")
+                    screen.print(f"   {i}. {name}")
                 
-                target = input(f"{Colors.YELLOW}Выберите (1-5): {Colors.END}")
+                target = screen.input(f"{Colors.YELLOW}Выберите (1-5): {Colors.END}")
                 if target.isdigit() and 1 <= int(target) <= 5:
                     target_key = targets[int(target)-1]
-                    success, msg = self.storage.copy_file(file['path'], target_key)
-                    print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
+                    success, msg = self.storage.copy_file(file.path, target_key)
+                    screen.print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
         except ValueError:
             pass
     
     def archive_directory_interactive(self):
-        print(f"\n{Colors.CYAN}Какую директорию архивировать?{Colors.END}")
+        screen.print(f"\n{Colors.CYAN}Какую директорию архивировать?{Colors.END}")
         targets = ["temp", "processed", "downloads"]
         for i, name in enumerate(targets, 1):
-            print(f"   {i}. {name}")
+            screen.print(f"   {i}. {name}")
         
-        choice = input(f"{Colors.YELLOW}Выберите (1-3): {Colors.END}")
+        choice = screen.input(f"{Colors.YELLOW}Выберите (1-3): {Colors.END}")
         if choice.isdigit() and 1 <= int(choice) <= 3:
             target_key = targets[int(choice)-1]
             success, msg = self.storage.create_archive(target_key)
-            print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
+            screen.print(f"{Colors.GREEN if success else Colors.RED}{msg}{Colors.END}")
     
     def search_files_interactive(self):
-        query = input(f"\n{Colors.YELLOW}Введите текст для поиска: {Colors.END}").strip()
+        query = screen.input(f"\n{Colors.YELLOW}Введите текст для поиска: {Colors.END}").strip()
         if not query:
             return
         
         results = self.storage.search_files(query)
         if not results:
-            print(f"\n{Colors.YELLOW}Ничего не найдено{Colors.END}")
+            screen.print(f"\n{Colors.YELLOW}Ничего не найдено{Colors.END}")
             return
         
-        print(f"\n{Colors.GREEN}Найдено {len(results)} файлов:{Colors.END}")
-        print(f"{'─' * 80}")
+        rows = ["", f"{Colors.GREEN}Найдено {len(results)} файлов:{Colors.END}", f"{'─' * 80}"]
         for i, file in enumerate(results, 1):
-            date = file["modified"].strftime("%Y-%m-%d %H:%M")
-            print(f"{i}. {file['name']}")
-            print(f"   📁 {file['directory']}  💾 {file['size_hr']}  🕒 {date}")
+            date = file.modified.isoformat(" ", "minutes")
+            rows.append(f"{i}. {file.name}")
+            rows.append(f"   📁 {file.directory}  💾 {file.size_hr}  🕒 {date}")
+        screen.lines(rows)
+    
+    def analytics_frame(self, analytics) -> List[str]:
+        frame = header_lines("АНАЛИТИКА ХРАНИЛИЩА") + [""]
+        for line in analytics.summary_lines():
+            # Заголовки разделов набраны заглавными и заканчиваются двоеточием
+            if line.endswith(":") and line.isupper():
+                line = f"{Colors.BOLD}{line}{Colors.END}"
+            frame.append(line)
+        return frame
+    
+    def analytics_interactive(self):
+        analytics = self.storage.get_storage_analytics()
+        screen.draw(self.analytics_frame(analytics))
+        if not analytics.count:
+            return
+        
+        confirm = screen.input(f"\n{Colors.YELLOW}Сохранить отчет в JSON? (y/n): {Colors.END}")
+        if confirm.lower() != 'y':
+            return
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"analytics_{timestamp}.json"
+        # В объектном хранилище каталога на диске нет - отчет пишется в текущий
+        path = os.path.join(self.storage.base_dir, filename) if self.storage.backend.local else filename
+        try:
+            analytics.save(path)
+            screen.print(f"{Colors.GREEN}✅ Отчет сохранен: {path}{Colors.END}")
+        except OSError as e:
+            screen.print(f"{Colors.RED}❌ Ошибка: {e}{Colors.END}")
+    
+    def menu_frame(self) -> List[str]:
+        frame = header_lines("МЕНЕДЖЕР ХРАНИЛИЩА") + self.summary_lines()
+        frame += ["", f"{Colors.BOLD}ДЕЙСТВИЯ:{Colors.END}"]
+        frame += ACTION_LINES
+        return frame
+    
+    def directory_frame(self, dir_key: str) -> List[str]:
+        info = self.storage.get_directory_info(dir_key)
+        self._frame_files = (dir_key, info["files"])
+        frame = header_lines("МЕНЕДЖЕР ХРАНИЛИЩА")
+        if info["count"] == 0:
+            return frame + ["", f"{Colors.YELLOW}Директория {dir_key} пуста{Colors.END}"]
+        return frame + self.listing_lines(dir_key, info)
+    
+    def show(self, view: Callable[[], List[str]]):
+        """Показывает кадр и обновляет его при изменениях в хранилище."""
+        with self._view_lock:
+            self._live_view = view
+            self._frame_files = None
+            screen.draw(view())
+            self._frame_shown()
+    
+    def _on_storage_change(self, events: List):
+        # Вызывается из потока наблюдения, пока основной поток ждет ввода
+        with self._view_lock:
+            view = self._live_view
+            if view is None:
+                return
+            self._frame_files = None
+            # Кадр не помещается на экран - на нем остается прежний список
+            if screen.patch(view()):
+                self._frame_shown()
+    
+    def _frame_shown(self):
+        if self._frame_files is not None:
+            self.current_dir, self.current_files = self._frame_files
+            self._frame_files = None
     
     def run(self):
+        if self.storage.recovery_messages:
+            # Пакеты операций, прерванные прошлым запуском
+            screen.lines(self.storage.recovery_messages)
+            self.storage.recovery_messages = []
+            screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+        started_watch = False
+        if not self.storage.watching:
+            started_watch, _ = self.storage.start_watching(on_change=self._on_storage_change)
+        try:
+            self._run()
+        finally:
+            self._live_view = None
+            if started_watch:
+                self.storage.stop_watching()
+    
+    def _run(self):
+        views = {"1": "temp", "2": "processed", "3": "downloads", "4": "archive", "5": "quarantine"}
         while True:
-            clear_screen()
-            print_header("МЕНЕДЖЕР ХРАНИЛИЩА")
-            self.print_storage_summary()
-            
-            print(f"\n{Colors.BOLD}ДЕЙСТВИЯ:{Colors.END}")
-            print("   1. Просмотреть temp")
-            print("   2. Просмотреть processed")
-            print("   3. Просмотреть downloads")
-            print("   4. Просмотреть archive")
-            print("   5. Просмотреть quarantine")
-            print("   " + "─" * 40)
-            print("   6. Удалить файл")
-            print("   7. Переместить файл")
-            print("   8. Копировать файл")
-            print("   9. Архивировать директорию")
-            print("   10. Поиск файлов")
-            print("   " + "─" * 40)
-            print("   0. Очистить temp")
-            print("   q. Выход")
+            # Кадр собирается целиком; если экран не прокручивался,
+            # перерисуются только изменившиеся строки сводки
+            self.show(self.menu_frame)
             
-            choice = input(f"\n{Colors.YELLOW}Выберите действие: {Colors.END}").lower()
+            choice = screen.input(f"\n{Colors.YELLOW}Выберите действие: {Colors.END}").lower()
+            self._live_view = None
             
             if choice == "q":
                 break
-            elif choice == "1":
-                self.list_directory("temp")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
-            elif choice == "2":
-                self.list_directory("processed")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
-            elif choice == "3":
-                self.list_directory("downloads")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
-            elif choice == "4":
-                self.list_directory("archive")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
-            elif choice == "5":
-                self.list_directory("quarantine")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+            elif choice in views:
+                dir_key = views[choice]
+                self.show(lambda: self.directory_frame(dir_key))
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                self._live_view = None
             elif choice == "6":
                 self.delete_file_interactive()
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
             elif choice == "7":
                 self.move_file_interactive()
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
             elif choice == "8":
                 self.copy_file_interactive()
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
             elif choice == "9":
                 self.archive_directory_interactive()
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
             elif choice == "10":
                 self.search_files_interactive()
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
+            elif choice == "11":
+                self.analytics_interactive()
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
             elif choice == "0":
-                confirm = input(f"{Colors.RED}Очистить temp? (y/n): {Colors.END}")
+                confirm = screen.input(f"{Colors.RED}Очистить temp? (y/n): {Colors.END}")
                 if confirm.lower() == 'y':
                     count, msg = self.storage.delete_all_in_directory("temp")
-                    print(f"{Colors.GREEN}{msg}{Colors.END}")
-                input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
\ No newline at end of file
+                    screen.print(f"{Colors.GREEN}{msg}{Colors.END}")
+                screen.input(f"\n{Colors.GREEN}Нажмите Enter...{Colors.END}")
\ No newline at end of file
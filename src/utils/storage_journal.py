@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Журнал пакетных операций хранилища (write-ahead log).
+
+Пакет перемещений, копирований и удалений выполняется в две фазы:
+
+1. Подготовка. Копии пишутся в служебный каталог .staging/<пакет>
+   рядом с хранилищем; исходные файлы не меняются. После записи копии
+   сбрасываются на диск, и в журнал добавляется запись prepared со
+   списком операций - это точка фиксации пакета.
+2. Применение. Готовые копии и перемещаемые файлы ставятся на место
+   жесткой ссылкой (os.link не заменяет существующий файл) с удалением
+   старого имени, удаляемые файлы удаляются, затем каталоги назначения
+   сбрасываются на диск и в журнал пишется committed. Если имя
+   назначения успел занять другой пакет или процесс, файл получает
+   следующее свободное имя (имя_1, имя_2, ...) - чужие файлы пакет
+   никогда не перезаписывает.
+
+При запуске recover() доводит до конца пакеты с prepared без committed
+(все шаги повторяемы) и удаляет каталоги подготовки пакетов, которые
+не дошли до prepared, - их исходные файлы не тронуты. Хранилище могут
+одновременно открыть несколько менеджеров и процессов, поэтому:
+
+- recover() выполняется под исключительной блокировкой .journal.recover,
+  два восстановления не идут одновременно;
+- в имени пакета записан pid владельца; пакеты живых процессов (и
+  текущего) recover() не трогает - ни записи, ни каталог подготовки;
+- пока у экземпляра журнала есть незавершенные пакеты, он держит
+  разделяемую блокировку .journal.lock. Журнал обрезается только под
+  исключительной блокировкой (ни у кого нет пакетов в работе) и только
+  если в нем не осталось пакетов без committed.
+
+Без fcntl (Windows) блокировки не действуют, остается проверка pid.
+
+fsync журнала выполняется групповым: потоки, которые дописали запись,
+пока другой поток ждал fsync, не вызывают его повторно. Запись
+committed не требует отдельного fsync и уходит на диск вместе со
+следующей. Внутри пакета каждый каталог сбрасывается один раз,
+сколько бы файлов в нем ни изменилось.
+"""
+
+import errno
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+JOURNAL_NAME = ".journal"
+STAGING_NAME = ".staging"
+LOCK_NAME = ".journal.lock"
+RECOVER_LOCK_NAME = ".journal.recover"
+
+MOVE = "move"
+COPY = "copy"
+DELETE = "delete"
+
+# После скольких байт журнал обрезается, когда нет незавершенных пакетов
+CHECKPOINT_BYTES = 1024 * 1024
+
+# Ошибки os.link на ФС без жестких ссылок: имя занимается через O_EXCL
+_NO_LINKS = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOSYS, errno.EMLINK}
+
+# Номера пакетов общие для всех экземпляров журнала в процессе: у двух
+# менеджеров одного хранилища имена пакетов не совпадут
+_batch_numbers = itertools.count(1)
+
+
+def numbered_target(target: str, counter: int) -> str:
+    """Следующий кандидат на имя назначения: имя_1.ext, имя_2.ext, ..."""
+    name, ext = os.path.splitext(target)
+    return f"{name}_{counter}{ext}"
+
+
+def place(source: str, target: str,
+          rename: Callable[[str, int], str] = numbered_target) -> str:
+    """
+    Ставит файл на свободное имя, начиная с target, и убирает source.
+
+    Имя занимается атомарно: os.link падает с EEXIST, если имя уже
+    есть, и тогда пробуется следующий кандидат rename(target, n). Занятое
+    ссылкой на тот же файл имя значит, что файл был поставлен до сбоя.
+
+    Returns:
+        str: Итоговый путь файла
+    """
+    candidate = target
+    counter = 0
+    while True:
+        try:
+            os.link(source, candidate)
+            break
+        except FileExistsError:
+            try:
+                if os.path.samefile(source, candidate):
+                    break
+            except FileNotFoundError:
+                # Имя освободилось между link и проверкой
+                continue
+        except OSError as e:
+            if e.errno not in _NO_LINKS:
+                raise
+            try:
+                os.close(os.open(candidate, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                pass
+            else:
+                # Заменяется только что созданный здесь пустой файл
+                os.replace(source, candidate)
+                return candidate
+        counter += 1
+        candidate = rename(target, counter)
+        os.makedirs(os.path.dirname(candidate), exist_ok=True)
+    os.remove(source)
+    return candidate
+
+
+def _fsync_dir(path: str):
+    """Сбрасывает на диск запись каталога (созданные и удаленные имена)."""
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def batch_owner(batch_id: str) -> Optional[int]:
+    """pid процесса, создавшего пакет (имя вида <время>-<pid>-<номер>)."""
+    try:
+        return int(batch_id.split("-")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _fsync_file(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FileResult:
+    """
+    Итог операции над одним файлом пакета.
+    """
+
+    def __init__(self, op: str, path: str, target: Optional[str] = None):
+        self.op = op
+        self.path = path
+        self.target = target
+        self.ok = False
+        self.message = "⚠️ Не выполнено"
+
+    def __repr__(self):
+        return f"FileResult({self.op!r}, {self.path!r}, ok={self.ok})"
+
+
+class BatchReport:
+    """
+    Отчет о пакете: результат по каждому файлу.
+    """
+
+    def __init__(self, results: List[FileResult], batch_id: Optional[str] = None):
+        self.batch_id = batch_id
+        self.results = results
+
+    @property
+    def succeeded(self) -> List[FileResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [result for result in self.results if not result.ok]
+
+    def summary(self) -> Tuple[bool, str]:
+        done = len(self.succeeded)
+        failed = len(self.failed)
+        if not failed:
+            return True, f"✅ Выполнено операций: {done}"
+        return False, f"❌ Выполнено {done}, с ошибкой {failed} из {len(self.results)}"
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+
+class StorageJournal:
+    """
+    Журнал и исполнитель пакетов файловых операций.
+    """
+
+    def __init__(self, base_dir: str, durable: bool = True,
+                 rename: Optional[Callable[[str, int], str]] = None):
+        """
+        Args:
+            base_dir: Корень хранилища (там лежат .journal и .staging)
+            durable: False - без fsync (данные не переживут сбой питания,
+                     но переживут падение процесса)
+            rename: (путь назначения, номер) -> следующий кандидат, если
+                    имя занято (по умолчанию numbered_target); должен
+                    быть детерминированным - по нему recover() находит
+                    уже поставленные файлы
+        """
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, JOURNAL_NAME)
+        self.staging_dir = os.path.join(base_dir, STAGING_NAME)
+        self.durable = durable
+        self.rename = rename or numbered_target
+        self.fsyncs = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self._active: Set[str] = set()
+        self._file = None
+        self._lock_fd: Optional[int] = None
+        self._checked_at = 0
+
+    # --- Журнал --------------------------------------------------------------
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(self.base_dir, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _append(self, record: Dict, sync: bool):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            journal = self._open()
+            journal.write(line)
+            journal.flush()
+            self._written += 1
+            position = self._written
+        if sync:
+            self._sync(position)
+
+    def _sync(self, position: int):
+        if not self.durable:
+            return
+        with self._sync_lock:
+            if self._synced >= position:
+                # Запись уже ушла на диск вместе с чужим fsync
+                return
+            with self._lock:
+                upto = self._written
+                fd = self._file.fileno()
+            os.fsync(fd)
+            self._synced = upto
+            self.fsyncs += 1
+
+    def _read(self) -> List[Dict]:
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Оборванная последняя запись: пакет не был зафиксирован
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    # --- Блокировки ----------------------------------------------------------
+
+    def _flock(self, operation: int) -> bool:
+        """flock на .journal.lock этого экземпляра; вызывается под self._lock."""
+        if self._lock_fd is None:
+            os.makedirs(self.base_dir, exist_ok=True)
+            self._lock_fd = os.open(os.path.join(self.base_dir, LOCK_NAME),
+                                    os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, operation)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _truncate_settled(self) -> bool:
+        """
+        Обрезает журнал, если ни у кого нет пакетов в работе и в нем не
+        осталось пакетов без committed. Вызывается под self._lock.
+        """
+        if self._active:
+            return False
+        if fcntl is not None and not self._flock(fcntl.LOCK_EX | fcntl.LOCK_NB):
+            return False
+        try:
+            if self._pending(self._read()):
+                # Пакет умершего процесса ждет recover(); до следующей
+                # проверки журнал должен вырасти еще на CHECKPOINT_BYTES
+                self._checked_at = os.path.getsize(self.path)
+                return False
+            journal = self._open()
+            journal.truncate(0)
+            journal.seek(0)
+            if self.durable:
+                os.fsync(journal.fileno())
+            self._checked_at = 0
+            return True
+        finally:
+            if fcntl is not None:
+                self._flock(fcntl.LOCK_UN)
+
+    @staticmethod
+    def _pending(records: List[Dict]) -> Dict[str, List]:
+        prepared: Dict[str, List] = {}
+        for record in records:
+            if record.get("state") == "prepared":
+                prepared[record["batch"]] = record["ops"]
+            elif record.get("state") == "committed":
+                prepared.pop(record["batch"], None)
+        return prepared
+
+    def _checkpoint(self):
+        with self._lock:
+            if (self._active or self._file is None
+                    or self._file.tell() < self._checked_at + CHECKPOINT_BYTES):
+                return
+            self._truncate_settled()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    # --- Восстановление ------------------------------------------------------
+
+    def recover(self) -> List[str]:
+        """
+        Доводит прерванные пакеты и убирает незафиксированные.
+
+        Пакеты, владелец которых еще жив, пропускаются: их доведет или
+        отменит сам владелец.
+
+        Returns:
+            List[str]: Сообщения о восстановленных и отмененных пакетах
+        """
+        if fcntl is None:
+            return self._recover()
+        os.makedirs(self.base_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.base_dir, RECOVER_LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            return self._recover()
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _abandoned(batch_id: str) -> bool:
+        owner = batch_owner(batch_id)
+        return owner is None or not _pid_alive(owner)
+
+    def _recover(self) -> List[str]:
+        messages = []
+        prepared = {batch_id: ops for batch_id, ops in self._pending(self._read()).items()
+                    if self._abandoned(batch_id)}
+
+        for batch_id, ops in prepared.items():
+            touched = set()
+            errors = 0
+            for op, path, target, staged in ops:
+                try:
+                    self._apply(op, path, target, staged, touched)
+                except OSError:
+                    errors += 1
+            self._sync_dirs(touched)
+            if errors:
+                messages.append(f"❌ Пакет {batch_id} восстановлен частично: "
+                                f"ошибок {errors} из {len(ops)}")
+            else:
+                messages.append(f"✅ Пакет {batch_id} восстановлен: {len(ops)} операций")
+            # Повторное применение после удаления копий небезопасно
+            self._append({"batch": batch_id, "state": "committed"}, sync=True)
+
+        if os.path.isdir(self.staging_dir):
+            import shutil
+            for name in os.listdir(self.staging_dir):
+                if not self._abandoned(name):
+                    continue
+                if name not in prepared:
+                    messages.append(f"⚠️ Пакет {name} отменен: не был зафиксирован")
+                shutil.rmtree(os.path.join(self.staging_dir, name), ignore_errors=True)
+
+        if os.path.exists(self.path):
+            with self._lock:
+                self._truncate_settled()
+        return messages
+
+    # --- Выполнение пакета ---------------------------------------------------
+
+    def _new_batch_id(self) -> str:
+        with self._lock:
+            if not self._active and fcntl is not None:
+                self._flock(fcntl.LOCK_SH)
+            batch_id = f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{next(_batch_numbers)}"
+            self._active.add(batch_id)
+        return batch_id
+
+    def _place(self, source: str, target: str) -> str:
+        return place(source, target, self.rename)
+
+    def _apply(self, op: str, path: str, target: Optional[str], staged: Optional[str],
+               touched: Set[str]) -> Optional[str]:
+        """
+        Применяет операцию; повторный вызов после сбоя безопасен.
+
+        Returns:
+            Optional[str]: Итоговый путь назначения (может отличаться
+            от target, если имя было занято)
+        """
+        if op == DELETE:
+            if os.path.lexists(path):
+                os.remove(path)
+                touched.add(os.path.dirname(path))
+            return None
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if staged is not None:
+            if os.path.exists(staged):
+                target = self._place(staged, target)
+                touched.add(os.path.dirname(target))
+            if op == MOVE and os.path.lexists(path) and not os.path.exists(staged):
+                # Перемещение между ФС: копия уже на месте, исходник удаляется
+                os.remove(path)
+                touched.add(os.path.dirname(path))
+        elif os.path.lexists(path):
+            target = self._place(path, target)
+            touched.add(os.path.dirname(target))
+            touched.add(os.path.dirname(path))
+        return target
+
+    def _sync_dirs(self, directories: Iterable[str]):
+        if self.durable:
+            for directory in directories:
+                _fsync_dir(directory)
+
+    def execute(self, operations: List[Tuple[str, str, Optional[str]]],
+                atomic: bool = True) -> BatchReport:
+        """
+        Выполняет пакет операций.
+
+        Args:
+            operations: (move|copy|delete, путь, путь назначения или None)
+            atomic: True - ошибка подготовки любого файла отменяет весь
+                    пакет; False - выполняются остальные файлы
+
+        Returns:
+            BatchReport: Результат по каждому файлу
+        """
+        import shutil
+
+        results = [FileResult(op, path, target) for op, path, target in operations]
+        if not results:
+            return BatchReport(results)
+        batch_id = self._new_batch_id()
+        staging = os.path.join(self.staging_dir, batch_id)
+        try:
+            # Фаза 1: проверка исходников и копии в каталог подготовки
+            planned = []
+            staged_files = []
+            for index, result in enumerate(results):
+                try:
+                    if not os.path.isfile(result.path):
+                        raise FileNotFoundError("файл не найден")
+                    staged = None
+                    if result.op == COPY or (result.op == MOVE and not self._same_device(
+                            result.path, os.path.dirname(result.target))):
+                        os.makedirs(staging, exist_ok=True)
+                        staged = os.path.join(staging, str(index))
+                        shutil.copy2(result.path, staged)
+                        staged_files.append(staged)
+                    planned.append((result, staged))
+                except OSError as e:
+                    result.message = f"❌ Ошибка: {e.strerror or e}"
+            if atomic and len(planned) < len(results):
+                for result, _ in planned:
+                    result.message = "⚠️ Отменено: ошибка в другом файле пакета"
+                shutil.rmtree(staging, ignore_errors=True)
+                return BatchReport(results, batch_id)
+            if not planned:
+                return BatchReport(results, batch_id)
+
+            if self.durable and staged_files:
+                # Данные копий - на диск до точки фиксации
+                for staged in staged_files:
+                    _fsync_file(staged)
+                _fsync_dir(staging)
+            ops = [[result.op, result.path, result.target, staged] for result, staged in planned]
+            self._append({"batch": batch_id, "state": "prepared", "ops": ops}, sync=True)
+
+            # Фаза 2: применение. Пакет уже зафиксирован: ошибка отдельного
+            # файла не откатывает остальные, при сбое recover() повторит шаги
+            touched: Set[str] = set()
+            for result, staged in planned:
+                try:
+                    result.target = self._apply(result.op, result.path, result.target,
+                                                staged, touched)
+                    result.ok = True
+                    result.message = "✅ Выполнено"
+                except OSError as e:
+                    result.message = f"❌ Ошибка: {e.strerror or e}"
+            self._sync_dirs(touched)
+            self._append({"batch": batch_id, "state": "committed"}, sync=False)
+            if staged_files:
+                shutil.rmtree(staging, ignore_errors=True)
+        finally:
+            with self._lock:
+                self._active.discard(batch_id)
+                if not self._active and fcntl is not None:
+                    self._flock(fcntl.LOCK_UN)
+        self._checkpoint()
+        return BatchReport(results, batch_id)
+
+    @staticmethod
+    def _same_device(path: str, directory: str) -> bool:
+        try:
+            return os.stat(path).st_dev == os.stat(directory).st_dev
+        except OSError:
+            return True
@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+"""
+Генератор нагрузки на хранилище.
+
+N клиентов-потоков выполняют взвешенную смесь операций StorageManager
+(листинг, поиск, копирование, перемещение, удаление, архивация) над
+корпусом файлов FileGenerator. С целевой частотой (--rate) запуски
+идут по расписанию, не зависящему от ответов (открытая модель): если
+хранилище не успевает, время ответа включает ожидание своей очереди и
+не прячет затор. Без --rate клиенты работают без пауз (закрытая модель).
+
+Для каждой операции считаются время выполнения (service) и время от
+запланированного запуска (response). Каждые --interval секунд
+выводится строка с пропускной способностью, перцентилями и ошибками,
+в конце - таблица по типам операций. В режиме --soak прогон длится до
+Ctrl+C (или --duration), корпус пополняется, а старые архивы удаляются,
+чтобы нагрузка оставалась стационарной; итог сравнивает первый и
+последний интервалы. После прогона каждый файл корпуса проверяется в
+хранилище: пропавшие (например, перезаписанные другим клиентом)
+считаются ошибками, даже если все операции завершились успешно.
+
+Запуск: python -m src.utils.storage_load [--clients N] [--rate R] [--duration S]
+        [--mix list=30,search=20,...] [--files N] [--soak] [--json FILE]
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils.file_generator import FileGenerator
+from src.utils.latency import LatencyHistogram, format_duration
+
+OPERATIONS = ("list", "search", "copy", "move", "delete", "archive")
+DEFAULT_MIX = "list=30,search=20,copy=20,move=15,delete=10,archive=5"
+# Директории, между которыми ходят файлы корпуса
+WORK_DIRS = ("temp", "processed", "downloads", "quarantine")
+# Сколько архивов оставлять в режиме --soak
+SOAK_ARCHIVES = 20
+# Различных текстов ошибок на операцию, остальные - в "прочие"
+MAX_MESSAGES = 20
+# Пути в текстах ошибок: без них одинаковые ошибки группируются
+_QUOTED = re.compile(r"'[^']*'")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Разбирает смесь операций вида "list=30,search=20,copy".
+
+    Вес без значения равен 1, операции с нулевым весом отбрасываются.
+
+    Raises:
+        ValueError: Неизвестная операция или неверный вес
+    """
+    mix = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in OPERATIONS:
+            raise ValueError(f"Неизвестная операция: {name} (доступны: {', '.join(OPERATIONS)})")
+        try:
+            value = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f"Неверный вес операции {name}: {weight}") from None
+        if value < 0:
+            raise ValueError(f"Отрицательный вес операции {name}: {weight}")
+        mix[name] = value
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise ValueError("В смеси нет операций с ненулевым весом")
+    return mix
+
+
+class OperationStats:
+    """
+    Статистика одного типа операций за интервал или за весь прогон.
+    """
+
+    __slots__ = ("service", "response", "errors", "skipped", "messages")
+
+    def __init__(self):
+        self.service = LatencyHistogram()
+        self.response = LatencyHistogram()
+        self.errors = 0
+        # Нечего делать: например, корпус пуст для copy/move/delete
+        self.skipped = 0
+        self.messages: Dict[str, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.service.count
+
+    def add_error(self, message: str, count: int = 1):
+        self.errors += count
+        if message not in self.messages and len(self.messages) >= MAX_MESSAGES:
+            message = "прочие"
+        self.messages[message] = self.messages.get(message, 0) + count
+
+    def merge(self, other: "OperationStats") -> "OperationStats":
+        self.service.merge(other.service)
+        self.response.merge(other.response)
+        self.skipped += other.skipped
+        for message, count in other.messages.items():
+            self.add_error(message, count)
+        return self
+
+    def to_dict(self, seconds: float) -> Dict:
+        return {
+            "ops": self.count,
+            "ops_per_sec": self.count / seconds if seconds > 0 else 0.0,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "latency_ms": self.service.to_dict(),
+            "response_p99_ms": self.response.percentile(99) * 1000,
+            "error_messages": dict(sorted(self.messages.items(), key=lambda item: -item[1])),
+        }
+
+
+def _merged(stats: Dict[str, OperationStats]) -> OperationStats:
+    total = OperationStats()
+    for item in stats.values():
+        total.merge(item)
+    return total
+
+
+class LoadReport:
+    """
+    Итоги прогона: строки интервалов и статистика по операциям.
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.intervals: List[Dict] = []
+        self.totals: Dict[str, OperationStats] = {}
+        self.elapsed = 0.0
+        self.interrupted = False
+        # Итог проверки корпуса после прогона: checked, missing, examples
+        self.corpus: Optional[Dict] = None
+
+    def add_interval(self, stats: Dict[str, OperationStats], started: float, seconds: float) -> Dict:
+        """Закрывает интервал: добавляет его к итогам и возвращает строку отчета."""
+        total = _merged(stats)
+        for op, item in stats.items():
+            self.totals.setdefault(op, OperationStats()).merge(item)
+        row = {
+            "t": round(started + seconds, 3),
+            "seconds": round(seconds, 3),
+            "ops": total.count,
+            "ops_per_sec": total.count / seconds if seconds > 0 else 0.0,
+            "errors": total.errors,
+            "p50_ms": total.service.percentile(50) * 1000,
+            "p99_ms": total.service.percentile(99) * 1000,
+            "response_p99_ms": total.response.percentile(99) * 1000,
+            "operations": {op: {"ops": item.count, "errors": item.errors,
+                                "p99_ms": item.service.percentile(99) * 1000}
+                           for op, item in sorted(stats.items())},
+        }
+        self.intervals.append(row)
+        return row
+
+    def drift(self) -> Optional[Dict[str, float]]:
+        """
+        Изменение от первого интервала к последнему (для --soak):
+        отношения пропускной способности и p99.
+        """
+        rows = [row for row in self.intervals if row["ops"]]
+        if len(rows) < 2:
+            return None
+        first, last = rows[0], rows[-1]
+        return {
+            "throughput": last["ops_per_sec"] / first["ops_per_sec"] if first["ops_per_sec"] else 0.0,
+            "p99": last["p99_ms"] / first["p99_ms"] if first["p99_ms"] else 0.0,
+        }
+
+    @property
+    def missing(self) -> int:
+        return self.corpus["missing"] if self.corpus else 0
+
+    def to_dict(self) -> Dict:
+        total = _merged(self.totals).to_dict(self.elapsed)
+        total["errors"] += self.missing
+        return {
+            "config": self.config,
+            "elapsed": round(self.elapsed, 3),
+            "interrupted": self.interrupted,
+            "intervals": self.intervals,
+            "operations": {op: item.to_dict(self.elapsed) for op, item in sorted(self.totals.items())},
+            "total": total,
+            "corpus": self.corpus,
+            "drift": self.drift(),
+        }
+
+    def summary_lines(self) -> List[str]:
+        """Таблица по типам операций."""
+        elapsed = self.elapsed or 1e-9
+        lines = [f"{'операция':<9} {'опер.':>8} {'оп/с':>9} {'ошибок':>7} {'пропуск':>8} "
+                 f"{'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'max':>9} {'отклик p99':>11}"]
+        rows = sorted(self.totals.items())
+        rows.append(("всего", _merged(self.totals)))
+        for op, item in rows:
+            latency = item.service.percentiles()
+            lines.append(
+                f"{op:<9} {item.count:>8} {item.count / elapsed:>9.1f} {item.errors:>7} {item.skipped:>8} "
+                f"{format_duration(latency['p50']):>9} {format_duration(latency['p90']):>9} "
+                f"{format_duration(latency['p99']):>9} {format_duration(latency['p99.9']):>9} "
+                f"{format_duration(item.service.max):>9} {format_duration(item.response.percentile(99)):>11}")
+        for op, item in sorted(self.totals.items()):
+            for message, count in sorted(item.messages.items(), key=lambda entry: -entry[1])[:3]:
+                lines.append(f"  {op}: {count} x {message}")
+        drift = self.drift()
+        if drift is not None:
+            lines.append(f"Первый -> последний интервал: пропускная способность x{drift['throughput']:.2f}, "
+                         f"p99 x{drift['p99']:.2f}")
+        if self.corpus is not None:
+            if self.missing:
+                lines.append(f"❌ Пропало файлов корпуса: {self.missing} из {self.corpus['checked']}")
+                lines.extend(f"  {path}" for path in self.corpus["examples"])
+            else:
+                lines.append(f"✅ Корпус проверен: {self.corpus['checked']} файлов на месте")
+        return lines
+
+
+class Corpus:
+    """
+    Известные файлы хранилища. Клиент забирает файл на время операции,
+    поэтому два клиента не перемещают и не удаляют один файл одновременно.
+    """
+
+    def __init__(self):
+        self._items: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, path: str, dir_key: str):
+        with self._lock:
+            self._items.append((path, dir_key))
+
+    def items(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._items)
+
+    def take(self, rng: random.Random) -> Optional[Tuple[str, str]]:
+        """Случайный файл (путь, директория) или None, если корпус пуст."""
+        with self._lock:
+            items = self._items
+            if not items:
+                return None
+            index = rng.randrange(len(items))
+            items[index], items[-1] = items[-1], items[index]
+            return items.pop()
+
+
+class LoadGenerator:
+    """
+    Клиенты-потоки, выполняющие смесь операций над StorageManager.
+    """
+
+    def __init__(self, manager, mix: Optional[Dict[str, float]] = None, clients: int = 8,
+                 rate: float = 0.0, files: int = 200, seed: Optional[int] = None,
+                 soak: bool = False):
+        """
+        Инициализация.
+
+        Args:
+            manager: StorageManager (любой бэкенд)
+            mix: Веса операций (по умолчанию DEFAULT_MIX)
+            clients: Число одновременных клиентов
+            rate: Целевая частота операций в секунду на всех клиентов (0 - без пауз)
+            files: Размер корпуса
+            seed: Зерно выбора операций и файлов (None - случайное)
+            soak: Пополнять корпус и ограничивать число архивов
+        """
+        self.manager = manager
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.clients = max(1, clients)
+        self.rate = max(0.0, rate)
+        self.files = max(1, files)
+        self.seed = seed
+        self.soak = soak
+        self.corpus = Corpus()
+        self._handlers: Dict[str, Callable] = {
+            "list": self._list, "search": self._search, "copy": self._copy,
+            "move": self._move, "delete": self._delete, "archive": self._archive,
+        }
+        self._stats: Dict[str, OperationStats] = {}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._slot_lock = threading.Lock()
+        self._issued = 0
+        self._started = 0.0
+        self._deadline: Optional[float] = None
+
+    # --- Корпус --------------------------------------------------------------
+
+    def prepare(self) -> int:
+        """Создает корпус до размера files. Возвращает число новых файлов."""
+        missing = self.files - len(self.corpus)
+        if missing > 0:
+            self._generate(missing)
+        return max(0, missing)
+
+    def _generate(self, count: int):
+        import tempfile
+        # Файлы создаются локально и загружаются через бэкенд хранилища
+        with tempfile.TemporaryDirectory(prefix="storage_load_") as staging:
+            paths = FileGenerator(staging).generate_test_files(count, quiet=True)
+            targets = self.manager.import_files(paths, "temp")
+        for target in targets:
+            self.corpus.put(target, "temp")
+
+    def _maintain(self):
+        """Пополняет корпус и удаляет лишние архивы (режим --soak)."""
+        if len(self.corpus) < self.files // 2:
+            self.prepare()
+        archives = self.manager.get_directory_info("archive")["files"]
+        if len(archives) > SOAK_ARCHIVES:
+            self.manager.delete_files([entry.path for entry in archives[SOAK_ARCHIVES:]],
+                                      atomic=False)
+
+    def verify(self) -> Dict:
+        """
+        Проверяет, что все файлы корпуса есть в хранилище.
+
+        Файл, который операция отметила как успешную, но перезаписала
+        другим клиентом, здесь находится как пропавший (или как путь,
+        записанный в корпус дважды).
+
+        Returns:
+            Dict: checked, missing и до MAX_MESSAGES примеров путей
+        """
+        seen = set()
+        examples = []
+        missing = 0
+        items = self.corpus.items()
+        for path, _ in items:
+            if path in seen or self.manager.backend.stat(path) is None:
+                missing += 1
+                if len(examples) < MAX_MESSAGES:
+                    examples.append(path)
+            seen.add(path)
+        return {"checked": len(items), "missing": missing, "examples": examples}
+
+    # --- Операции ------------------------------------------------------------
+    # Результат: (True - успех, False - ошибка, None - пропуск; сообщение)
+
+    def _list(self, rng: random.Random, client: int, seq: int):
+        info = self.manager.get_directory_info(rng.choice(WORK_DIRS))
+        return info["exists"], "❌ Директория не найдена"
+
+    def _search(self, rng: random.Random, client: int, seq: int):
+        self.manager.search_files(f"file_{rng.randint(1, self.files):03d}")
+        return True, ""
+
+    def _transfer(self, rng: random.Random, batch: Callable, keep_source: bool):
+        item = self.corpus.take(rng)
+        if item is None:
+            return None, "корпус пуст"
+        path, dir_key = item
+        target_key = rng.choice([key for key in WORK_DIRS if key != dir_key])
+        try:
+            result = batch([path], target_key).results[0]
+        except Exception:
+            self.corpus.put(path, dir_key)
+            raise
+        if keep_source or not result.ok:
+            self.corpus.put(path, dir_key)
+        if result.ok:
+            self.corpus.put(result.target, target_key)
+        return result.ok, result.message
+
+    def _copy(self, rng: random.Random, client: int, seq: int):
+        return self._transfer(rng, self.manager.copy_files, keep_source=True)
+
+    def _move(self, rng: random.Random, client: int, seq: int):
+        return self._transfer(rng, self.manager.move_files, keep_source=False)
+
+    def _delete(self, rng: random.Random, client: int, seq: int):
+        item = self.corpus.take(rng)
+        if item is None:
+            return None, "корпус пуст"
+        return self.manager.delete_file(item[0])
+
+    def _archive(self, rng: random.Random, client: int, seq: int):
+        return self.manager.create_archive(rng.choice(WORK_DIRS), f"load_{client}_{seq}.zip")
+
+    # --- Прогон --------------------------------------------------------------
+
+    def _next_slot(self) -> float:
+        """Запланированное время следующей операции."""
+        if not self.rate:
+            return time.perf_counter()
+        with self._slot_lock:
+            issued = self._issued
+            self._issued += 1
+        return self._started + issued / self.rate
+
+    def _record(self, op: str, service: float, response: float,
+                status: Optional[bool], message: str):
+        with self._stats_lock:
+            stats = self._stats.get(op)
+            if stats is None:
+                stats = self._stats[op] = OperationStats()
+            if status is None:
+                stats.skipped += 1
+                return
+            stats.service.record(service)
+            stats.response.record(response)
+            if not status:
+                stats.add_error(_QUOTED.sub("'…'", message.lstrip("❌⚠️ ")) or "ошибка")
+
+    def _snapshot(self) -> Dict[str, OperationStats]:
+        with self._stats_lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def _client(self, index: int):
+        rng = random.Random(None if self.seed is None else self.seed * 1000 + index)
+        ops = list(self.mix)
+        weights = [self.mix[op] for op in ops]
+        seq = 0
+        while not self._stop.is_set():
+            scheduled = self._next_slot()
+            if self._deadline is not None and scheduled >= self._deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            op = rng.choices(ops, weights)[0]
+            seq += 1
+            started = time.perf_counter()
+            try:
+                status, message = self._handlers[op](rng, index, seq)
+            except Exception as e:
+                status, message = False, f"{type(e).__name__}: {e}"
+            finished = time.perf_counter()
+            self._record(op, finished - started, finished - scheduled, status, message)
+
+    def stop(self):
+        """Останавливает прогон (клиенты завершат текущие операции)."""
+        self._stop.set()
+
+    def run(self, duration: Optional[float] = 30.0, interval: float = 5.0,
+            on_interval: Optional[Callable[[Dict], None]] = None) -> LoadReport:
+        """
+        Выполняет прогон.
+
+        Args:
+            duration: Длительность в секундах (None - до stop() или Ctrl+C)
+            interval: Период строк отчета, с
+            on_interval: Вызывается со строкой каждого закрытого интервала
+
+        Returns:
+            LoadReport: Итоги прогона (при Ctrl+C - interrupted=True)
+        """
+        report = LoadReport({
+            "mix": self.mix, "clients": self.clients, "rate": self.rate,
+            "files": self.files, "duration": duration, "interval": interval,
+            "soak": self.soak, "seed": self.seed, "backend": self.manager.backend.name,
+        })
+        self._stop.clear()
+        self._stats = {}
+        self._issued = 0
+        self._started = time.perf_counter()
+        self._deadline = None if duration is None else self._started + duration
+        threads = [threading.Thread(target=self._client, args=(index,),
+                                    name=f"storage-load-{index}", daemon=True)
+                   for index in range(self.clients)]
+        for thread in threads:
+            thread.start()
+
+        last = self._started
+        try:
+            while True:
+                now = time.perf_counter()
+                wait = interval - (now - last)
+                if self._deadline is not None:
+                    wait = min(wait, self._deadline - now)
+                if self._stop.wait(max(0.0, wait)):
+                    break
+                now = time.perf_counter()
+                if self._deadline is not None and now >= self._deadline:
+                    break
+                if now - last >= interval:
+                    row = report.add_interval(self._snapshot(), last - self._started, now - last)
+                    last = now
+                    if on_interval:
+                        on_interval(row)
+                    if self.soak:
+                        self._maintain()
+        except KeyboardInterrupt:
+            report.interrupted = True
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        # Последний (возможно, неполный) интервал вместе с операциями,
+        # завершившимися после остановки
+        now = time.perf_counter()
+        stats = self._snapshot()
+        if stats:
+            row = report.add_interval(stats, last - self._started, now - last)
+            if on_interval:
+                on_interval(row)
+        report.elapsed = now - self._started
+        report.corpus = self.verify()
+        return report
+
+
+def interval_line(row: Dict) -> str:
+    """Строка отчета за интервал."""
+    ops = "  ".join(f"{op} {data['ops']}" for op, data in row["operations"].items())
+    return (f"{row['t']:>7.1f} с  {row['ops_per_sec']:>8.1f} оп/с  "
+            f"p50 {format_duration(row['p50_ms'] / 1000):>7}  p99 {format_duration(row['p99_ms'] / 1000):>7}  "
+            f"ошибок {row['errors']:<4} | {ops}")
+
+
+def main() -> int:
+    import argparse
+    import shutil
+    import tempfile
+    from src.utils import metrics
+    from src.utils.headless import emit, is_headless, progress_bar
+    from src.utils.storage_backends import create_backend
+    from src.utils.storage_manager import StorageManager
+
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон StorageManager")
+    parser.add_argument("--clients", type=int, default=8, help="Одновременных клиентов")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Целевая частота, оп/с на всех клиентов (0 - без пауз)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Длительность, с (по умолчанию 30, в --soak - до Ctrl+C)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Период строк отчета, с")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Веса операций ({', '.join(OPERATIONS)})")
+    parser.add_argument("--files", type=int, default=200, help="Размер корпуса")
+    parser.add_argument("--dir", help="Каталог хранилища (по умолчанию - временный)")
+    parser.add_argument("--layout", help="Раскладка новых директорий: flat или sharded[:d:w]")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--soak", action="store_true",
+                        help="Длительный прогон: пополнять корпус, ограничивать архивы")
+    parser.add_argument("--json", help="Сохранить отчет в JSON")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    duration = args.duration if args.duration is not None else (None if args.soak else 30.0)
+
+    metrics.start_from_env()
+    backend = create_backend()
+    base_dir = args.dir
+    temporary = base_dir is None
+    if temporary:
+        # Для объектного хранилища каталог - только префикс ключей
+        base_dir = (tempfile.mkdtemp(prefix="storage_load_") if backend.local
+                    else f"storage_load_{os.getpid()}")
+    manager = StorageManager(base_dir, layout=args.layout, backend=backend)
+    try:
+        generator = LoadGenerator(manager, mix, clients=args.clients, rate=args.rate,
+                                  files=args.files, seed=args.seed, soak=args.soak)
+        print(f"Корпус: {generator.prepare()} файлов в {base_dir} ({manager.backend.name})")
+        print(f"Клиентов: {generator.clients}, частота: {args.rate or 'без пауз'}, "
+              f"смесь: {', '.join(f'{op}={weight:g}' for op, weight in mix.items())}")
+
+        with progress_bar(total=duration, desc="Нагрузка", unit="с") as bar:
+            def on_interval(row: Dict):
+                bar.update(row["seconds"])
+                bar.set_postfix(ops=f"{row['ops_per_sec']:.0f}/s",
+                                p99=format_duration(row["p99_ms"] / 1000), errors=row["errors"])
+                bar.write(interval_line(row))
+                if is_headless():
+                    emit("load_interval", **row)
+
+            report = generator.run(duration, args.interval, on_interval)
+
+        print()
+        for line in report.summary_lines():
+            print(line)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+            print(f"Отчет сохранен: {args.json}")
+        return 1 if report.missing else 0
+    finally:
+        if temporary:
+            if backend.local:
+                shutil.rmtree(base_dir, ignore_errors=True)
+            else:
+                for dir_key in manager.directories:
+                    manager.delete_all_in_directory(dir_key)
+        backend.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
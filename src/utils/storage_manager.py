@@ -1,60 +1,374 @@
 ﻿#!/usr/bin/env python3
 """
 Менеджер хранилища - управление файлами.
+
+Директория может быть плоской или шардированной (файлы в подкаталогах
+по хешу имени, см. sharding). Раскладка берется из маркера директории;
+новые пустые директории создаются в раскладке из TQDM_DEMO_LAYOUT
+(flat по умолчанию, sharded или sharded:глубина:ширина). Все операции
+менеджера работают с обеими раскладками одинаково.
+
+Перемещение, копирование и массовое удаление выполняются пакетами
+через журнал (см. storage_journal): пакет либо применяется целиком,
+либо не меняет файлов, а прерванный сбоем пакет доводится до конца
+при следующем создании менеджера.
+
+Файлы хранятся в бэкенде (см. storage_backends): локальная ФС по
+умолчанию, память или S3. Журнал, наблюдение за изменениями и
+шардирование есть только у локальной ФС; в остальных бэкендах пакет
+выполняется пофайлово с тем же отчетом.
 """
 
 import os
-import shutil
-import zipfile
 import datetime
-from typing import List, Dict, Tuple
+import sys
+import threading
+from typing import Callable, List, Dict, Optional, Tuple
+
+from src.utils.metrics import batch_status, message_status, track_operation
+from src.utils.storage_backends import LocalBackend, StorageBackend, create_backend
+from src.utils.sharding import FlatLayout, ShardMigration, ShardedLayout, layout_from_name, \
+    read_layout, write_layout
+from src.utils.storage_journal import COPY, DELETE, MOVE, BatchReport, FileResult, StorageJournal
+
+
+def human_readable_size(size: float) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024.0:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} TB"
+
+
+class FileEntry:
+    """
+    Файл в хранилище.
+    
+    Хранятся только сырые значения: размер в байтах и mtime в секундах.
+    Строка размера и datetime создаются при обращении (при выводе).
+    Путь к каталогу - общая для всех файлов каталога строка.
+    """
+    
+    __slots__ = ("name", "parent", "size", "mtime", "directory")
+    
+    def __init__(self, name: str, parent: str, size: int, mtime: float,
+                 directory: Optional[str] = None):
+        """
+        Args:
+            name: Имя файла
+            parent: Каталог файла (в шардированной директории - каталог шарда)
+            size: Размер в байтах
+            mtime: Время изменения (st_mtime)
+            directory: Ключ директории хранилища (заполняется в результатах поиска)
+        """
+        self.name = name
+        self.parent = parent
+        self.size = size
+        self.mtime = mtime
+        self.directory = directory
+    
+    @property
+    def path(self) -> str:
+        return os.path.join(self.parent, self.name)
+    
+    @property
+    def size_hr(self) -> str:
+        return human_readable_size(self.size)
+    
+    @property
+    def modified(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.mtime)
+    
+    def __repr__(self):
+        return f"FileEntry({self.name!r}, size={self.size}, directory={self.directory!r})"
+
 
 class StorageManager:
     
-    def __init__(self, base_dir: str = "storage"):
+    def __init__(self, base_dir: str = "storage", layout: Optional[str] = None,
+                 durable: bool = True, backend: Optional[StorageBackend] = None):
+        """
+        Args:
+            base_dir: Корень хранилища
+            layout: Раскладка новых пустых директорий (flat, sharded,
+                    sharded:глубина:ширина; по умолчанию из TQDM_DEMO_LAYOUT)
+            durable: fsync журнала и каталогов при пакетных операциях
+            backend: Где лежат файлы (по умолчанию из TQDM_DEMO_STORAGE)
+        """
         self.base_dir = base_dir
+        self.backend = backend or create_backend()
+        join = self.backend.join
         self.directories = {
-            "temp": os.path.join(base_dir, "temp"),
-            "processed": os.path.join(base_dir, "processed"),
-            "downloads": os.path.join(base_dir, "downloads"),
-            "archive": os.path.join(base_dir, "archive"),
-            "quarantine": os.path.join(base_dir, "quarantine")
+            "temp": join(base_dir, "temp"),
+            "processed": join(base_dir, "processed"),
+            "downloads": join(base_dir, "downloads"),
+            "archive": join(base_dir, "archive"),
+            "quarantine": join(base_dir, "quarantine")
         }
         self._ensure_directories()
+        self.journal: Optional[StorageJournal] = None
+        self.recovery_messages: List[str] = []
+        if self.backend.local:
+            self.layouts = self._load_layouts(layout_from_name(layout or os.environ.get("TQDM_DEMO_LAYOUT")))
+            self.journal = StorageJournal(base_dir, durable, rename=self._renamed_target)
+            # Сообщения о пакетах, прерванных прошлым запуском
+            self.recovery_messages = self.journal.recover()
+        else:
+            self.layouts = {key: FlatLayout() for key in self.directories}
+        # Кэш содержимого директорий, который поддерживает наблюдатель ФС
+        self._index: Optional[Dict[str, Dict[str, FileEntry]]] = None
+        self._index_lock = threading.Lock()
+        self._watcher = None
+        self._watch_args = None
+        # Без журнала имя назначения выбирается и занимается под блокировкой
+        self._names_lock = threading.Lock()
     
     def _ensure_directories(self):
         for dir_path in self.directories.values():
-            os.makedirs(dir_path, exist_ok=True)
+            self.backend.makedirs(dir_path)
+    
+    def _load_layouts(self, default: FlatLayout) -> Dict[str, FlatLayout]:
+        layouts = {}
+        for key, dir_path in self.directories.items():
+            layout = read_layout(dir_path)
+            if layout is None:
+                layout = FlatLayout()
+                # Плоскую директорию с файлами переводит только миграция
+                if default.sharded:
+                    with os.scandir(dir_path) as entries:
+                        empty = next(entries, None) is None
+                    if empty:
+                        write_layout(dir_path, default)
+                        layout = default
+            layouts[key] = layout
+        return layouts
+    
+    def close(self):
+        """Останавливает наблюдение и закрывает журнал и бэкенд."""
+        self.stop_watching()
+        if self.journal is not None:
+            self.journal.close()
+        self.backend.close()
     
     def _human_readable_size(self, size: int) -> str:
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
+        return human_readable_size(size)
+    
+    def _iter_entries(self, dir_key: str, directory: Optional[str] = None,
+                      query: Optional[str] = None):
+        """FileEntry для файлов директории (query - подстрока имени без учета регистра)."""
+        parents: Dict[str, str] = {}
+        for name, parent, size, mtime in self.backend.list(self.directories[dir_key],
+                                                            self.layouts[dir_key]):
+            if query is not None and query not in name.lower():
+                continue
+            # Одна строка каталога на все его файлы
+            parent = parents.setdefault(parent, sys.intern(parent))
+            yield FileEntry(name, parent, size, mtime, directory)
+    
+    def _scan_directory(self, dir_key: str) -> Dict[str, FileEntry]:
+        return {entry.name: entry for entry in self._iter_entries(dir_key)}
+    
+    def _directory_totals(self, dir_key: str) -> Tuple[int, int]:
+        """Число файлов и их общий размер без создания записей."""
+        count = size = 0
+        for _, _, file_size, _ in self.backend.list(self.directories[dir_key], self.layouts[dir_key]):
+            size += file_size
+            count += 1
+        return count, size
+    
+    def find_file(self, dir_key: str, filename: str) -> Optional[str]:
+        """
+        Путь к файлу по имени без просмотра директории.
+        
+        Returns:
+            Optional[str]: Путь или None, если файла нет
+        """
+        dir_path = self.directories.get(dir_key)
+        if not dir_path:
+            return None
+        layout = self.layouts[dir_key]
+        if self.backend.local:
+            return layout.find(dir_path, filename)
+        filepath = self.backend.join(dir_path, filename)
+        return filepath if self.backend.stat(filepath) is not None else None
+    
+    def _target_path(self, dir_key: str, filename: str,
+                     reserved: Optional[set] = None) -> str:
+        """
+        Свободный путь для файла в директории (при совпадении имени - с меткой времени).
+        
+        Args:
+            reserved: Имена, уже занятые другими файлами того же пакета
+        """
+        dir_path = self.directories[dir_key]
+        layout = self.layouts[dir_key]
+        reserved = reserved if reserved is not None else set()
+        if self.find_file(dir_key, filename) is not None or filename in reserved:
+            name, ext = os.path.splitext(filename)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{name}_{timestamp}{ext}"
+            counter = 1
+            while self.find_file(dir_key, filename) is not None or filename in reserved:
+                filename = f"{name}_{timestamp}_{counter}{ext}"
+                counter += 1
+        reserved.add(filename)
+        if not self.backend.local:
+            return self.backend.join(dir_path, filename)
+        target_path = layout.path(dir_path, filename)
+        if layout.sharded:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        return target_path
+    
+    def _renamed_target(self, target: str, counter: int) -> str:
+        """
+        Следующее имя, если target занят к моменту применения пакета
+        (в шардированной директории новое имя может попасть в другой шард).
+        """
+        name, ext = os.path.splitext(os.path.basename(target))
+        filename = f"{name}_{counter}{ext}"
+        for dir_key, dir_path in self.directories.items():
+            if target.startswith(dir_path + os.sep):
+                return self.layouts[dir_key].path(dir_path, filename)
+        return os.path.join(os.path.dirname(target), filename)
+    
+    # --- Раскладка -----------------------------------------------------------
+    
+    def migrate_to_sharded(self, dir_key: str, depth: Optional[int] = None,
+                           width: Optional[int] = None,
+                           on_progress: Optional[Callable[[int, int], None]] = None
+                           ) -> Tuple[Optional[ShardMigration], str]:
+        """
+        Запускает фоновый перенос плоской директории в шарды.
+        
+        Директория сразу читается как шардированная: файлы, которые еще
+        не перенесены, видны в корне, поэтому остальные операции можно
+        выполнять во время миграции.
+        
+        Returns:
+            Tuple[Optional[ShardMigration], str]: Миграция (join() - дождаться
+            результата, cancel() - остановить) и сообщение
+        """
+        dir_path = self.directories.get(dir_key)
+        if not dir_path:
+            return None, "❌ Директория не найдена"
+        if not self.backend.local:
+            return None, "❌ Шардирование доступно только для локальной ФС"
+        current = self.layouts[dir_key]
+        layout = ShardedLayout(depth or getattr(current, "depth", 2),
+                               width or getattr(current, "width", 2))
+        if current.sharded and current.to_dict() != layout.to_dict():
+            return None, "❌ Директория уже шардирована с другими параметрами"
+        write_layout(dir_path, layout)
+        self.layouts[dir_key] = layout
+        if self._watcher is not None:
+            # Наблюдению нужны подкаталоги шардов
+            on_change, interval = self._watch_args
+            self.stop_watching()
+            self.start_watching(on_change, interval)
+        migration = ShardMigration(dir_path, layout, on_progress).start()
+        return migration, f"✅ Миграция {dir_key} запущена"
+    
+    # --- Наблюдение за изменениями ------------------------------------------
     
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None
+    
+    def start_watching(self, on_change: Optional[Callable[[List], None]] = None,
+                       interval: float = 1.0) -> Tuple[bool, str]:
+        """
+        Включает кэш содержимого директорий, который обновляется по
+        событиям ФС вместо полного пересканирования.
+        
+        Args:
+            on_change: Вызывается из фонового потока с пачкой событий
+                       после обновления кэша (None - без фонового потока,
+                       события забираются при каждом запросе)
+            interval: Период опроса для наблюдения без inotify, секунды
+        """
+        if self._watcher is not None:
+            return True, f"✅ Наблюдение уже включено ({self._watcher.method})"
+        if not self.backend.local:
+            return False, f"❌ Наблюдение недоступно для бэкенда {self.backend.name}"
+        from src.utils.fs_watch import create_watcher
+        depths = {key: getattr(layout, "depth", 0) for key, layout in self.layouts.items()}
+        try:
+            watcher = create_watcher(self.directories, interval, depths=depths)
+        except OSError as e:
+            return False, f"❌ Ошибка: {e}"
+        with self._index_lock:
+            self._index = {key: self._scan_directory(key) if os.path.isdir(path) else {}
+                           for key, path in self.directories.items()}
+        self._watcher = watcher
+        self._watch_args = (on_change, interval)
+        if on_change is not None:
+            def deliver(events):
+                self._apply_events(events)
+                on_change(events)
+            watcher.start(deliver)
+        return True, f"✅ Наблюдение включено ({watcher.method})"
+    
+    def stop_watching(self):
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.close()
+        with self._index_lock:
+            self._index = None
+    
+    def refresh(self) -> List:
+        """Забирает накопившиеся события ФС и применяет их к кэшу."""
+        watcher = self._watcher
+        if watcher is None:
+            return []
+        events = watcher.poll(0)
+        self._apply_events(events)
+        return events
+    
+    def _apply_events(self, events: List):
+        with self._index_lock:
+            if self._index is None:
+                return
+            for event in events:
+                dir_path = self.directories[event.dir_key]
+                layout = self.layouts[event.dir_key]
+                entries = self._index[event.dir_key]
+                if event.name is None:
+                    entries.clear()
+                    if os.path.isdir(dir_path):
+                        entries.update(self._scan_directory(event.dir_key))
+                    continue
+                if layout.reserved(event.name):
+                    continue
+                # Кэш хранит состояние файла, а не историю событий: при
+                # переносе в шард remove из корня не убирает файл
+                filepath = layout.locate(dir_path, event.name)
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    # Файла уже нет (удален следом за созданием)
+                    entries.pop(event.name, None)
+                    continue
+                if os.path.isfile(filepath):
+                    entries[event.name] = FileEntry(event.name, os.path.dirname(filepath),
+                                                    stat.st_size, stat.st_mtime)
+                else:
+                    entries.pop(event.name, None)
+    
+    @track_operation("list")
     def get_directory_info(self, dir_key: str) -> Dict:
         dir_path = self.directories.get(dir_key)
-        if not dir_path or not os.path.exists(dir_path):
+        if not dir_path or not self.backend.isdir(dir_path):
             return {"exists": False, "files": [], "size": 0, "count": 0}
         
-        files = []
-        total_size = 0
+        if self._index is not None:
+            self.refresh()
+            with self._index_lock:
+                files = list(self._index[dir_key].values())
+        else:
+            files = list(self._scan_directory(dir_key).values())
+        total_size = sum(file.size for file in files)
         
-        for filename in os.listdir(dir_path):
-            filepath = os.path.join(dir_path, filename)
-            if os.path.isfile(filepath):
-                stat = os.stat(filepath)
-                files.append({
-                    "name": filename,
-                    "path": filepath,
-                    "size": stat.st_size,
-                    "size_hr": self._human_readable_size(stat.st_size),
-                    "modified": datetime.datetime.fromtimestamp(stat.st_mtime)
-                })
-                total_size += stat.st_size
-        
-        files.sort(key=lambda x: x["modified"], reverse=True)
+        files.sort(key=lambda x: x.mtime, reverse=True)
         
         return {
             "exists": True,
@@ -65,83 +379,155 @@ class StorageManager:
             "size_hr": self._human_readable_size(total_size)
         }
     
+    @track_operation("delete")
     def delete_file(self, filepath: str) -> Tuple[bool, str]:
         try:
-            if os.path.exists(filepath):
+            if self.backend.stat(filepath) is not None:
                 filename = os.path.basename(filepath)
-                os.remove(filepath)
+                self.backend.delete(filepath)
                 return True, f"✅ Файл удален: {filename}"
             return False, "❌ Файл не найден"
         except Exception as e:
             return False, f"❌ Ошибка: {e}"
     
+    @track_operation("delete_all", status=message_status)
     def delete_all_in_directory(self, dir_key: str) -> Tuple[int, str]:
         dir_path = self.directories.get(dir_key)
-        if not dir_path or not os.path.exists(dir_path):
+        if not dir_path or not self.backend.isdir(dir_path):
             return 0, "❌ Директория не найдена"
         
-        count = 0
-        for filename in os.listdir(dir_path):
-            filepath = os.path.join(dir_path, filename)
-            if os.path.isfile(filepath):
-                try:
-                    os.remove(filepath)
-                    count += 1
-                except:
-                    pass
-        
+        paths = [entry.path for entry in self._iter_entries(dir_key)]
+        report = self.delete_files(paths, atomic=False)
+        count = len(report.succeeded)
+        if report.failed:
+            return count, f"❌ Удалено {count} файлов из {dir_key}, не удалось: {len(report.failed)}"
         return count, f"✅ Удалено {count} файлов из {dir_key}"
     
+    @track_operation("move")
     def move_file(self, filepath: str, target_dir_key: str) -> Tuple[bool, str]:
-        if not os.path.exists(filepath):
+        if self.backend.stat(filepath) is None:
             return False, "❌ Файл не найден"
         
-        target_dir = self.directories.get(target_dir_key)
-        if not target_dir:
+        if target_dir_key not in self.directories:
             return False, "❌ Целевая директория не найдена"
         
-        try:
-            filename = os.path.basename(filepath)
-            target_path = os.path.join(target_dir, filename)
-            
-            if os.path.exists(target_path):
-                name, ext = os.path.splitext(filename)
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                target_path = os.path.join(target_dir, f"{name}_{timestamp}{ext}")
-            
-            shutil.move(filepath, target_path)
-            return True, f"✅ Файл перемещен"
-        except Exception as e:
-            return False, f"❌ Ошибка: {e}"
+        result = self.move_files([filepath], target_dir_key).results[0]
+        return result.ok, "✅ Файл перемещен" if result.ok else result.message
     
+    @track_operation("copy")
     def copy_file(self, filepath: str, target_dir_key: str) -> Tuple[bool, str]:
-        if not os.path.exists(filepath):
+        if self.backend.stat(filepath) is None:
             return False, "❌ Файл не найден"
         
-        target_dir = self.directories.get(target_dir_key)
-        if not target_dir:
+        if target_dir_key not in self.directories:
             return False, "❌ Целевая директория не найдена"
         
-        try:
-            filename = os.path.basename(filepath)
-            target_path = os.path.join(target_dir, filename)
-            
-            if os.path.exists(target_path):
-                name, ext = os.path.splitext(filename)
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                target_path = os.path.join(target_dir, f"{name}_{timestamp}{ext}")
-            
-            shutil.copy2(filepath, target_path)
-            return True, f"✅ Файл скопирован"
-        except Exception as e:
-            return False, f"❌ Ошибка: {e}"
+        result = self.copy_files([filepath], target_dir_key).results[0]
+        return result.ok, "✅ Файл скопирован" if result.ok else result.message
     
+    # --- Пакетные операции ---------------------------------------------------
+    
+    def _transfer(self, op: str, paths: List[str], target_dir_key: str, atomic: bool) -> BatchReport:
+        if target_dir_key not in self.directories:
+            raise KeyError(f"Целевая директория не найдена: {target_dir_key}")
+        if self.journal is not None:
+            # Журнал не перезаписывает занятые имена (см. StorageJournal._place)
+            return self._execute(self._plan(op, paths, target_dir_key), atomic)
+        with self._names_lock:
+            return self._execute(self._plan(op, paths, target_dir_key), atomic)
+    
+    def _plan(self, op: str, paths: List[str], target_dir_key: str) -> List[Tuple[str, str, str]]:
+        reserved = set()
+        return [(op, path, self._target_path(target_dir_key, os.path.basename(path), reserved))
+                for path in paths]
+    
+    def _execute(self, operations: List[Tuple[str, str, Optional[str]]], atomic: bool) -> BatchReport:
+        if self.journal is not None:
+            return self.journal.execute(operations, atomic)
+        # Без журнала: атомарность только на этапе проверки исходников
+        results = [FileResult(op, path, target) for op, path, target in operations]
+        found = [self.backend.stat(result.path) is not None for result in results]
+        for result, exists in zip(results, found):
+            if not exists:
+                result.message = "❌ Ошибка: файл не найден"
+        if atomic and not all(found):
+            for result, exists in zip(results, found):
+                if exists:
+                    result.message = "⚠️ Отменено: ошибка в другом файле пакета"
+            return BatchReport(results)
+        actions = {MOVE: self.backend.move, COPY: self.backend.copy}
+        for result, exists in zip(results, found):
+            if not exists:
+                continue
+            try:
+                if result.op == DELETE:
+                    self.backend.delete(result.path)
+                else:
+                    actions[result.op](result.path, result.target)
+                result.ok = True
+                result.message = "✅ Выполнено"
+            except OSError as e:
+                result.message = f"❌ Ошибка: {e.strerror or e}"
+        return BatchReport(results)
+    
+    @track_operation("batch_move", status=batch_status)
+    def move_files(self, paths: List[str], target_dir_key: str, atomic: bool = True) -> BatchReport:
+        """
+        Перемещает файлы одним пакетом.
+        
+        Args:
+            paths: Пути файлов
+            target_dir_key: Ключ целевой директории
+            atomic: True - если какой-то файл не подготовлен (нет, нет
+                    прав), не перемещается ни один
+        
+        Returns:
+            BatchReport: Результат по каждому файлу (target - итоговый путь)
+        """
+        return self._transfer(MOVE, paths, target_dir_key, atomic)
+    
+    @track_operation("batch_copy", status=batch_status)
+    def copy_files(self, paths: List[str], target_dir_key: str, atomic: bool = True) -> BatchReport:
+        """Копирует файлы одним пакетом (см. move_files)."""
+        return self._transfer(COPY, paths, target_dir_key, atomic)
+    
+    @track_operation("batch_delete", status=batch_status)
+    def delete_files(self, paths: List[str], atomic: bool = True) -> BatchReport:
+        """Удаляет файлы одним пакетом (см. move_files)."""
+        return self._execute([(DELETE, path, None) for path in paths], atomic)
+    
+    def import_files(self, local_paths: List[str], dir_key: str) -> List[str]:
+        """
+        Копирует в хранилище файлы с локального диска (с учетом раскладки и бэкенда).
+        
+        Args:
+            local_paths: Пути локальных файлов
+            dir_key: Ключ целевой директории
+        
+        Returns:
+            List[str]: Пути файлов в хранилище
+        """
+        if self.journal is not None:
+            report = self.journal.execute(self._plan(COPY, local_paths, dir_key))
+            if report.failed:
+                raise OSError(report.failed[0].message)
+            return [result.target for result in report]
+        with self._names_lock:
+            reserved = set()
+            targets = []
+            for local_path in local_paths:
+                target = self._target_path(dir_key, os.path.basename(local_path), reserved)
+                self.backend.upload(local_path, target)
+                targets.append(target)
+        return targets
+    
+    @track_operation("archive")
     def create_archive(self, dir_key: str, archive_name: str = None) -> Tuple[bool, str]:
         dir_path = self.directories.get(dir_key)
-        if not dir_path or not os.path.exists(dir_path):
+        if not dir_path or not self.backend.isdir(dir_path):
             return False, "❌ Директория не найдена"
         
-        files = [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))]
+        files = [(entry.path, entry.name) for entry in self._iter_entries(dir_key)]
         if not files:
             return False, f"❌ Нет файлов для архивации"
         
@@ -149,53 +535,75 @@ class StorageManager:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             archive_name = f"{dir_key}_archive_{timestamp}.zip"
         
-        archive_path = os.path.join(self.directories["archive"], archive_name)
+        archive_path = self.backend.join(self.directories["archive"], archive_name)
         
         try:
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for filename in files:
-                    filepath = os.path.join(dir_path, filename)
-                    zipf.write(filepath, filename)
+            import zipfile
+            if self.backend.local:
+                with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                    for filepath, filename in files:
+                        zipf.write(filepath, filename)
+                return True, f"✅ Архив создан"
+            # Архив собирается во временном файле и загружается в бэкенд целиком
+            import tempfile
+            with tempfile.TemporaryDirectory() as tmp:
+                local_archive = os.path.join(tmp, archive_name)
+                with zipfile.ZipFile(local_archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                    for filepath, filename in files:
+                        zipf.writestr(filename, self.backend.read(filepath))
+                self.backend.upload(local_archive, archive_path)
             return True, f"✅ Архив создан"
         except Exception as e:
             return False, f"❌ Ошибка: {e}"
     
-    def search_files(self, query: str) -> List[Dict]:
+    @track_operation("search")
+    def search_files(self, query: str) -> List[FileEntry]:
         results = []
         for key, dir_path in self.directories.items():
-            if not os.path.exists(dir_path):
+            if not self.backend.isdir(dir_path):
                 continue
-            
-            for filename in os.listdir(dir_path):
-                if query.lower() in filename.lower():
-                    filepath = os.path.join(dir_path, filename)
-                    if os.path.isfile(filepath):
-                        stat = os.stat(filepath)
-                        results.append({
-                            "name": filename,
-                            "path": filepath,
-                            "directory": key,
-                            "size": stat.st_size,
-                            "size_hr": self._human_readable_size(stat.st_size),
-                            "modified": datetime.datetime.fromtimestamp(stat.st_mtime)
-                        })
+            results.extend(self._iter_entries(key, directory=key, query=query.lower()))
         return results
     
+    @track_operation("summary")
     def get_storage_summary(self) -> Dict:
+        if self._index is not None:
+            # Из кэша: без обращений к диску и без сортировки списков
+            self.refresh()
+            summary = {}
+            with self._index_lock:
+                for dir_key, entries in self._index.items():
+                    size = sum(file.size for file in entries.values())
+                    summary[dir_key] = {
+                        "path": self.directories[dir_key],
+                        "count": len(entries),
+                        "size": size,
+                        "size_hr": self._human_readable_size(size)
+                    }
+            total_size = sum(data["size"] for data in summary.values())
+            summary["total"] = {
+                "count": sum(data["count"] for data in summary.values()),
+                "size": total_size,
+                "size_hr": self._human_readable_size(total_size)
+            }
+            return summary
+        
         summary = {}
         total_size = 0
         total_files = 0
         
-        for dir_key in self.directories.keys():
-            info = self.get_directory_info(dir_key)
+        for dir_key, dir_path in self.directories.items():
+            # Для сводки нужны только число и размер: без записей и сортировки
+            exists = self.backend.isdir(dir_path)
+            count, size = self._directory_totals(dir_key) if exists else (0, 0)
             summary[dir_key] = {
-                "path": info.get("path", ""),
-                "count": info.get("count", 0),
-                "size": info.get("size", 0),
-                "size_hr": info.get("size_hr", "0 B")
+                "path": dir_path if exists else "",
+                "count": count,
+                "size": size,
+                "size_hr": self._human_readable_size(size)
             }
-            total_files += info.get("count", 0)
-            total_size += info.get("size", 0)
+            total_files += count
+            total_size += size
         
         summary["total"] = {
             "count": total_files,
@@ -203,4 +611,23 @@ class StorageManager:
             "size_hr": self._human_readable_size(total_size)
         }
         
-        return summary
\ No newline at end of file
+        return summary
+    
+    @track_operation("analytics")
+    def get_storage_analytics(self, top_n: int = 10):
+        """
+        Гистограммы размеров и возраста, итоги по расширениям и топы файлов
+        за один проход по всем директориям (память не зависит от числа файлов).
+        
+        Args:
+            top_n: Сколько самых больших и самых старых файлов показать
+        
+        Returns:
+            StorageAnalytics: Отчет (summary_lines, to_dict, save)
+        """
+        from src.utils.storage_analytics import StorageAnalytics
+        analytics = StorageAnalytics(top_n)
+        for dir_key, dir_path in self.directories.items():
+            if self.backend.isdir(dir_path):
+                analytics.scan(dir_key, self.backend.list(dir_path, self.layouts[dir_key]))
+        return analytics
\ No newline at end of file
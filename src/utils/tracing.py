@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Трассировка фаз сценария: вложенные именованные интервалы (spans) с
+временем по часам, процессорным временем и выделенной памятью.
+По запросу для фазы включаются cProfile и tracemalloc.
+
+Результат сохраняется в формате Chrome trace events (chrome://tracing,
+Perfetto, speedscope) и в виде свернутых стеков для flamegraph.pl.
+
+Переменные окружения:
+    TQDM_DEMO_TRACE_DIR    Каталог для файлов трассировки (не задан - не сохранять)
+    TQDM_DEMO_PROFILE      1 - cProfile для каждой фазы верхнего уровня
+    TQDM_DEMO_TRACEMALLOC  1 - учет памяти и мест выделения через tracemalloc
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional
+
+TOP_ALLOCATIONS = 5
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", text, flags=re.UNICODE).strip("_") or "span"
+
+
+class Span:
+    """
+    Один интервал трассировки. Длительности - в секундах, память - в байтах.
+    """
+
+    __slots__ = ("name", "parent", "depth", "thread_id", "start", "end",
+                 "cpu_start", "cpu", "children", "alloc", "peak",
+                 "top_allocations", "profile", "_mem_start", "_peak_seen",
+                 "_snapshot", "_profiler")
+
+    def __init__(self, name: str, parent: Optional["Span"]):
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.cpu_start = time.process_time()
+        self.cpu = 0.0
+        self.children: List["Span"] = []
+        self.alloc: Optional[int] = None
+        self.peak: Optional[int] = None
+        self.top_allocations: List[Dict[str, Any]] = []
+        self.profile: Optional[pstats.Stats] = None
+        self._mem_start = 0
+        self._peak_seen = 0
+        self._snapshot = None
+        self._profiler: Optional[cProfile.Profile] = None
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    @property
+    def self_time(self) -> float:
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+    @property
+    def path(self) -> List[str]:
+        names = []
+        span: Optional[Span] = self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return names[::-1]
+
+    def walk(self) -> Iterator["Span"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "name": self.name,
+            "wall_ms": self.duration * 1000,
+            "cpu_ms": self.cpu * 1000,
+        }
+        if self.alloc is not None:
+            result["alloc_kb"] = self.alloc / 1024
+            result["peak_kb"] = self.peak / 1024
+        if self.children:
+            result["children"] = [child.to_dict() for child in self.children]
+        return result
+
+
+class _SpanContext:
+    def __init__(self, tracer: "Tracer", name: str, profile: bool, memory: bool):
+        self._tracer = tracer
+        self._name = name
+        self._profile = profile
+        self._memory = memory
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> Span:
+        self.span = self._tracer._open(self._name, self._profile, self._memory)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._tracer._close(self.span)
+
+
+class Tracer:
+    """
+    Сборщик интервалов. Стек открытых интервалов свой у каждого потока.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False,
+                 output_dir: Optional[str] = None):
+        """
+        Инициализация.
+
+        Args:
+            profile: cProfile для фаз верхнего уровня (под корневым интервалом)
+            trace_memory: Учет памяти фаз через tracemalloc
+            output_dir: Каталог, куда save() пишет файлы трассировки
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.output_dir = output_dir
+        self.origin = time.perf_counter()
+        self.roots: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(profile=_env_flag("TQDM_DEMO_PROFILE"),
+                   trace_memory=_env_flag("TQDM_DEMO_TRACEMALLOC"),
+                   output_dir=os.environ.get("TQDM_DEMO_TRACE_DIR") or None)
+
+    def reset(self):
+        """Забывает собранные интервалы (перед новым запуском сценария)."""
+        self.origin = time.perf_counter()
+        self.roots = []
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, profile: Optional[bool] = None,
+             memory: Optional[bool] = None) -> _SpanContext:
+        """
+        Контекстный менеджер фазы.
+
+        Args:
+            name: Имя фазы
+            profile: Включить cProfile (None - по настройке трассировщика,
+                     только для фаз верхнего уровня)
+            memory: Учитывать память (None - по настройке трассировщика)
+        """
+        if profile is None:
+            profile = self.profile and len(self._stack()) == 1
+        if memory is None:
+            memory = self.trace_memory
+        return _SpanContext(self, name, profile, memory)
+
+    def _open(self, name: str, profile: bool, memory: bool) -> Span:
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = Span(name, parent)
+        if parent is not None:
+            parent.children.append(span)
+        else:
+            with self._lock:
+                self.roots.append(span)
+        stack.append(span)
+
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent._peak_seen = max(parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            span._mem_start = current
+            span._snapshot = tracemalloc.take_snapshot()
+
+        # Одновременно может работать только один профилировщик
+        if profile and not self._profiling:
+            self._profiling = True
+            span._profiler = cProfile.Profile()
+            span._profiler.enable()
+
+        span.cpu_start = time.process_time()
+        span.start = time.perf_counter()
+        return span
+
+    def _close(self, span: Span):
+        span.end = time.perf_counter()
+        span.cpu = time.process_time() - span.cpu_start
+
+        if span._profiler is not None:
+            span._profiler.disable()
+            span.profile = pstats.Stats(span._profiler)
+            span._profiler = None
+            self._profiling = False
+
+        if span._snapshot is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            span.alloc = current - span._mem_start
+            span.peak = max(peak, span._peak_seen) - span._mem_start
+            diff = _own_filtered(tracemalloc.take_snapshot()).compare_to(
+                _own_filtered(span._snapshot), "lineno")
+            span.top_allocations = [
+                {"where": str(stat.traceback), "size_kb": stat.size_diff / 1024,
+                 "count": stat.count_diff}
+                for stat in diff[:TOP_ALLOCATIONS] if stat.size_diff > 0
+            ]
+            span._snapshot = None
+            if span.parent is not None:
+                span.parent._peak_seen = max(span.parent._peak_seen, peak)
+
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        if not stack and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def spans(self) -> Iterator[Span]:
+        for root in self.roots:
+            yield from root.walk()
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Интервалы в формате Chrome trace events (события "X", время в мкс)."""
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            args: Dict[str, Any] = {"cpu_ms": round(span.cpu * 1000, 3)}
+            if span.alloc is not None:
+                args["alloc_kb"] = round(span.alloc / 1024, 1)
+                args["peak_kb"] = round(span.peak / 1024, 1)
+            if span.top_allocations:
+                args["top_allocations"] = span.top_allocations
+            events.append({
+                "name": span.name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def collapsed_stacks(self) -> List[str]:
+        """
+        Свернутые стеки "корень;фаза;подфаза N", где N - собственное время в мкс.
+        Фазы с cProfile дополняются стеками функций (по вызывающим функциям).
+        """
+        totals: Dict[str, int] = {}
+        for span in self.spans():
+            prefix = ";".join(name.replace(";", ",") for name in span.path)
+            if span.profile is not None:
+                for stack, micros in _profile_stacks(span.profile):
+                    key = f"{prefix};{stack}"
+                    totals[key] = totals.get(key, 0) + micros
+                continue
+            micros = int(span.self_time * 1e6)
+            if micros > 0:
+                totals[prefix] = totals.get(prefix, 0) + micros
+        return [f"{stack} {value}" for stack, value in totals.items()]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [root.to_dict() for root in self.roots]
+
+    def save(self, name: str, output_dir: Optional[str] = None) -> Dict[str, str]:
+        """
+        Записывает трассировку: .trace.json, .folded и .pstats для профилированных фаз.
+
+        Returns:
+            Dict[str, str]: Пути к созданным файлам
+        """
+        output_dir = output_dir or self.output_dir
+        if not output_dir:
+            return {}
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"{_slug(name)}_{time.strftime('%Y%m%d_%H%M%S')}")
+        paths = {"chrome": f"{base}.trace.json", "folded": f"{base}.folded"}
+
+        with open(paths["chrome"], "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        with open(paths["folded"], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+
+        for index, span in enumerate(self.spans()):
+            if span.profile is not None:
+                path = f"{base}.{index}_{_slug(span.name)}.pstats"
+                span.profile.dump_stats(path)
+                paths[f"pstats:{span.name}"] = path
+        return paths
+
+
+def _own_filtered(snapshot: "tracemalloc.Snapshot") -> "tracemalloc.Snapshot":
+    """Убирает из снимка выделения самих трассировщика и профилировщика."""
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, module.__file__)
+        for module in (tracemalloc, cProfile, pstats)
+    ] + [tracemalloc.Filter(False, __file__)])
+
+
+def _function_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _profile_stacks(stats: pstats.Stats, max_depth: int = 64, min_share: float = 0.001):
+    """
+    Восстанавливает стеки из статистики cProfile. cProfile хранит только
+    пары вызывающий-вызываемый, поэтому собственное время функции делится
+    между путями пропорционально числу вызовов.
+
+    На ромбовидных графах вызовов число путей растет экспоненциально,
+    поэтому ветвь, на которую приходится меньше min_share общего времени,
+    не раскрывается: все ее время записывается на ее верхнюю функцию.
+    Доли путей одной глубины в сумме не больше общего времени, так что
+    на каждой глубине раскрывается не больше 1 / min_share путей.
+    """
+    raw = stats.stats
+    callees: Dict[Any, List[Any]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            roots.append(func)
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    min_time = sum(raw[root][3] for root in roots) * min_share
+
+    def visit(func, path, share, seen):
+        cc, nc, tottime, cumtime, callers = raw[func]
+        label = path + [_function_label(func)]
+        micros = int(tottime * share * 1e6)
+        if micros > 0:
+            yield ";".join(label), micros
+        if len(label) >= max_depth:
+            return
+        for child in callees.get(func, ()):
+            if child in seen:
+                continue
+            child_calls = raw[child][1] or 1
+            from_here = raw[child][4].get(func, (0, 0, 0, 0))[1]
+            child_share = share * from_here / child_calls
+            child_time = raw[child][3] * child_share
+            if child_time < min_time:
+                micros = int(child_time * 1e6)
+                if micros > 0:
+                    yield ";".join(label + [_function_label(child)]), micros
+                continue
+            yield from visit(child, label, child_share, seen | {child})
+
+    for root in roots:
+        yield from visit(root, [], 1.0, {root})
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Тесты виртуальных часов: сны задач asyncio перекрываются, а время
+сдвигается, только когда все учтенные задачи спят или ждут.
+
+Запуск: python -m unittest tests.test_clock
+"""
+
+import asyncio
+import unittest
+
+from src.utils.clock import VirtualClock
+
+
+class VirtualClockAsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = VirtualClock()
+
+    def test_concurrent_sleeps_overlap(self):
+        async def worker(seconds: float):
+            for _ in range(3):
+                await self.clock.async_sleep(seconds)
+
+        async def main():
+            await asyncio.gather(*(worker(1.0 + i) for i in range(4)))
+
+        asyncio.run(main())
+        self.assertAlmostEqual(self.clock.perf(), 12.0)
+
+    def test_time_waits_for_runnable_task(self):
+        wakeups = []
+
+        async def sleeper():
+            await self.clock.async_sleep(1.0)
+            wakeups.append(self.clock.perf())
+
+        async def busy():
+            await self.clock.async_sleep(0.5)
+            # Несколько проходов цикла без снов: часы не должны уйти вперед
+            for _ in range(10):
+                await asyncio.sleep(0)
+            wakeups.append(self.clock.perf())
+
+        async def main():
+            await asyncio.gather(sleeper(), busy())
+
+        asyncio.run(main())
+        self.assertEqual(wakeups, [0.5, 1.0])
+
+    def test_queue_pipeline(self):
+        async def main():
+            queue = asyncio.Queue(maxsize=2)
+
+            async def produce():
+                for i in range(20):
+                    await self.clock.async_sleep(0.1)
+                    await self.clock.blocked(queue.put(i))
+                for _ in range(2):
+                    await self.clock.blocked(queue.put(None))
+
+            async def consume():
+                while await self.clock.blocked(queue.get()) is not None:
+                    await self.clock.async_sleep(0.3)
+
+            await asyncio.gather(produce(), consume(), consume())
+
+        asyncio.run(main())
+        # Потребители - узкое место: 10 элементов по 0.3 с после первого
+        self.assertAlmostEqual(self.clock.perf(), 3.3)
+
+    def test_new_event_loop_starts_clean(self):
+        async def main():
+            await self.clock.async_sleep(1.0)
+
+        asyncio.run(main())
+        asyncio.run(main())
+        self.assertAlmostEqual(self.clock.perf(), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
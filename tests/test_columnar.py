@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Тесты колоночного хранилища результатов: строки возвращаются такими же,
+какими были добавлены, в том числе после роста емкости, выгрузки на
+диск и без NumPy.
+
+Запуск: python -m unittest tests.test_columnar
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils import columnar
+from src.utils.columnar import ColumnarResults
+
+
+def make_row(value: int) -> dict:
+    return {"value": value, "sqrt": math.sqrt(value), "log": math.log(value),
+            "sin": math.sin(value), "cos": math.cos(value)}
+
+
+class ColumnarResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [make_row(value) for value in range(1, 301)]
+
+    def check_round_trip(self, results: ColumnarResults):
+        results.extend({name: [row[name] for row in self.rows[100:]]
+                        for name, _ in ColumnarResults.COLUMNS})
+        self.assertEqual(len(results), len(self.rows))
+        self.assertEqual(list(results), self.rows)
+        self.assertEqual(results.row(150), self.rows[150])
+        with self.assertRaises(IndexError):
+            results.row(len(self.rows))
+        summary = results.summary()
+        self.assertEqual(summary["value"]["sum"], sum(range(1, 301)))
+        self.assertEqual(summary["sqrt"]["max"], math.sqrt(300))
+
+    def test_round_trip_with_growth(self):
+        results = ColumnarResults(initial_capacity=4)
+        for row in self.rows[:100]:
+            results.append(row)
+        self.check_round_trip(results)
+
+    @unittest.skipIf(columnar.np is None, "нужен NumPy")
+    def test_round_trip_after_spill(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        with ColumnarResults(initial_capacity=4, memory_budget=1024,
+                             spill_dir=directory) as results:
+            for row in self.rows[:100]:
+                results.append(row)
+            self.assertTrue(results.spilled)
+            self.check_round_trip(results)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_round_trip_without_numpy(self):
+        with mock.patch.object(columnar, "np", None):
+            results = ColumnarResults()
+            for row in self.rows[:100]:
+                results.append(row)
+            self.check_round_trip(results)
+
+    def test_empty_summary(self):
+        self.assertEqual(ColumnarResults().summary()["value"],
+                         {"min": 0.0, "max": 0.0, "sum": 0.0, "mean": 0.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Тесты записей о файлах хранилища: FileEntry без __dict__, производные
+поля вычисляются при обращении, листинг и поиск отдают FileEntry.
+
+Запуск: python -m unittest tests.test_file_entry
+"""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.storage_backends import LocalBackend
+from src.utils.storage_manager import FileEntry, StorageManager
+
+
+class FileEntryTest(unittest.TestCase):
+
+    def test_slots_without_dict(self):
+        entry = FileEntry("a.txt", "storage/temp", 2048, 1_700_000_000.0)
+        self.assertFalse(hasattr(entry, "__dict__"))
+        with self.assertRaises(AttributeError):
+            entry.extra = 1
+
+    def test_derived_fields(self):
+        entry = FileEntry("a.txt", os.path.join("storage", "temp"), 1536, 1_700_000_000.0, "temp")
+        self.assertEqual(entry.path, os.path.join("storage", "temp", "a.txt"))
+        self.assertEqual(entry.size_hr, "1.5 KB")
+        self.assertEqual(entry.modified, datetime.datetime.fromtimestamp(1_700_000_000.0))
+        self.assertEqual(entry.directory, "temp")
+
+
+class StorageListingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manager = StorageManager(self.root, layout="flat", durable=False,
+                                      backend=LocalBackend())
+        temp = self.manager.directories["temp"]
+        for i, name in enumerate(("old.txt", "report.txt", "new.log")):
+            path = os.path.join(temp, name)
+            with open(path, "w") as f:
+                f.write("x" * (i + 1))
+            os.utime(path, (1_000_000 + i, 1_000_000 + i))
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_listing_newest_first(self):
+        info = self.manager.get_directory_info("temp")
+        self.assertTrue(all(isinstance(entry, FileEntry) for entry in info["files"]))
+        self.assertEqual([entry.name for entry in info["files"]],
+                         ["new.log", "report.txt", "old.txt"])
+        self.assertEqual([entry.size for entry in info["files"]], [3, 2, 1])
+        self.assertEqual((info["count"], info["size"]), (3, 6))
+
+    def test_search_sets_directory(self):
+        results = self.manager.search_files("TXT")
+        self.assertEqual(sorted(entry.name for entry in results), ["old.txt", "report.txt"])
+        self.assertEqual({entry.directory for entry in results}, {"temp"})
+
+
+if __name__ == "__main__":
+    unittest.main()
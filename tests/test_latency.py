@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Тесты гистограммы задержек: перцентили против точного расчета
+statistics.quantiles в пределах погрешности корзин.
+
+Запуск: python -m unittest tests.test_latency
+"""
+
+import random
+import statistics
+import unittest
+
+from src.utils.latency import HALF_BUCKETS, LatencyHistogram
+
+# Ширина корзины - не больше 1/HALF_BUCKETS значения, плюс разрешение 1 мкс
+RELATIVE_ERROR = 1.0 / HALF_BUCKETS
+RESOLUTION = 1e-6
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.values = [generator.lognormvariate(-4.0, 1.0) for _ in range(20000)]
+
+    def assertWithinBound(self, estimate: float, exact: float):
+        self.assertLessEqual(abs(estimate - exact), exact * RELATIVE_ERROR + RESOLUTION,
+                             f"{estimate} против {exact}")
+
+    def test_percentiles_match_exact_quantiles(self):
+        histogram = LatencyHistogram()
+        histogram.record_many(self.values)
+        exact = statistics.quantiles(self.values, n=100, method="inclusive")
+
+        percentiles = histogram.percentiles((50.0, 99.0))
+
+        self.assertWithinBound(percentiles["p50"], exact[49])
+        self.assertWithinBound(percentiles["p99"], exact[98])
+        self.assertEqual(len(histogram), len(self.values))
+        self.assertAlmostEqual(histogram.mean, statistics.fmean(self.values))
+
+    def test_merge_equals_single_histogram(self):
+        whole = LatencyHistogram()
+        whole.record_many(self.values)
+        parts = [LatencyHistogram() for _ in range(4)]
+        for index, value in enumerate(self.values):
+            parts[index % 4].record(value)
+        merged = LatencyHistogram()
+        for part in parts:
+            merged.merge(part)
+
+        self.assertEqual(merged.percentiles(), whole.percentiles())
+        self.assertEqual((merged.min, merged.max), (min(self.values), max(self.values)))
+
+    def test_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().percentiles((50.0, 99.0)), {"p50": 0.0, "p99": 0.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
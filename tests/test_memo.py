@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Тесты кэша мемоизации: порядок вытеснения LRU и дисковый уровень.
+
+Запуск: python -m unittest tests.test_memo
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.memo import MemoCache
+
+
+class MemoCacheTest(unittest.TestCase):
+
+    def test_least_recently_used_is_evicted(self):
+        cache = MemoCache(maxsize=3)
+        for key in "abc":
+            cache.put(key, key.upper())
+        cache.get("a")
+        cache.put("d", "D")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([cache.get(key) for key in "acd"], ["A", "C", "D"])
+        self.assertEqual(cache.evictions, 1)
+
+        # Порядок после обращений: a, c, d - первым уходит a
+        cache.put("e", "E")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 3)
+
+    def test_put_existing_key_refreshes_it(self):
+        cache = MemoCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("a", 3)
+        cache.put("c", 4)
+
+        self.assertEqual(cache.get("a"), 3)
+        self.assertIsNone(cache.get("b"))
+
+    def test_get_or_compute_counts_hits_and_misses(self):
+        cache = MemoCache(maxsize=10)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "value"
+
+        for _ in range(3):
+            cache.get_or_compute(1, compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_disk_level_survives_reopen(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        path = os.path.join(directory, "memo.db")
+        with MemoCache(maxsize=1, persist_path=path) as cache:
+            cache.put(1, {"x": 1.5})
+            cache.put(2, {"x": 2.5})
+
+        with MemoCache(maxsize=1, persist_path=path) as cache:
+            self.assertEqual(cache.get(1), {"x": 1.5})
+            self.assertEqual(cache.disk_hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Тесты истории запусков: агрегаты по Уэлфорду, миграция старой схемы
+и сохранение очереди при ошибке записи.
+
+Запуск: python -m unittest tests.test_run_history
+"""
+
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import unittest
+
+from src.utils.run_history import RunHistory
+
+
+class RunHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "history.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def history(self) -> RunHistory:
+        history = RunHistory(self.path, batch_size=100)
+        self.addCleanup(history.close)
+        return history
+
+    def test_aggregate_of_large_values(self):
+        values = [1e9 + 1, 1e9 + 2, 1e9 + 3, 1e9 + 6]
+        history = self.history()
+        for value in values:
+            history.record("s", {"value": value}, duration=1.0)
+
+        aggregate = history.aggregate("s", "value")
+
+        self.assertEqual(aggregate["count"], 4)
+        self.assertAlmostEqual(aggregate["mean"], statistics.fmean(values))
+        self.assertAlmostEqual(aggregate["stdev"], statistics.pstdev(values), places=6)
+        self.assertEqual((aggregate["min"], aggregate["max"], aggregate["last"]),
+                         (values[0], values[-1], values[-1]))
+
+    def test_failed_flush_keeps_queue(self):
+        history = self.history()
+        history.record("s", {"a": 1}, duration=1.0)
+        history.flush()
+        conn = history._connect()
+        conn.execute("CREATE TRIGGER fail BEFORE INSERT ON points "
+                     "BEGIN SELECT RAISE(ABORT, 'сбой'); END")
+        history.record("s", {"a": 2}, duration=1.0)
+        history.record("s", {"a": 3}, duration=1.0)
+
+        with self.assertRaises(sqlite3.DatabaseError):
+            history.flush()
+        conn.execute("DROP TRIGGER fail")
+
+        self.assertEqual(history.flush(), 2)
+        self.assertEqual(history.count_since(0), {"s": 3})
+        self.assertEqual(history.aggregate("s", "a")["count"], 3)
+
+    def test_old_aggregates_are_migrated(self):
+        values = [2.0, 4.0, 9.0]
+        with sqlite3.connect(self.path) as conn:
+            conn.executescript("""
+                CREATE TABLE points (run_id INTEGER NOT NULL, scenario TEXT NOT NULL,
+                    metric TEXT NOT NULL, value REAL NOT NULL,
+                    PRIMARY KEY (scenario, metric, run_id)) WITHOUT ROWID;
+                CREATE TABLE aggregates (scenario TEXT NOT NULL, metric TEXT NOT NULL,
+                    runs INTEGER NOT NULL, total REAL NOT NULL, total_sq REAL NOT NULL,
+                    min REAL NOT NULL, max REAL NOT NULL, last REAL NOT NULL,
+                    ewma REAL NOT NULL, PRIMARY KEY (scenario, metric)) WITHOUT ROWID;
+            """)
+            conn.executemany("INSERT INTO points VALUES (?, 's', 'v', ?)", enumerate(values, start=100))
+            conn.execute("INSERT INTO aggregates VALUES ('s', 'v', 3, 15, 101, 2, 9, 9, 5)")
+        conn.close()
+
+        history = self.history()
+        history.record("s", {"v": 5.0}, duration=1.0)
+        aggregate = history.aggregate("s", "v")
+
+        values.append(5.0)
+        self.assertEqual(aggregate["count"], 4)
+        self.assertAlmostEqual(aggregate["mean"], statistics.fmean(values))
+        self.assertAlmostEqual(aggregate["stdev"], statistics.pstdev(values))
+
+
+if __name__ == "__main__":
+    unittest.main()
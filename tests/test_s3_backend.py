@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Тесты бэкенда S3 на локальной заглушке S3StandIn.
+
+Запуск: python -m unittest tests.test_s3_backend (или python -m pytest tests)
+"""
+
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.utils.s3_backend import MIN_PART_SIZE, S3Backend
+from src.utils.s3_server import S3StandIn
+from src.utils.storage_manager import StorageManager
+
+
+class S3BackendTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = S3StandIn().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.backend = self.create_backend(prefix=f"{self.id()}/")
+
+    def tearDown(self):
+        self.backend.close()
+
+    def create_backend(self, **kwargs) -> S3Backend:
+        server = self.server
+        return S3Backend(server.endpoint, "test", server.access_key, server.secret_key,
+                         server.region, **kwargs)
+
+    def test_write_read_stat(self):
+        self.backend.write("storage/temp/a.txt", b"hello")
+        self.assertEqual(self.backend.read("storage/temp/a.txt"), b"hello")
+        size, mtime = self.backend.stat("storage/temp/a.txt")
+        self.assertEqual(size, 5)
+        self.assertGreater(mtime, 0)
+
+    def test_missing_file(self):
+        self.assertIsNone(self.backend.stat("storage/temp/none.txt"))
+        with self.assertRaises(FileNotFoundError):
+            self.backend.read("storage/temp/none.txt")
+        with self.assertRaises(FileNotFoundError):
+            self.backend.copy("storage/temp/none.txt", "storage/processed/none.txt")
+
+    def test_empty_file(self):
+        self.backend.write("storage/temp/empty", b"")
+        self.assertEqual(self.backend.read("storage/temp/empty"), b"")
+        self.assertEqual(self.backend.stat("storage/temp/empty")[0], 0)
+
+    def test_list_directory_only(self):
+        for name in ("a.txt", "b.log"):
+            self.backend.write(f"storage/temp/{name}", name.encode())
+        self.backend.write("storage/tempo/c.txt", b"c")
+        self.backend.write("storage/temp/sub/d.txt", b"d")
+        records = sorted(self.backend.list("storage/temp"))
+        self.assertEqual([(name, parent, size) for name, parent, size, _ in records],
+                         [("a.txt", "storage/temp", 5), ("b.log", "storage/temp", 5)])
+
+    def test_list_paginates(self):
+        for i in range(1005):
+            self.backend.write(f"storage/many/{i:04d}", b"")
+        self.assertEqual(len(list(self.backend.list("storage/many"))), 1005)
+
+    def test_copy_move_delete(self):
+        self.backend.write("storage/temp/a.txt", b"data")
+        self.backend.copy("storage/temp/a.txt", "storage/processed/a.txt")
+        self.backend.move("storage/temp/a.txt", "storage/archive/a.txt")
+        self.assertIsNone(self.backend.stat("storage/temp/a.txt"))
+        self.assertEqual(self.backend.read("storage/processed/a.txt"), b"data")
+        self.assertEqual(self.backend.read("storage/archive/a.txt"), b"data")
+        self.backend.delete("storage/archive/a.txt")
+        self.assertIsNone(self.backend.stat("storage/archive/a.txt"))
+        with self.assertRaises(FileNotFoundError):
+            self.backend.delete("storage/archive/a.txt")
+
+    def failing_connection(self, on_send: bool):
+        """Соединение, оборванное до отправки запроса или при чтении ответа."""
+        connection = mock.Mock()
+        if on_send:
+            connection.request.side_effect = ConnectionResetError()
+        else:
+            connection.getresponse.side_effect = http.client.RemoteDisconnected()
+        return connection
+
+    def test_retry_of_unsent_request(self):
+        before = self.server.requests.get("create_multipart", 0)
+        fresh = self.backend._connection()
+        with mock.patch.object(self.backend, "_connection",
+                               side_effect=[self.failing_connection(on_send=True), fresh]):
+            self.backend._request("POST", "k", {"uploads": ""})
+        self.assertEqual(self.server.requests.get("create_multipart", 0) - before, 1)
+
+    def test_sent_post_is_not_retried(self):
+        connections = [self.failing_connection(on_send=False), self.backend._connection()]
+        with mock.patch.object(self.backend, "_connection", side_effect=connections):
+            with self.assertRaises(http.client.RemoteDisconnected):
+                self.backend._request("POST", "k", {"uploads": ""})
+
+    def test_sent_get_is_retried(self):
+        self.backend.write("storage/temp/a.txt", b"data")
+        connections = [self.failing_connection(on_send=False), self.backend._connection()]
+        with mock.patch.object(self.backend, "_connection", side_effect=connections):
+            self.assertEqual(self.backend.read("storage/temp/a.txt"), b"data")
+
+    def test_multipart_upload_and_ranged_download(self):
+        backend = self.create_backend(prefix=f"{self.id()}/", part_size=MIN_PART_SIZE,
+                                      multipart_threshold=MIN_PART_SIZE, max_workers=4)
+        data = os.urandom(2 * MIN_PART_SIZE + 12345)
+        before = dict(self.server.requests)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source.bin")
+            with open(source, "wb") as f:
+                f.write(data)
+            backend.upload(source, "storage/downloads/big.bin")
+            target = os.path.join(tmp, "target.bin")
+            backend.download("storage/downloads/big.bin", target)
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), data)
+        self.assertEqual(backend.read("storage/downloads/big.bin"), data)
+        self.assertEqual(backend.stat("storage/downloads/big.bin")[0], len(data))
+        requests = self.server.requests
+        self.assertEqual(requests.get("upload_part", 0) - before.get("upload_part", 0), 3)
+        # Диапазоны: первый запрос и еще по одному на каждую часть, дважды
+        self.assertGreaterEqual(requests.get("get", 0) - before.get("get", 0), 6)
+        backend.close()
+
+    def test_wrong_secret_rejected(self):
+        server = self.server
+        backend = S3Backend(server.endpoint, "test", server.access_key, "wrong", server.region)
+        try:
+            with self.assertRaises(OSError):
+                backend.write("storage/temp/denied.txt", b"x")
+        finally:
+            backend.close()
+        self.assertIsNone(self.backend.stat("storage/temp/denied.txt"))
+
+
+class S3StorageManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = S3StandIn().start()
+        backend = S3Backend(self.server.endpoint, "test", self.server.access_key,
+                            self.server.secret_key, self.server.region)
+        self.manager = StorageManager("storage", backend=backend)
+
+    def tearDown(self):
+        self.manager.close()
+        self.server.stop()
+
+    def write(self, dir_key: str, name: str, data: bytes = b"data") -> str:
+        path = self.manager.backend.join(self.manager.directories[dir_key], name)
+        self.manager.backend.write(path, data)
+        return path
+
+    def names(self, dir_key: str):
+        return sorted(entry.name for entry in self.manager.get_directory_info(dir_key)["files"])
+
+    def test_batch_operations(self):
+        paths = [self.write("temp", f"file_{i}.txt") for i in range(3)]
+        self.write("processed", "file_0.txt")
+        report = self.manager.copy_files(paths, "processed")
+        self.assertFalse(report.failed)
+        self.assertEqual(len(self.names("processed")), 4)
+        self.assertEqual(len({result.target for result in report}), 3)
+
+        report = self.manager.move_files(paths, "archive")
+        self.assertFalse(report.failed)
+        self.assertEqual(self.names("temp"), [])
+        self.assertEqual(self.names("archive"), ["file_0.txt", "file_1.txt", "file_2.txt"])
+
+        report = self.manager.move_files(paths[:1], "archive")
+        self.assertEqual(len(report.failed), 1)
+
+        count, message = self.manager.delete_all_in_directory("archive")
+        self.assertEqual(count, 3, message)
+        self.assertEqual(self.names("archive"), [])
+
+    def test_search_and_summary(self):
+        self.write("temp", "report.txt", b"12345")
+        self.write("processed", "other_report.log", b"123")
+        self.assertEqual(sorted(entry.name for entry in self.manager.search_files("report")),
+                         ["other_report.log", "report.txt"])
+        total = self.manager.get_storage_summary()["total"]
+        self.assertEqual((total["count"], total["size"]), (2, 8))
+
+    def test_concurrent_same_name_copies_keep_every_file(self):
+        backend = self.manager.backend
+        sources = [backend.join("incoming", str(i), "same.txt") for i in range(4)]
+        for i, source in enumerate(sources):
+            backend.write(source, str(i).encode())
+        barrier = threading.Barrier(len(sources))
+        reports = [None] * len(sources)
+
+        def copy(index: int):
+            barrier.wait()
+            reports[index] = self.manager.copy_files([sources[index]], "processed")
+
+        threads = [threading.Thread(target=copy, args=(i,)) for i in range(len(sources))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(report.results[0].ok for report in reports))
+        contents = sorted(backend.read(entry.path)
+                          for entry in self.manager.get_directory_info("processed")["files"])
+        self.assertEqual(contents, [b"0", b"1", b"2", b"3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
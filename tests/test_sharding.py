@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Тесты раскладки директорий: маркер .layout, поиск файлов и миграция
+плоской директории в шарды.
+
+Запуск: python -m unittest tests.test_sharding
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.sharding import (MARKER, FlatLayout, ShardMigration, ShardedLayout,
+                                layout_from_name, read_layout, write_layout)
+
+
+class ShardingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.layout = ShardedLayout(depth=2, width=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write(self, path: str, data: str = "data") -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+        return path
+
+    def read(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def names(self, layout) -> list:
+        return sorted(entry.name for entry in layout.iter_files(self.dir))
+
+
+class LayoutTest(ShardingTestCase):
+
+    def test_no_marker_means_unknown_layout(self):
+        self.assertIsNone(read_layout(self.dir))
+
+    def test_marker_round_trip(self):
+        write_layout(self.dir, ShardedLayout(depth=3, width=1))
+        layout = read_layout(self.dir)
+        self.assertTrue(layout.sharded)
+        self.assertEqual(layout.to_dict(), {"layout": "sharded", "depth": 3, "width": 1})
+
+        write_layout(self.dir, FlatLayout())
+        self.assertFalse(os.path.exists(os.path.join(self.dir, MARKER)))
+
+    def test_layout_from_name(self):
+        self.assertFalse(layout_from_name(None).sharded)
+        self.assertEqual(layout_from_name("sharded:1:3").to_dict(),
+                         {"layout": "sharded", "depth": 1, "width": 3})
+        with self.assertRaises(ValueError):
+            layout_from_name("tree")
+
+    def test_find_in_shard_and_root(self):
+        sharded = self.write(self.layout.path(self.dir, "a.txt"))
+        flat = self.write(os.path.join(self.dir, "b.txt"))
+        write_layout(self.dir, self.layout)
+
+        self.assertEqual(self.layout.find(self.dir, "a.txt"), sharded)
+        self.assertEqual(self.layout.find(self.dir, "b.txt"), flat)
+        self.assertIsNone(self.layout.find(self.dir, "c.txt"))
+        # Маркер не считается файлом директории
+        self.assertEqual(self.names(self.layout), ["a.txt", "b.txt"])
+
+
+class MigrationTest(ShardingTestCase):
+
+    def test_moves_all_files_into_shards(self):
+        for i in range(20):
+            self.write(os.path.join(self.dir, f"{i}.txt"), str(i))
+
+        success, _ = ShardMigration(self.dir, self.layout).run()
+
+        self.assertTrue(success)
+        self.assertEqual(read_layout(self.dir).to_dict(), self.layout.to_dict())
+        self.assertEqual(os.listdir(self.dir).count(MARKER), 1)
+        self.assertFalse(any(os.path.isfile(os.path.join(self.dir, f"{i}.txt"))
+                             for i in range(20)))
+        for i in range(20):
+            self.assertEqual(self.read(self.layout.path(self.dir, f"{i}.txt")), str(i))
+
+    def test_taken_name_in_shard_is_kept(self):
+        self.write(self.layout.path(self.dir, "a.txt"), "sharded")
+        self.write(os.path.join(self.dir, "a.txt"), "flat")
+
+        migration = ShardMigration(self.dir, self.layout)
+        migration.run()
+
+        self.assertEqual(migration.renamed, 1)
+        self.assertEqual(self.read(self.layout.path(self.dir, "a.txt")), "sharded")
+        self.assertEqual(self.read(self.layout.path(self.dir, "a_1.txt")), "flat")
+
+    def test_resume_after_cancel(self):
+        for i in range(10):
+            self.write(os.path.join(self.dir, f"{i}.txt"), str(i))
+
+        def on_progress(moved: int, total: int):
+            if moved == 4:
+                migration.cancel()
+
+        migration = ShardMigration(self.dir, self.layout, on_progress=on_progress)
+        success, _ = migration.run()
+        self.assertFalse(success)
+        self.assertEqual(migration.moved, 4)
+        # Во время миграции видны и перенесенные, и оставшиеся в корне файлы
+        self.assertEqual(len(self.names(read_layout(self.dir))), 10)
+
+        resumed = ShardMigration(self.dir, self.layout)
+        self.assertTrue(resumed.run()[0])
+        self.assertEqual(resumed.moved, 6)
+        self.assertEqual(len(self.names(self.layout)), 10)
+
+    def test_resume_after_crash_between_link_and_unlink(self):
+        source = self.write(os.path.join(self.dir, "a.txt"), "data")
+        target = self.layout.path(self.dir, "a.txt")
+        os.makedirs(os.path.dirname(target))
+        os.link(source, target)
+        write_layout(self.dir, self.layout)
+
+        migration = ShardMigration(self.dir, self.layout)
+        migration.run()
+
+        self.assertEqual(migration.renamed, 0)
+        self.assertFalse(os.path.exists(source))
+        self.assertEqual(self.names(self.layout), ["a.txt"])
+
+    def test_other_sharding_parameters_refused(self):
+        write_layout(self.dir, ShardedLayout(depth=1, width=2))
+        success, _ = ShardMigration(self.dir, self.layout).run()
+        self.assertFalse(success)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Тесты SharedProgress: обнаружение умерших воркеров.
+
+Запуск: python -m unittest tests.test_shared_progress
+"""
+
+import contextlib
+import io
+import os
+import struct
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+from src.utils.shared_progress import SLOT_FORMAT, SLOT_SIZE, STATE_RUNNING, SharedProgress
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@unittest.skipIf(os.name == "nt", "на Windows жизнь воркера проверяется только по сигналу")
+class LostWorkerTest(unittest.TestCase):
+
+    def lost_after_render(self, per_worker_bars: bool) -> int:
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            progress = SharedProgress(total=10, workers=2, refresh_interval=60,
+                                      per_worker_bars=per_worker_bars)
+            try:
+                struct.pack_into(SLOT_FORMAT, progress._shm.buf, 0,
+                                 _dead_pid(), 3, STATE_RUNNING, time.time())
+                struct.pack_into(SLOT_FORMAT, progress._shm.buf, SLOT_SIZE,
+                                 os.getpid(), 4, STATE_RUNNING, time.time())
+                progress.render()
+                return progress.lost_workers
+            finally:
+                progress.close()
+
+    def test_headless(self):
+        with mock.patch.dict(os.environ, {"TQDM_DEMO_HEADLESS": "1"}):
+            self.assertEqual(self.lost_after_render(per_worker_bars=True), 1)
+
+    def test_without_worker_bars(self):
+        with mock.patch.dict(os.environ, {"TQDM_DEMO_HEADLESS": "0"}):
+            self.assertEqual(self.lost_after_render(per_worker_bars=False), 1)
+
+    def test_with_worker_bars(self):
+        with mock.patch.dict(os.environ, {"TQDM_DEMO_HEADLESS": "0"}):
+            self.assertEqual(self.lost_after_render(per_worker_bars=True), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Тесты аналитики хранилища: топы самых больших и самых старых файлов
+против полной сортировки, итоги по директориям и расширениям.
+
+Запуск: python -m unittest tests.test_storage_analytics
+"""
+
+import random
+import unittest
+
+from src.utils.storage_analytics import NO_EXTENSION, StorageAnalytics
+
+NOW = 1_800_000_000.0
+
+
+class StorageAnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(3)
+        extensions = (".txt", ".log", ".BIN", "")
+        self.records = {}
+        for directory in ("temp", "processed", "archive"):
+            self.records[directory] = [
+                (f"{directory}_{i}{generator.choice(extensions)}", f"storage/{directory}",
+                 generator.randrange(0, 10 ** 7), NOW - generator.uniform(0, 400 * 86400))
+                for i in range(500)
+            ]
+        self.all_records = [(directory, record) for directory, records in self.records.items()
+                            for record in records]
+
+    def scan(self, top_n: int) -> StorageAnalytics:
+        analytics = StorageAnalytics(top_n=top_n, now=NOW)
+        for directory, records in self.records.items():
+            # Директория частями: пороги топов переживают вызовы scan()
+            analytics.scan(directory, records[:200])
+            analytics.scan(directory, records[200:])
+        return analytics
+
+    def test_largest_and_oldest_match_sorted_reference(self):
+        analytics = self.scan(top_n=10)
+
+        by_size = sorted(self.all_records, key=lambda item: item[1][2], reverse=True)[:10]
+        self.assertEqual([(entry.directory, entry.name, entry.size) for entry in analytics.largest],
+                         [(directory, name, size) for directory, (name, _, size, _) in by_size])
+
+        by_age = sorted(self.all_records, key=lambda item: item[1][3])[:10]
+        self.assertEqual([(entry.directory, entry.name, entry.mtime) for entry in analytics.oldest],
+                         [(directory, name, mtime) for directory, (name, _, _, mtime) in by_age])
+
+    def test_top_larger_than_file_count(self):
+        analytics = StorageAnalytics(top_n=5, now=NOW)
+        analytics.scan("temp", self.records["temp"][:3])
+        self.assertEqual(len(analytics.largest), 3)
+        self.assertEqual(len(analytics.oldest), 3)
+
+    def test_totals(self):
+        analytics = self.scan(top_n=0)
+
+        self.assertEqual(analytics.largest, [])
+        self.assertEqual(analytics.count, len(self.all_records))
+        self.assertEqual(analytics.size, sum(record[2] for _, record in self.all_records))
+        for directory, records in self.records.items():
+            self.assertEqual(analytics.directories[directory],
+                             [len(records), sum(record[2] for record in records)])
+        self.assertEqual(sum(count for count, _ in analytics.extensions.values()),
+                         len(self.all_records))
+        self.assertIn(".bin", analytics.extensions)
+        self.assertIn(NO_EXTENSION, analytics.extensions)
+        self.assertEqual(sum(analytics.size_counts), len(self.all_records))
+        self.assertEqual(sum(analytics.age_counts), len(self.all_records))
+
+
+if __name__ == "__main__":
+    unittest.main()
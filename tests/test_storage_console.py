@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Тесты консоли хранилища: номера файлов в командах соответствуют экрану.
+
+Запуск: python -m unittest tests.test_storage_console
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils.storage_backends import LocalBackend
+from src.utils.storage_console import StorageConsole
+from src.utils.storage_manager import StorageManager
+
+
+class FakeScreen:
+    """Экран, который может отказаться обновлять кадр (кадр выше терминала)."""
+
+    def __init__(self, answers, fits: bool):
+        self.answers = list(answers)
+        self.fits = fits
+        self.frames = []
+
+    def draw(self, frame):
+        self.frames.append(frame)
+
+    def patch(self, frame):
+        if self.fits:
+            self.frames.append(frame)
+        return self.fits
+
+    def input(self, prompt=""):
+        return self.answers.pop(0)
+
+    def print(self, *args, **kwargs):
+        pass
+
+    def lines(self, rows):
+        pass
+
+    def flush(self):
+        pass
+
+
+class StorageConsoleListingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manager = StorageManager(self.root, layout="flat", durable=False, backend=LocalBackend())
+        self.temp = self.manager.directories["temp"]
+        for i in range(30):
+            self.create(f"f{i:02d}.txt", 1_000_000 + i)
+        self.console = StorageConsole(self.manager)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def create(self, name: str, mtime: float):
+        path = os.path.join(self.temp, name)
+        with open(path, "w") as f:
+            f.write(name)
+        os.utime(path, (mtime, mtime))
+
+    def show_then_change(self, fits: bool) -> FakeScreen:
+        screen = FakeScreen(["1", "y"], fits)
+        with mock.patch("src.utils.storage_console.screen", screen):
+            self.console.show(lambda: self.console.directory_frame("temp"))
+            # Новый файл - первый в списке по времени изменения
+            self.create("new.txt", 2_000_000)
+            self.console._on_storage_change([])
+            self.console.delete_file_interactive()
+        return screen
+
+    def remaining(self):
+        return set(os.listdir(self.temp))
+
+    def test_delete_uses_drawn_list_when_patch_not_drawn(self):
+        screen = self.show_then_change(fits=False)
+        self.assertEqual(len(screen.frames), 1)
+        self.assertIn("new.txt", self.remaining())
+        self.assertNotIn("f29.txt", self.remaining())
+
+    def test_delete_uses_patched_list(self):
+        screen = self.show_then_change(fits=True)
+        self.assertGreaterEqual(len(screen.frames), 2)
+        self.assertNotIn("new.txt", self.remaining())
+        self.assertIn("f29.txt", self.remaining())
+
+
+if __name__ == "__main__":
+    unittest.main()
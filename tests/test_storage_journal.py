@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Тесты журнала хранилища: восстановление после сбоя, уборка каталогов
+подготовки и занятие имени назначения.
+
+Запуск: python -m unittest tests.test_storage_journal
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.utils import storage_journal
+from src.utils.storage_journal import COPY, MOVE, StorageJournal
+
+
+def dead_pid() -> int:
+    """pid только что завершившегося процесса."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.src = os.path.join(self.base, "src")
+        self.dst = os.path.join(self.base, "dst")
+        os.makedirs(self.src)
+        os.makedirs(self.dst)
+        self.journal = StorageJournal(self.base, durable=False)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def write(self, path: str, data: str = "data") -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+        return path
+
+    def read(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def stage(self, batch_id: str, index: int, data: str) -> str:
+        staging = os.path.join(self.journal.staging_dir, batch_id)
+        os.makedirs(staging, exist_ok=True)
+        return self.write(os.path.join(staging, str(index)), data)
+
+    def prepare(self, batch_id: str, ops):
+        """Запись prepared без committed - как после сбоя в фазе применения."""
+        with open(self.journal.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"batch": batch_id, "state": "prepared", "ops": ops}) + "\n")
+
+
+class RecoverTest(JournalTestCase):
+
+    def test_replays_prepared_batch_of_dead_owner(self):
+        batch_id = f"20240101000000-{dead_pid()}-1"
+        moved = self.write(os.path.join(self.src, "a.txt"), "move")
+        copied = self.write(os.path.join(self.src, "b.txt"), "copy")
+        staged = self.stage(batch_id, 1, "copy")
+        self.prepare(batch_id, [
+            [MOVE, moved, os.path.join(self.dst, "a.txt"), None],
+            [COPY, copied, os.path.join(self.dst, "b.txt"), staged],
+        ])
+
+        messages = self.journal.recover()
+
+        self.assertTrue(any(batch_id in m and m.startswith("✅") for m in messages))
+        self.assertFalse(os.path.exists(moved))
+        self.assertEqual(self.read(os.path.join(self.dst, "a.txt")), "move")
+        self.assertEqual(self.read(os.path.join(self.dst, "b.txt")), "copy")
+        self.assertEqual(self.read(copied), "copy")
+        self.assertFalse(os.path.exists(os.path.join(self.journal.staging_dir, batch_id)))
+        self.assertEqual(os.path.getsize(self.journal.path), 0)
+
+    def test_replay_after_partial_apply_is_idempotent(self):
+        batch_id = f"20240101000000-{dead_pid()}-1"
+        staged = self.stage(batch_id, 0, "copy")
+        target = os.path.join(self.dst, "b.txt")
+        # Сбой между os.link и удалением копии
+        os.link(staged, target)
+        self.prepare(batch_id, [[COPY, self.write(os.path.join(self.src, "b.txt"), "copy"),
+                                 target, staged]])
+
+        self.journal.recover()
+
+        self.assertEqual(sorted(os.listdir(self.dst)), ["b.txt"])
+        self.assertFalse(os.path.exists(staged))
+
+    def test_skips_batch_of_live_owner(self):
+        batch_id = f"20240101000000-{os.getpid()}-999"
+        moved = self.write(os.path.join(self.src, "a.txt"))
+        staged = self.stage(batch_id, 0, "data")
+        self.prepare(batch_id, [[MOVE, moved, os.path.join(self.dst, "a.txt"), staged]])
+
+        self.journal.recover()
+
+        self.assertTrue(os.path.exists(moved))
+        self.assertTrue(os.path.exists(staged))
+        self.assertEqual(os.listdir(self.dst), [])
+        self.assertIn(batch_id, self.read(self.journal.path))
+
+    def test_replayed_batch_is_not_replayed_again(self):
+        live_id = f"20240101000000-{os.getpid()}-999"
+        dead_id = f"20240101000000-{dead_pid()}-1"
+        moved = self.write(os.path.join(self.src, "a.txt"))
+        self.prepare(live_id, [])
+        self.prepare(dead_id, [[MOVE, moved, os.path.join(self.dst, "a.txt"), None]])
+
+        self.assertEqual(len(self.journal.recover()), 1)
+        # Журнал не обрезан (живой пакет), но пакет помечен committed
+        self.assertEqual(self.journal.recover(), [])
+
+    def test_removes_only_orphaned_staging(self):
+        orphan = f"20240101000000-{dead_pid()}-1"
+        live = f"20240101000000-{os.getpid()}-999"
+        self.stage(orphan, 0, "data")
+        self.stage(live, 0, "data")
+
+        messages = self.journal.recover()
+
+        self.assertEqual(os.listdir(self.journal.staging_dir), [live])
+        self.assertTrue(any(orphan in m and m.startswith("⚠️") for m in messages))
+
+
+class CheckpointTest(JournalTestCase):
+
+    @unittest.skipIf(storage_journal.fcntl is None, "нужен fcntl")
+    def test_not_truncated_while_other_instance_active(self):
+        other = StorageJournal(self.base, durable=False)
+        self.addCleanup(other.close)
+        other._new_batch_id()
+        self.write(os.path.join(self.src, "a.txt"))
+        self.journal.execute([(MOVE, os.path.join(self.src, "a.txt"),
+                               os.path.join(self.dst, "a.txt"))])
+        size = os.path.getsize(self.journal.path)
+
+        with self.journal._lock:
+            self.assertFalse(self.journal._truncate_settled())
+        self.assertEqual(os.path.getsize(self.journal.path), size)
+
+    def test_instances_in_one_process_get_distinct_batch_ids(self):
+        other = StorageJournal(self.base, durable=False)
+        self.addCleanup(other.close)
+        self.assertNotEqual(self.journal._new_batch_id(), other._new_batch_id())
+
+
+class PlaceTest(JournalTestCase):
+
+    def test_taken_name_gets_next_number(self):
+        target = self.write(os.path.join(self.dst, "a.txt"), "foreign")
+        source = self.write(os.path.join(self.src, "a.txt"), "ours")
+
+        placed = self.journal._place(source, target)
+
+        self.assertEqual(placed, os.path.join(self.dst, "a_1.txt"))
+        self.assertEqual(self.read(target), "foreign")
+        self.assertEqual(self.read(placed), "ours")
+        self.assertFalse(os.path.exists(source))
+
+    def test_name_linked_before_crash_is_reused(self):
+        self.write(os.path.join(self.dst, "a.txt"), "foreign")
+        source = self.write(os.path.join(self.src, "a.txt"), "ours")
+        os.link(source, os.path.join(self.dst, "a_1.txt"))
+
+        placed = self.journal._place(source, os.path.join(self.dst, "a.txt"))
+
+        self.assertEqual(placed, os.path.join(self.dst, "a_1.txt"))
+        self.assertEqual(sorted(os.listdir(self.dst)), ["a.txt", "a_1.txt"])
+        self.assertFalse(os.path.exists(source))
+
+
+if __name__ == "__main__":
+    unittest.main()